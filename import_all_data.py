@@ -1,5 +1,6 @@
 import json
 from sqlalchemy import create_engine, text
+from sqlalchemy.orm import Session
 import os
 from dotenv import load_dotenv
 
@@ -47,15 +48,26 @@ def import_table_from_json(table_name, json_file, date_columns=None):
         
         filtered_data = []
         skipped_count = 0
+        liked = set()
+        duplicate_count = 0
         
         for item in data:
             if item.get("user_email") in valid_emails and item.get("policy_id") in valid_policy_ids:
+                # 같은 정책 중복 찜은 첫 행만 (uq_users_action_like 유니크 인덱스)
+                if item.get("type") == "like":
+                    key = (item["user_email"], item["policy_id"])
+                    if key in liked:
+                        duplicate_count += 1
+                        continue
+                    liked.add(key)
                 filtered_data.append(item)
             else:
                 skipped_count += 1
         
         if skipped_count > 0:
             print(f"⚠️ Skipped {skipped_count} rows due to missing Foreign Keys (user_email or policy_id).")
+        if duplicate_count > 0:
+            print(f"⚠️ Skipped {duplicate_count} duplicate likes.")
         
         data = filtered_data
         if not data:
@@ -97,12 +109,86 @@ def import_table_from_json(table_name, json_file, date_columns=None):
             trans.rollback()
             print(f"❌ Error importing {table_name}: {e}")
 
+def sync_catalog(json_file, dry_run=False):
+    """
+    정책만 증분 동기화 (TRUNCATE 없음 → users/users_action 유지, 동기화 중에도 사이트 조회 가능)
+    original_id로 기존 정책과 맞춰 추가/수정/비활성화만 반영 (services/catalog_sync.py)
+    """
+    from services.catalog_sync import ensure_sync_columns, backfill_content_hashes, sync_policies, load_records, format_result
+
+    print(f"\n🔄 Syncing 'being_test' from {json_file}...")
+    if not os.path.exists(json_file):
+        print(f"⚠️ File not found: {json_file}. Skipping.")
+        return
+    if not ensure_sync_columns(engine):
+        print("❌ Sync index is not ready. Fix duplicated original_id values or run a full import.")
+        return
+    with Session(bind=engine) as session:
+        backfill_content_hashes(session)
+        result = sync_policies(session, load_records(json_file), dry_run=dry_run)
+    print(format_result(result, dry_run))
+
+
 if __name__ == "__main__":
+    import sys
+
+    # python import_all_data.py --sync [--dry-run] : 정책만 증분 동기화
+    if "--sync" in sys.argv:
+        sync_catalog("shared_being_test.json", dry_run="--dry-run" in sys.argv)
+        sys.exit(0)
+
     print("🚀 Starting Data Import Process...")
     
     # 순서 중요: users (부모) -> being_test (부모) -> users_action (자식)
     import_table_from_json("users", "shared_users.json")
     import_table_from_json("being_test", "shared_being_test.json")
     import_table_from_json("users_action", "shared_users_action.json")
+
+    # being_test가 바뀌었으므로 검색 색인 재생성
+    # (TRUNCATE ... CASCADE로 policy_search_gram도 함께 비워진 상태)
+    from models import PolicySearchGram, CatalogMeta, PolicyEmbedding, PolicyCooccurrence, PolicyNeighbor, PolicyTrend, UserCategoryStat, AdminStatSnapshot
+    from services.search import rebuild_search_index
+    from services.embeddings import rebuild_embeddings
+    from services.item_neighbors import rebuild_item_neighbors
+    from services.trending import rebuild_trending
+    from services.category_stats import rebuild_category_stats
+    from services.codes import ensure_code_columns, backfill_codes
+    from services.user_actions import ensure_like_unique_index, ensure_action_indexes
+    from services.catalog import bump_catalog_version
+    from services.admin_stats import take_snapshot
+    with engine.begin() as conn:
+        conn.execute(text("CREATE EXTENSION IF NOT EXISTS vector"))
+    PolicySearchGram.__table__.create(bind=engine, checkfirst=True)
+    CatalogMeta.__table__.create(bind=engine, checkfirst=True)
+    PolicyEmbedding.__table__.create(bind=engine, checkfirst=True)
+    PolicyCooccurrence.__table__.create(bind=engine, checkfirst=True)
+    PolicyNeighbor.__table__.create(bind=engine, checkfirst=True)
+    PolicyTrend.__table__.create(bind=engine, checkfirst=True)
+    UserCategoryStat.__table__.create(bind=engine, checkfirst=True)
+    AdminStatSnapshot.__table__.create(bind=engine, checkfirst=True)
+    ensure_code_columns(engine)
+    ensure_like_unique_index(engine)
+    ensure_action_indexes(engine)
+    from services.catalog_sync import ensure_sync_columns, backfill_content_hashes
+    ensure_sync_columns(engine)
+    with Session(bind=engine) as session:
+        # 원시 SQL로 적재했으므로 표준 지역/장르 코드 컬럼 채우기
+        print(f"🏷️ Region/genre codes backfilled ({backfill_codes(session)} rows).")
+        # 다음부터 --sync가 바뀐 정책만 반영하도록 원본 내용 해시 기록
+        print(f"#️⃣ Content hashes recorded ({backfill_content_hashes(session)} policies).")
+        gram_count = rebuild_search_index(session)
+        print(f"🔎 Search index rebuilt ({gram_count} grams).")
+        print(f"🧭 Policy embeddings rebuilt ({rebuild_embeddings(session)} policies).")
+        # users_action도 다시 적재됐으므로 협업 필터링 이웃 전체 재생성
+        print(f"🤝 Item neighbors rebuilt ({rebuild_item_neighbors(session)} rows).")
+        print(f"📈 Trending scores rebuilt ({rebuild_trending(session)} policies).")
+        print(f"📊 User category stats rebuilt ({rebuild_category_stats(session)} rows).")
+        # 새 데이터 기준으로 관리자 대시보드 통계 스냅샷 한 장
+        take_snapshot(session)
+
+        # 실행 중인 서버의 메모리 캐시(카탈로그 스냅샷 등)가 새 데이터로 다시 만들어지도록 버전 증가
+        version = bump_catalog_version(session)
+        session.commit()
+    print(f"📦 Catalog version bumped to {version}.")
     
     print("\n✨ All imports completed!")
@@ -2,6 +2,7 @@ import os
 from fastapi import FastAPI, Request
 from fastapi.templating import Jinja2Templates
 from fastapi.staticfiles import StaticFiles
+from services.compression import CompressionMiddleware
 
 # [중요 1] DB 테이블 생성을 위해 필요한 도구 가져오기
 import models
@@ -14,8 +15,55 @@ from routers import landing, auth, about, main_page, all, mypage, admin, recomme
 # [중요 3] 서버 시작 시 DB에 없는 테이블(users 등) 자동 생성
 # DB 연결 실패 시에도 서버는 시작되도록 에러 핸들링 추가
 try:
+    # pgvector 확장 (정책 임베딩 컬럼용) - PostgreSQL에서만
+    if engine.dialect.name == "postgresql":
+        from sqlalchemy import text
+        with engine.begin() as conn:
+            conn.execute(text("CREATE EXTENSION IF NOT EXISTS vector"))
+
     models.Base.metadata.create_all(bind=engine)
     print("✅ 데이터베이스 연결 성공 및 테이블 확인 완료")
+
+    # 기존 테이블에 표준 지역/장르 코드 컬럼이 없으면 추가 후 한 번 채움
+    from services.codes import ensure_code_columns, backfill_codes
+    codes_added = ensure_code_columns(engine)
+
+    # 중복 찜 방지 유니크 인덱스가 없으면 기존 중복 찜을 정리하고 생성
+    from services.user_actions import ensure_like_unique_index, ensure_action_indexes
+    removed_likes = ensure_like_unique_index(engine)
+    if removed_likes > 0:
+        print(f"🔒 중복 찜 {removed_likes}건 정리 후 유니크 인덱스 생성 완료")
+    ensure_action_indexes(engine)  # 찜 목록 키셋 페이지네이션 인덱스 등
+
+    # 카탈로그 증분 동기화용 content_hash 컬럼 / original_id 유니크 인덱스 (services/catalog_sync.py)
+    from services.catalog_sync import ensure_sync_columns
+    ensure_sync_columns(engine)
+
+    # 검색 색인이 비어 있으면(최초 배포 등) 한 번 만들어 둠
+    from database import SessionLocal
+    from services.search import rebuild_search_index
+    with SessionLocal() as db:
+        if codes_added:
+            print(f"🏷️ 지역/장르 코드 채우기 완료 ({backfill_codes(db)}행)")
+
+        if db.query(models.PolicySearchGram).first() is None and db.query(models.Policy).first() is not None:
+            print(f"🔎 검색 색인 생성 완료 ({rebuild_search_index(db)} grams)")
+
+        # "비슷한 정책" 임베딩도 비어 있으면 생성 (PostgreSQL만, 그 외는 메모리에서 계산)
+        if engine.dialect.name == "postgresql":
+            from services.embeddings import rebuild_embeddings
+            if db.query(models.PolicyEmbedding).first() is None and db.query(models.Policy).first() is not None:
+                print(f"🧭 정책 임베딩 생성 완료 ({rebuild_embeddings(db)}건)")
+
+        # 유저별 장르 카운터가 비어 있으면 users_action에서 한 번 집계
+        from services.category_stats import rebuild_category_stats
+        if db.query(models.UserCategoryStat).first() is None and db.query(models.UserAction).first() is not None:
+            print(f"📊 유저별 장르 카운터 집계 완료 ({rebuild_category_stats(db)}행)")
+
+        # 트렌드 점수가 비어 있으면 최근 액션으로 한 번 계산
+        from services.trending import rebuild_trending
+        if db.query(models.PolicyTrend).first() is None and db.query(models.UserAction).first() is not None:
+            print(f"📈 트렌드 점수 계산 완료 ({rebuild_trending(db)}건)")
 except Exception as e:
     print(f"⚠️ 데이터베이스 연결 실패: {e}")
     print("⚠️ 서버는 시작되지만 데이터베이스 기능은 사용할 수 없습니다.")
@@ -23,6 +71,117 @@ except Exception as e:
 
 app = FastAPI()
 
+# 응답 압축 (br/gzip) - ETag가 있는 응답은 압축 결과를 캐시해서 재사용
+app.add_middleware(CompressionMiddleware)
+
+# 트렌드 점수 주기 갱신 (새 액션만 반영, 요청 처리 스레드와 분리)
+@app.on_event("startup")
+async def start_trending_refresh():
+    import asyncio
+    from starlette.concurrency import run_in_threadpool
+    from database import SessionLocal
+    from services.trending import REFRESH_INTERVAL, invalidate_trend_version, refresh_trending
+    from services.catalog_snapshot import refresh_trend_scores
+
+    def refresh_once():
+        with SessionLocal() as db:
+            if refresh_trending(db):
+                invalidate_trend_version()
+            # 이 워커의 스냅샷 인기순 점수 교체 (다른 워커가 갱신한 점수도 여기서 반영)
+            refresh_trend_scores(db)
+
+    async def loop():
+        while True:
+            await asyncio.sleep(REFRESH_INTERVAL)
+            try:
+                await run_in_threadpool(refresh_once)
+            except Exception as e:
+                print(f"⚠️ 트렌드 점수 갱신 실패: {e}")
+
+    app.state.trending_task = asyncio.create_task(loop())
+
+# 협업 필터링 이웃 주기 증분 갱신 (워터마크 이후 새 찜만 반영, services/item_neighbors.py)
+@app.on_event("startup")
+async def start_item_neighbors_refresh():
+    import asyncio
+    from starlette.concurrency import run_in_threadpool
+    from database import SessionLocal
+    from services.item_neighbors import REFRESH_INTERVAL, refresh_item_neighbors
+
+    def refresh_once():
+        with SessionLocal() as db:
+            refresh_item_neighbors(db)
+
+    async def loop():
+        while True:
+            await asyncio.sleep(REFRESH_INTERVAL)
+            try:
+                await run_in_threadpool(refresh_once)
+            except Exception as e:
+                print(f"⚠️ 이웃 정책 갱신 실패: {e}")
+
+    app.state.item_neighbors_task = asyncio.create_task(loop())
+
+# 관리자 대시보드 통계 스냅샷 주기 생성 (services/admin_stats.py)
+@app.on_event("startup")
+async def start_admin_stats_snapshots():
+    import asyncio
+    from starlette.concurrency import run_in_threadpool
+    from database import SessionLocal
+    from services.admin_stats import refresh_if_stale
+
+    def refresh_once():
+        with SessionLocal() as db:
+            refresh_if_stale(db)  # 다른 워커가 이미 만들었으면 건너뜀
+
+    async def loop():
+        while True:
+            try:
+                await run_in_threadpool(refresh_once)
+            except Exception as e:
+                print(f"⚠️ 관리자 통계 스냅샷 실패: {e}")
+            await asyncio.sleep(60)
+
+    app.state.admin_stats_task = asyncio.create_task(loop())
+
+# 스와이프 액션 버퍼 / 덱 "본 정책" 비트맵 주기 저장 + 종료 시 남은 것 저장 (services/action_buffer.py, services/seen_set.py)
+@app.on_event("startup")
+async def start_action_flush():
+    import asyncio
+    from starlette.concurrency import run_in_threadpool
+    from services.action_buffer import FLUSH_INTERVAL, action_buffer, flush_actions
+    from services.seen_set import flush_seen, pending_count
+
+    async def loop():
+        while True:
+            await asyncio.sleep(FLUSH_INTERVAL)
+            if len(action_buffer):
+                await run_in_threadpool(flush_actions)
+            if pending_count():
+                await run_in_threadpool(flush_seen)
+
+    app.state.action_flush_task = asyncio.create_task(loop())
+
+@app.on_event("shutdown")
+async def flush_action_buffer():
+    import asyncio
+    from starlette.concurrency import run_in_threadpool
+    from services.action_buffer import action_buffer, flush_on_shutdown
+    from services.seen_set import flush_seen, pending_count
+
+    # 주기 저장 작업을 멈추고 끝날 때까지 기다린 뒤 남은 것을 저장 (DB I/O는 스레드풀에서)
+    task = getattr(app.state, "action_flush_task", None)
+    if task is not None:
+        task.cancel()
+        try:
+            await task
+        except asyncio.CancelledError:
+            pass
+    if len(action_buffer):
+        print(f"💾 종료 전 액션 버퍼 저장 ({await run_in_threadpool(flush_on_shutdown)}건)")
+    if pending_count():
+        print(f"💾 종료 전 본 정책 비트맵 저장 ({await run_in_threadpool(flush_seen)}건)")
+
 # --- [핵심 수정] 절대 경로 계산 ---
 BASE_DIR = os.path.dirname(os.path.abspath(__file__))
 
@@ -1,6 +1,7 @@
 # [수정] String, ForeignKey 추가, relationship 추가
-from sqlalchemy import Column, Integer, Text, String, DateTime, Date, ForeignKey, Boolean
-from sqlalchemy.orm import relationship
+from sqlalchemy import Column, Integer, SmallInteger, Text, String, DateTime, Date, ForeignKey, Boolean, LargeBinary, Index, Float, select, event, text
+from sqlalchemy.orm import relationship, column_property
+from pgvector.sqlalchemy import Vector
 from datetime import datetime
 from database import Base
 
@@ -20,6 +21,23 @@ class Policy(Base):
     end_date = Column(Date)
     view_count = Column(Integer, default=0)
     is_active = Column(Boolean, default=True) # [NEW] 공개 여부 (True: 모집중, False: 마감)
+    # [NEW] 표준 지역/장르 코드 (REGION_CODES / GENRE_CODES) - LIKE 대신 인덱스 동등/IN 조회용
+    # region/genre가 바뀌면 ORM 이벤트로 자동 갱신, 일괄 import 후에는 services/codes.py로 채움
+    region_code = Column(SmallInteger, index=True)
+    genre_code = Column(SmallInteger, index=True)
+    # [NEW] 마지막으로 동기화한 원본 레코드의 내용 해시 (services/catalog_sync.py) - 같으면 건너뜀
+    content_hash = Column(String(64))
+    # [NEW] 원본 목록에서 빠져서 동기화가 비활성화한 정책 (다시 나타나면 동기화가 다시 공개, 관리자가 닫은 정책과 구분)
+    sync_deactivated = Column(Boolean, default=False)
+
+    # [NEW] 원본 id로 증분 동기화 (INSERT ... ON CONFLICT 대상, 관리자가 직접 만든 정책은 original_id가 없음)
+    __table_args__ = (
+        Index(
+            "uq_being_test_original_id", "original_id", unique=True,
+            postgresql_where=text("original_id IS NOT NULL"),
+            sqlite_where=text("original_id IS NOT NULL"),
+        ),
+    )
 
 # 2. 사용자 테이블 (신규)
 class User(Base):
@@ -32,6 +50,7 @@ class User(Base):
     name = Column(String, nullable=False)
     password = Column(String, nullable=True)
     region = Column(String, nullable=True)
+    region_code = Column(SmallInteger, index=True)  # [NEW] 표준 지역 코드 (region에서 자동 계산)
     provider = Column(String, default="local") # [NEW] 로그인 제공자 (local, google, naver)
 
     # [NEW] 유료 멤버십 등급 (free / premium)
@@ -66,6 +85,147 @@ class UserAction(Base):
     # Relationship (Join condition 명시)
     user = relationship("User", back_populates="actions", foreign_keys=[user_email])
 
+    # [NEW] 같은 정책은 한 번만 찜 가능 (like 행에만 적용되는 부분 유니크 인덱스, services/user_actions.py)
+    __table_args__ = (
+        Index(
+            "uq_users_action_like", "user_email", "policy_id", unique=True,
+            postgresql_where=text("type = 'like'"),
+            sqlite_where=text("type = 'like'"),
+        ),
+        # [NEW] 찜 목록 키셋 페이지네이션 (최근 찜한 순: created_at, id)
+        Index(
+            "ix_users_action_like_recent", "user_email", "created_at", "id",
+            postgresql_where=text("type = 'like'"),
+            sqlite_where=text("type = 'like'"),
+        ),
+    )
+
+# 4. 정책 검색 색인 테이블 (n-gram 역색인)
+# 제목/요약을 2글자 단위(bi-gram)로 쪼개 (gram -> 정책) 형태로 저장
+# LIKE '%키워드%' 전체 스캔 대신 PK(gram, policy_id) 인덱스 범위 조회로 검색
+class PolicySearchGram(Base):
+    __tablename__ = "policy_search_gram"
+
+    gram = Column(String, primary_key=True)
+    policy_id = Column(Integer, ForeignKey("being_test.id", ondelete="CASCADE"), primary_key=True, index=True)
+    weight = Column(Integer, nullable=False, default=1)  # 제목 출현 x3 + 요약 출현 x1
+
+# 5. 카탈로그 버전 테이블
+# 정책 데이터가 바뀔 때마다(관리자 수정/삭제, 일괄 import) version이 1씩 증가
+# 메모리 캐시들은 이 값만 보고 다시 만들지 여부를 판단
+# (key를 달리해서 배치 작업의 진행 위치(워터마크) 저장에도 사용)
+class CatalogMeta(Base):
+    __tablename__ = "catalog_meta"
+
+    key = Column(String, primary_key=True)
+    version = Column(Integer, nullable=False, default=0)
+    updated_at = Column(DateTime, default=datetime.now)
+
+# 6. 스와이프 덱 세션별 "이미 본 정책" 목록
+# 정책 id를 비트 번호로 쓰는 비트맵(정책 1000개 ≈ 125바이트)
+# 서버 메모리가 기본 저장소이고, 재시작/다중 워커 대비용으로 여기에 같이 저장
+class DeckSeenSet(Base):
+    __tablename__ = "deck_seen_set"
+
+    token = Column(String, primary_key=True)
+    bitmap = Column(LargeBinary, nullable=False)
+    updated_at = Column(DateTime, default=datetime.now, index=True)  # TTL 만료 정리용
+
+# 7. 사용자별 알림 피드 (미리 계산된 /api/recommend/status 응답)
+# feed_key: 유저 이메일 (비로그인 공용 피드는 빈 문자열)
+# 카탈로그 버전이나 날짜가 다르면 다시 계산, 찜/찜 취소 시에는 바로 다시 계산
+class UserAlertFeed(Base):
+    __tablename__ = "user_alert_feed"
+
+    feed_key = Column(String, primary_key=True)
+    alerts = Column(Text, nullable=False)  # JSON 배열 문자열 (응답 그대로)
+    catalog_version = Column(Integer, nullable=False)
+    trend_version = Column(Integer, nullable=False, default=0)  # 계산 당시 트렌드 버전 (기록용, 유효성 비교에는 사용하지 않음)
+    feed_date = Column(Date, nullable=False)
+    updated_at = Column(DateTime, default=datetime.now)
+
+# 8. 정책 임베딩 (내용 기반 "비슷한 정책" 검색용)
+# 제목/요약/장르/지역의 글자 n-gram을 해싱 + TF-IDF로 만든 고정 길이 벡터 (services/embeddings.py)
+# PostgreSQL에서는 pgvector HNSW 인덱스로 코사인 거리 근사 최근접 검색
+EMBEDDING_DIM = 256
+
+class PolicyEmbedding(Base):
+    __tablename__ = "policy_embedding"
+
+    policy_id = Column(Integer, ForeignKey("being_test.id", ondelete="CASCADE"), primary_key=True)
+    embedding = Column(Vector(EMBEDDING_DIM), nullable=False)
+
+    __table_args__ = (
+        Index(
+            "ix_policy_embedding_hnsw", "embedding",
+            postgresql_using="hnsw",
+            postgresql_with={"m": 16, "ef_construction": 64},
+            postgresql_ops={"embedding": "vector_cosine_ops"},
+        ),
+    )
+
+# 9. 정책 간 함께 찜한 횟수 (아이템 기반 협업 필터링의 중간 결과, services/item_neighbors.py)
+# (A, B) = A와 B를 둘 다 찜한 유저 수, (A, A) = A를 찜한 유저 수 / 양방향 모두 저장
+class PolicyCooccurrence(Base):
+    __tablename__ = "policy_cooccurrence"
+
+    policy_id = Column(Integer, ForeignKey("being_test.id", ondelete="CASCADE"), primary_key=True)
+    other_id = Column(Integer, ForeignKey("being_test.id", ondelete="CASCADE"), primary_key=True)
+    count = Column(Integer, nullable=False, default=0)
+
+# 10. 정책별 이웃 정책 Top-K ("이 정책을 찜한 사람들이 함께 찜한 정책")
+# score = 코사인 유사도 (함께 찜한 수 / sqrt(각각 찜한 수의 곱))
+class PolicyNeighbor(Base):
+    __tablename__ = "policy_neighbor"
+
+    policy_id = Column(Integer, ForeignKey("being_test.id", ondelete="CASCADE"), primary_key=True)
+    neighbor_id = Column(Integer, ForeignKey("being_test.id", ondelete="CASCADE"), primary_key=True)
+    score = Column(Float, nullable=False)
+
+# 11. 정책 트렌드 점수 (시간 감쇠 인기도, services/trending.py)
+# score = log(Σ 가중치 x exp(λ x (액션 시각 - 기준 시각)))  → 값이 클수록 최근 반응이 많음
+# 로그 공간에 저장하므로 시간이 지나도 기존 값을 다시 쓸 필요 없이 새 액션만 더하면 됨
+class PolicyTrend(Base):
+    __tablename__ = "policy_trend"
+
+    policy_id = Column(Integer, ForeignKey("being_test.id", ondelete="CASCADE"), primary_key=True)
+    score = Column(Float, nullable=False, index=True)
+    updated_at = Column(DateTime, default=datetime.now)
+
+# 12. 유저별 장르 버킷 찜/패스 수 (services/category_stats.py)
+# 액션 저장/찜 취소 때 같은 트랜잭션에서 +1/-1 → MBTI, 관심 분야 차트, 활동 지수가 이 행들만 읽음
+# genre_code: GENRE_CODES 값, 0은 기타(장르를 알 수 없는 정책)
+class UserCategoryStat(Base):
+    __tablename__ = "user_category_stats"
+
+    user_email = Column(String, ForeignKey("users.email", ondelete="CASCADE"), primary_key=True)
+    genre_code = Column(SmallInteger, primary_key=True)
+    likes = Column(Integer, nullable=False, default=0)
+    passes = Column(Integer, nullable=False, default=0)
+
+# 13. 관리자 대시보드 통계 스냅샷 (services/admin_stats.py)
+# 주기 작업이 한 번에 집계해서 시각과 함께 쌓아 둠 → 대시보드는 최신 행만 읽고, 추이는 지난 행들로 표시
+class AdminStatSnapshot(Base):
+    __tablename__ = "admin_stat_snapshot"
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    created_at = Column(DateTime, default=datetime.now, nullable=False, index=True)
+    total_users = Column(Integer, nullable=False, default=0)
+    premium_users = Column(Integer, nullable=False, default=0)
+    total_policies = Column(Integer, nullable=False, default=0)
+    active_policies = Column(Integer, nullable=False, default=0)
+    empty_summary_count = Column(Integer, nullable=False, default=0)
+    total_likes = Column(Integer, nullable=False, default=0)
+    total_passes = Column(Integer, nullable=False, default=0)
+    hot_policies = Column(Text, nullable=False, default="[]")   # JSON 배열 [{"id", "title", "count"}]
+    user_regions = Column(Text, nullable=False, default="[]")   # JSON 배열 [[지역, 유저 수], ...]
+
+# 인기순 정렬용: 정책의 트렌드 점수 (반응이 없던 정책은 NULL → NULLS LAST로 맨 뒤)
+Policy.trend_score = column_property(
+    select(PolicyTrend.score).where(PolicyTrend.policy_id == Policy.id).correlate_except(PolicyTrend).scalar_subquery(),
+    deferred=True,
+)
+
 # -------------------------------------------------------------------
 # [추가] 서버 실행을 위한 상수 및 헬퍼 함수 (재복구)
 # -------------------------------------------------------------------
@@ -99,34 +259,85 @@ categoryColorMap = {
     "기타": "#777777"
 }
 
-# 3. 지역명 표준화 함수
+# 3. 표준 지역/장르 코드 (DB 컬럼 region_code / genre_code에 저장되는 작은 정수)
+# 코드 값은 저장되므로 기존 번호를 바꾸지 말고 뒤에 추가만 할 것
+REGION_CODES = {
+    '전국': 0,
+    '서울': 1, '부산': 2, '대구': 3, '인천': 4, '광주': 5, '대전': 6, '울산': 7, '세종': 8,
+    '경기': 9, '강원': 10, '충북': 11, '충남': 12, '전북': 13, '전남': 14, '경북': 15, '경남': 16, '제주': 17,
+}
+NATIONWIDE_CODE = REGION_CODES['전국']
+
+# 공식 명칭 / 랜딩 지도 SVG ID → 표준 지역명
+REGION_ALIASES = {
+    '서울특별시': '서울', '부산광역시': '부산', '대구광역시': '대구', '인천광역시': '인천',
+    '광주광역시': '광주', '대전광역시': '대전', '울산광역시': '울산', '세종특별자치시': '세종',
+    '경기도': '경기', '강원도': '강원', '강원특별자치도': '강원',
+    '충청북도': '충북', '충청남도': '충남', '전라북도': '전북', '전북특별자치도': '전북',
+    '전라남도': '전남', '경상북도': '경북', '경상남도': '경남', '제주도': '제주', '제주특별자치도': '제주',
+    'national': '전국',
+    'detail_seoul': '서울', 'detail_gyeonggi': '경기', 'detail_incheon': '인천',
+    'gangwon': '강원', 'chungbug': '충북', 'chungnam': '충남', 'detail_chungnam': '충남',
+    'jeonbug': '전북', 'jeonnam': '전남', 'detail_jeonnam': '전남',
+    'gyeongbug': '경북', 'detail_gyeongbug': '경북',
+    'gyeongnam': '경남', 'detail_gyeongnam': '경남',
+    'jeju': '제주',
+    'detail_busan': '부산', 'detail_daegu': '대구', 'detail_daejun': '대전',
+    'detail_gwangju': '광주', 'detail_ulsan': '울산', 'detail_saejong': '세종',
+}
+
+GENRE_CODES = {
+    '취업/직무': 1, '창업/사업': 2, '주거/자립': 3, '금융/생활비': 4, '교육/자격증': 5, '복지/문화': 6,
+}
+# 짧은 카테고리명 (메인 카드/필터 버튼) → 장르 코드
+GENRE_SHORT_CODES = {genre.split('/')[0]: code for genre, code in GENRE_CODES.items()}
+
+
 def normalize_region_name(region):
+    """
+    지역 입력 → 표준 지역명 ('서울특별시' → '서울', 'detail_seoul' → '서울')
+    모르는 값은 기존처럼 앞 2글자, 비어 있으면 '전국'
+    """
     if not region:
         return '전국'
-    region_mapping = {
-        '서울': '서울', '서울특별시': '서울',
-        '경기': '경기', '경기도': '경기',
-        '인천': '인천', '인천광역시': '인천',
-        '부산': '부산', '부산광역시': '부산',
-        '대구': '대구', '대구광역시': '대구',
-        '광주': '광주', '광주광역시': '광주',
-        '대전': '대전', '대전광역시': '대전',
-        '울산': '울산', '울산광역시': '울산',
-        '세종': '세종', '세종특별자치시': '세종',
-        '강원': '강원', '강원도': '강원', '강원특별자치도': '강원',
-        '충북': '충북', '충청북도': '충북',
-        '충남': '충남', '충청남도': '충남',
-        '전북': '전북', '전라북도': '전북', '전북특별자치도': '전북',
-        '전남': '전남', '전라남도': '전남',
-        '경북': '경북', '경상북도': '경북',
-        '경남': '경남', '경상남도': '경남',
-        '제주': '제주', '제주도': '제주', '제주특별자치도': '제주'
-    }
     clean_region = region.strip()
-    return region_mapping.get(clean_region, clean_region[:2])
+    if clean_region in REGION_CODES:
+        return clean_region
+    return REGION_ALIASES.get(clean_region, clean_region[:2])
+
+
+def region_code(region):
+    """지역 입력 → 표준 지역 코드 (알 수 없는 지역이면 None, 비어 있으면 전국)"""
+    return REGION_CODES.get(normalize_region_name(region))
+
+
+def genre_code(genre):
+    """장르/카테고리 입력('취업/직무', '취업', 'job') → 장르 코드 (알 수 없으면 None)"""
+    if not genre:
+        return None
+    genre = genre.strip()
+    genre = FRONT_TO_DB_CATEGORY.get(genre) or genre
+    if genre in GENRE_CODES:
+        return GENRE_CODES[genre]
+    # "취업 지원" 처럼 짧은 카테고리명을 포함하는 값
+    return next((code for short, code in GENRE_SHORT_CODES.items() if short in genre), None)
+
+
+@event.listens_for(Policy, "before_insert")
+@event.listens_for(Policy, "before_update")
+def _sync_policy_codes(mapper, connection, target):
+    target.region_code = region_code(target.region)
+    target.genre_code = genre_code(target.genre)
+
+
+@event.listens_for(User, "before_insert")
+@event.listens_for(User, "before_update")
+def _sync_user_codes(mapper, connection, target):
+    target.region_code = region_code(target.region)
 
 # 4. 카테고리별 이미지 선택 함수
-def get_image_for_category(category: str) -> str:
+# policy_id를 넘기면 정책마다 항상 같은 이미지 (id % 5 + 1) → 카드 캐시/프론트와 일치
+def get_image_for_category(category: str, policy_id: int = None) -> str:
     cat_code = "welfare"
     if not category:  # Handle None or empty string
         category = ""
@@ -142,5 +353,8 @@ def get_image_for_category(category: str) -> str:
     elif "교육" in category:
         cat_code = "growth"
     
-    random_index = random.randint(1, 5)
+    if policy_id is not None:
+        random_index = policy_id % 5 + 1
+    else:
+        random_index = random.randint(1, 5)
     return f"/static/images/card_images/{cat_code}_{random_index}.webp"
\ No newline at end of file
@@ -1,10 +1,21 @@
-from fastapi import APIRouter, Request, Depends, HTTPException, Form, status
-from fastapi.responses import HTMLResponse, RedirectResponse
+from fastapi import APIRouter, BackgroundTasks, Request, Depends, HTTPException, Form, File, UploadFile, status
+from fastapi.responses import HTMLResponse, RedirectResponse, StreamingResponse
 from fastapi.templating import Jinja2Templates
-from sqlalchemy.orm import Session
-from database import get_db
+from starlette.concurrency import run_in_threadpool
+from sqlalchemy.orm import Session, joinedload
+from database import get_db, SessionLocal
+import json
 import models
 import os
+import shutil
+import tempfile
+from datetime import date
+from services import admin_stats, bulk_io, facets, search
+from services.catalog import bump_catalog_version, invalidate_catalog_version
+from services.deck_prefetch import build_stats
+from services.alert_feed import invalidate_alert_feed
+from services.embeddings import index_policy_embedding
+from services.category_stats import move_policy_genre
 
 router = APIRouter(
     prefix="/admin",
@@ -16,7 +27,6 @@ BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 templates = Jinja2Templates(directory=os.path.join(BASE_DIR, "templates"))
 
 # 패스워드 검증을 위한 설정 (auth.py와 동일)
-from sqlalchemy import func
 from passlib.context import CryptContext
 pwd_context = CryptContext(schemes=["argon2"], deprecated="auto")
 
@@ -57,50 +67,118 @@ async def admin_login_process(
     return response
 
 @router.get("/dashboard", response_class=HTMLResponse)
-async def admin_dashboard(request: Request, db: Session = Depends(get_db)):
+async def admin_dashboard(request: Request, background_tasks: BackgroundTasks, db: Session = Depends(get_db)):
     """관리자 대시보드 (통계 시각화 추가)"""
     admin_session = request.cookies.get("admin_session")
     if admin_session != "valid":
          return RedirectResponse(url="/admin/login", status_code=303)
 
-    # 1. Basic Stats
-    total_users = db.query(models.User).count()
-    total_policies = db.query(models.Policy).count()
-    premium_users = db.query(models.User).filter(models.User.subscription_level == 'premium').count()
-    
-    # 2. Recent Actions (Logs)
-    recent_actions = db.query(models.UserAction).order_by(models.UserAction.created_at.desc()).limit(10).all()
-    
-    # [Restored] 3. Popular Policies (Hot Policies)
-    from sqlalchemy import func
-    hot_policies_data = db.query(
-        models.UserAction.policy_id, 
-        func.count(models.UserAction.id).label("count")
-    ).group_by(models.UserAction.policy_id).order_by(func.count(models.UserAction.id).desc()).limit(5).all()
-
-    hot_policies = []
-    for pid, count in hot_policies_data:
-        policy = db.query(models.Policy).filter(models.Policy.id == pid).first()
-        if policy:
-             hot_policies.append({"title": policy.title, "count": count, "id": policy.id})
-
-    # [Restored] 4. Regional Stats (for HTML Bar Chart)
-    # 유저 분포
-    user_regions = db.query(models.User.region, func.count(models.User.id)).group_by(models.User.region).all()
-    
-    # [Restored] 5. Health Check
-    empty_summary_count = db.query(models.Policy).filter((models.Policy.summary == None) | (models.Policy.summary == "")).count()
+    # 1~5. 통계는 주기 작업이 만든 최신 스냅샷에서 (services/admin_stats.py, 요청마다 집계하지 않음)
+    snapshot = admin_stats.latest_snapshot(db)
+    if snapshot is None:
+        background_tasks.add_task(_take_stats_snapshot)  # 첫 스냅샷은 응답 후 만들고, 이번 화면은 빈 값으로
+
+    # 최근 행동 로그만 실시간 (PK 역순 10건 + 유저를 같은 쿼리로)
+    recent_actions = db.query(models.UserAction).options(joinedload(models.UserAction.user))\
+        .order_by(models.UserAction.id.desc()).limit(10).all()
 
     return templates.TemplateResponse("admin/dashboard.html", {
         "request": request,
-        "total_users": total_users,
-        "total_policies": total_policies,
+        "snapshot_at": snapshot.created_at if snapshot else None,
+        "total_users": snapshot.total_users if snapshot else 0,
+        "total_policies": snapshot.total_policies if snapshot else 0,
         "recent_actions": recent_actions,
-        "hot_policies": hot_policies,
-        "user_regions": user_regions,
-        "empty_summary_count": empty_summary_count
+        "hot_policies": json.loads(snapshot.hot_policies) if snapshot else [],
+        "user_regions": json.loads(snapshot.user_regions) if snapshot else [],
+        "empty_summary_count": snapshot.empty_summary_count if snapshot else 0,
+        "history": admin_stats.daily_history(db),
     })
 
+def _take_stats_snapshot():
+    with SessionLocal() as db:
+        admin_stats.take_snapshot(db)
+
+@router.post("/dashboard/refresh")
+async def admin_dashboard_refresh(request: Request):
+    """대시보드 통계 지금 갱신 (스냅샷 한 장 새로 생성)"""
+    if request.cookies.get("admin_session") != "valid":
+        return RedirectResponse(url="/admin/login", status_code=303)
+    await run_in_threadpool(_take_stats_snapshot)
+    return RedirectResponse(url="/admin/dashboard", status_code=303)
+
+@router.get("/stats/history")
+async def admin_stats_history(request: Request, days: int = 30, db: Session = Depends(get_db)):
+    """날짜별 통계 추이 (JSON, 날짜마다 그날 마지막 스냅샷)"""
+    if request.cookies.get("admin_session") != "valid":
+        raise HTTPException(status_code=401, detail="관리자 로그인이 필요합니다.")
+    days = max(1, min(days, admin_stats.HISTORY_DAYS))
+    return {"days": days, "history": admin_stats.daily_history(db, days)}
+
+@router.get("/metrics/deck")
+async def admin_deck_metrics(request: Request):
+    """스와이프 덱 생성 시간 / 미리 만든 덱 적중률 (JSON)"""
+    if request.cookies.get("admin_session") != "valid":
+        raise HTTPException(status_code=401, detail="관리자 로그인이 필요합니다.")
+    return build_stats.snapshot()
+
+# [NEW] 대량 내보내기 / 가져오기 (CSV, NDJSON) - services/bulk_io.py
+
+@router.get("/export/{table}")
+async def admin_export(request: Request, table: str, format: str = "csv"):
+    """policies / users / actions 전체를 CSV 또는 NDJSON으로 스트리밍 다운로드"""
+    if request.cookies.get("admin_session") != "valid":
+        raise HTTPException(status_code=401, detail="관리자 로그인이 필요합니다.")
+    if table not in bulk_io.EXPORT_COLUMNS or format not in bulk_io.FORMATS:
+        raise HTTPException(status_code=404, detail="지원하지 않는 내보내기입니다.")
+
+    filename = f"{table}_{date.today():%Y%m%d}.{format}"
+    return StreamingResponse(
+        bulk_io.export_stream(table, format),
+        media_type=bulk_io.FORMATS[format],
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'},
+    )
+
+@router.post("/import/{table}", status_code=202)
+async def admin_import(
+    request: Request,
+    table: str,
+    background_tasks: BackgroundTasks,
+    file: UploadFile = File(...),
+    format: str = Form(None),
+):
+    """
+    policies / actions 파일(CSV, NDJSON)을 받아 백그라운드로 가져옵니다.
+    진행 상황은 응답의 status_url로 조회합니다.
+    """
+    if request.cookies.get("admin_session") != "valid":
+        raise HTTPException(status_code=401, detail="관리자 로그인이 필요합니다.")
+    if table not in bulk_io.IMPORT_FIELDS:
+        raise HTTPException(status_code=404, detail="policies / actions만 가져올 수 있습니다.")
+    fmt = bulk_io.detect_format(file.filename, format)
+    if fmt is None:
+        raise HTTPException(status_code=400, detail="CSV(.csv) 또는 NDJSON(.ndjson, .jsonl) 파일만 지원합니다.")
+
+    # 업로드 내용을 임시 파일로 옮긴 뒤(메모리에 올리지 않음) 응답 후 가져오기 시작
+    def save_upload() -> str:
+        with tempfile.NamedTemporaryFile(prefix="import_", suffix=f".{fmt}", delete=False) as out:
+            shutil.copyfileobj(file.file, out, 1024 * 1024)
+            return out.name
+
+    path = await run_in_threadpool(save_upload)
+    job = bulk_io.create_job(table, fmt, path, file.filename)
+    background_tasks.add_task(bulk_io.run_import, job)
+    return {"job_id": job.id, "status_url": f"/admin/import/jobs/{job.id}"}
+
+@router.get("/import/jobs/{job_id}")
+async def admin_import_status(request: Request, job_id: str):
+    """가져오기 진행 상황 (읽은 행 / 적재 / 거절 / 오류 예시)"""
+    if request.cookies.get("admin_session") != "valid":
+        raise HTTPException(status_code=401, detail="관리자 로그인이 필요합니다.")
+    job = bulk_io.get_job(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="가져오기 작업을 찾을 수 없습니다.")
+    return job.to_dict()
+
 @router.get("/users", response_class=HTMLResponse)
 async def admin_users(
     request: Request, 
@@ -129,9 +207,8 @@ async def admin_users(
         
     users = query.all()
     
-    # Distinct regions for edit modal
-    all_regions_rows = db.query(models.Policy.region).distinct().filter(models.Policy.region != None).all()
-    all_regions = sorted([r[0] for r in all_regions_rows if r[0]])
+    # Distinct regions for edit modal (캐시된 지역 값 목록)
+    all_regions = [value for value, _ in facets.get_facets(db).regions]
     
     return templates.TemplateResponse("admin/users.html", {
         "request": request, 
@@ -158,6 +235,7 @@ async def update_user(
          
     user = db.query(models.User).filter(models.User.id == user_id).first()
     if user:
+        invalidate_alert_feed(db, user.email)  # 지역/이름이 알림 문구에 들어가므로 피드 다시 계산
         user.name = name
         user.email = email
         user.region = region
@@ -185,22 +263,18 @@ async def admin_policies(
     # 1. Base Query
     query = db.query(models.Policy)
     
-    # 2. Search Filter (Title Integrated Search)
+    # 2. Search Filter (Title Integrated Search, n-gram 색인 사용)
     if q:
-        search_key = f"%{q}%"
-        query = query.filter(
-            (models.Policy.title.ilike(search_key)) | 
-            (models.Policy.summary.ilike(search_key))
-        )
+        query = query.filter(search.keyword_condition(q))
 
-    # 3. Checkbox Filters (Exact Match for multiple selection)
+    # 3. Checkbox Filters (표준 지역/장르 코드 IN 조회)
     selected_genres = genres.split(",") if genres else []
     if selected_genres:
-        query = query.filter(models.Policy.genre.in_(selected_genres))
+        query = query.filter(models.Policy.genre_code.in_([models.genre_code(g) for g in selected_genres]))
         
     selected_regions = regions.split(",") if regions else []
     if selected_regions:
-        query = query.filter(models.Policy.region.in_(selected_regions))
+        query = query.filter(models.Policy.region_code.in_([models.region_code(r) for r in selected_regions]))
     
     # 4. Sorting
     allowed_sort_columns = ["id", "title", "period"] # Genre/Region removed from sort, handled by filter
@@ -217,19 +291,23 @@ async def admin_policies(
     limit = 50
     offset = (page - 1) * limit
     
-    total_policies = query.count()
+    # 키워드 검색은 n-gram 색인으로 범위가 좁으므로 정확히 COUNT,
+    # 필터 없음 / 장르·지역 체크박스만 있으면 카탈로그 스냅샷에서 셈 (DB COUNT 없음)
+    if q:
+        total_policies = query.count()
+    else:
+        total_policies = facets.filtered_count(db, selected_genres, selected_regions)
     policies = query.offset(offset).limit(limit).all()
     
     import math
     total_pages = math.ceil(total_policies / limit) if total_policies > 0 else 1
 
-    # 6. Fetch Distinct Options for Filter UI
-    # (Select distinct genre from being_test ...)
-    all_genres_rows = db.query(models.Policy.genre).distinct().filter(models.Policy.genre != None).all()
-    all_genres = [r[0] for r in all_genres_rows if r[0]]
-    
-    all_regions_rows = db.query(models.Policy.region).distinct().filter(models.Policy.region != None).all()
-    all_regions = [r[0] for r in all_regions_rows if r[0]]
+    # 6. Filter UI 옵션 (장르/지역 값별 정책 수, 카탈로그 버전당 한 번만 계산)
+    catalog_facets = facets.get_facets(db)
+    genre_counts = dict(catalog_facets.genres)
+    region_counts = dict(catalog_facets.regions)
+    all_genres = list(genre_counts)
+    all_regions = list(region_counts)
     
     # Sort: Selected first, then Alphabetical
     all_genres.sort(key=lambda x: (x not in selected_genres, x))
@@ -246,6 +324,8 @@ async def admin_policies(
         "order": order,
         "all_genres": all_genres,
         "all_regions": all_regions,
+        "genre_counts": genre_counts,
+        "region_counts": region_counts,
         "selected_genres": selected_genres,
         "selected_regions": selected_regions
     })
@@ -269,12 +349,15 @@ async def admin_policy_edit(request: Request, policy_id: int, db: Session = Depe
     if not policy:
         raise HTTPException(status_code=404, detail="Policy not found")
 
-    # Dropdown Options
-    all_genres_rows = db.query(models.Policy.genre).distinct().filter(models.Policy.genre != None).all()
-    all_genres = [r[0] for r in all_genres_rows if r[0]]
-
-    all_regions_rows = db.query(models.Policy.region).distinct().filter(models.Policy.region != None).all()
-    all_regions = sorted([r[0] for r in all_regions_rows if r[0]])
+    # Dropdown Options (캐시된 장르/지역 값 목록)
+    catalog_facets = facets.get_facets(db)
+    all_genres = [value for value, _ in catalog_facets.genres]
+    all_regions = [value for value, _ in catalog_facets.regions]
+    # 목록은 표준 이름이라, 표준이 아닌 값이 저장된 정책은 현재 값도 선택지에 넣어 그대로 저장되도록
+    if policy.genre and policy.genre not in all_genres:
+        all_genres.append(policy.genre)
+    if policy.region and policy.region not in all_regions:
+        all_regions.append(policy.region)
 
     return templates.TemplateResponse("admin/policy_edit.html", {
         "request": request,
@@ -302,13 +385,19 @@ async def admin_policy_update(
 
     policy = db.query(models.Policy).filter(models.Policy.id == policy_id).first()
     if policy:
+        # 장르가 바뀌면 이 정책에 남긴 유저 액션 카운터도 새 장르로 이동
+        move_policy_genre(db, policy.id, policy.genre_code, models.genre_code(genre))
         policy.title = title
         policy.summary = summary
         policy.period = period
         policy.link = link
         policy.genre = genre
         policy.region = region
+        search.index_policy(db, policy)  # 제목/요약이 바뀌었을 수 있으므로 검색 색인 갱신
+        index_policy_embedding(db, policy)  # "비슷한 정책" 임베딩도 갱신
+        bump_catalog_version(db)
         db.commit()
+        invalidate_catalog_version()
 
     return RedirectResponse(url="/admin/policies", status_code=303)
 
@@ -321,7 +410,10 @@ async def admin_policy_delete(request: Request, policy_id: int, db: Session = De
 
     policy = db.query(models.Policy).filter(models.Policy.id == policy_id).first()
     if policy:
+        search.remove_policy(db, policy.id)
         db.delete(policy)
+        bump_catalog_version(db)
         db.commit()
+        invalidate_catalog_version()
 
     return RedirectResponse(url="/admin/policies", status_code=303)
\ No newline at end of file
@@ -1,14 +1,19 @@
 import os
 import random
 from typing import Optional
-from fastapi import APIRouter, Request, Depends
-from fastapi.responses import HTMLResponse
+from fastapi import APIRouter, Request, Depends, HTTPException, Query
+from fastapi.responses import HTMLResponse, Response
 from fastapi.templating import Jinja2Templates
 from sqlalchemy.orm import Session
-from sqlalchemy import or_
 
 from database import SessionLocal
-from models import Policy, get_image_for_category
+from models import Policy, get_image_for_category, genre_code, region_code
+from services.pagination import SortKey, order_by_keys, apply_keyset, row_values, encode_cursor, decode_cursor
+from services.search import search_subquery, keyword_condition
+from services.catalog_snapshot import get_snapshot
+from services.cards import card_version, cards_array, json_object
+from services.conditional import catalog_validators
+from services.trending import current_trend_version
 
 # 라우터 생성
 router = APIRouter()
@@ -37,48 +42,51 @@ categoryColorMap = {
     "교육": "#4299E1", "교육/자격증": "#4299E1"
 }
 
-# 프론트엔드 카테고리 -> 데이터베이스 genre 매핑
-FRONT_TO_DB_CATEGORY = {
-    "취업": "취업/직무",
-    "주거": "주거/자립",
-    "금융": "금융/생활비",
-    "창업": "창업/사업",
-    "복지": "복지/문화",
-    "교육": "교육/자격증"
+# 정렬 모드별 키셋 정렬 키 (마지막 키는 항상 유일한 id → 커서 위치가 하나로 결정됨)
+CARD_SORT_KEYS = {
+    "latest": [SortKey(Policy.is_active, descending=True), SortKey(Policy.created_at, descending=True), SortKey(Policy.id)],
+    "popular": [SortKey(Policy.is_active, descending=True), SortKey(Policy.trend_score, descending=True), SortKey(Policy.view_count, descending=True), SortKey(Policy.id)],
+    "deadline": [SortKey(Policy.is_active, descending=True), SortKey(Policy.end_date), SortKey(Policy.id)],
+    "closed": [SortKey(Policy.end_date, descending=True), SortKey(Policy.id)],
+    "default": [SortKey(Policy.is_active, descending=True), SortKey(Policy.id)],
 }
 
-# 프론트엔드 지역 ID (SVG) -> DB 저장용 한글 명칭
-FRONT_TO_DB_REGION = {
-    'national': '전국',
-    'detail_seoul': '서울', 'detail_gyeonggi': '경기', 'detail_incheon': '인천',
-    'gangwon': '강원', 'chungbug': '충북', 'chungnam': '충남', 'detail_chungnam': '충남',
-    'jeonbug': '전북', 'jeonnam': '전남', 'detail_jeonnam': '전남',
-    'gyeongbug': '경북', 'detail_gyeongbug': '경북',
-    'gyeongnam': '경남', 'detail_gyeongnam': '경남',
-    'jeju': '제주',
-    'detail_busan': '부산', 'detail_daegu': '대구', 'detail_daejun': '대전',
-    'detail_gwangju': '광주', 'detail_ulsan': '울산', 'detail_saejong': '세종'
-}
+# 한 번에 내려주는 카드 수 (클라이언트가 더 크게 요청해도 MAX로 잘림)
+DEFAULT_CARDS_PAGE_SIZE = 12
+MAX_CARDS_PAGE_SIZE = 100
 
-def normalize_region_name(input_str: str) -> str:
+def serialize_card(p) -> dict:
     """
-    JSON 파일 로딩 시 '전라남도' -> '전남' 등으로 변환.
-    프론트에서 오는 ID ('detail_seoul')도 '서울'로 변환.
+    정책 1건 → 전체보기 카드 JSON
+    (Policy 객체와 스냅샷 행(PolicyRow) 모두 같은 속성 이름을 가지므로 그대로 사용)
     """
-    if not input_str:
-        return "전국"
-    
-    # 1. 프론트 ID인 경우 매핑 테이블 사용
-    if input_str in FRONT_TO_DB_REGION:
-        return FRONT_TO_DB_REGION[input_str]
-        
-    # 2. 한글 긴 이름인 경우 (앞 2글자로 축약)
-    if len(input_str) >= 2:
-        return input_str[:2]
-        
-    return input_str
-
+    # 날짜 포맷팅
+    date_str = "상시 모집"
+    try:
+        if p.end_date:
+            # end_date가 있으면 마감일 표시
+            if isinstance(p.end_date, str):
+                date_str = f"{p.end_date} 마감"
+            else:
+                date_str = f"{p.end_date.strftime('%Y.%m.%d')} 마감"
+        elif p.period:
+            date_str = p.period
+    except Exception as e:
+        # 날짜 포맷팅 오류 시 period 사용
+        date_str = p.period or "상시 모집"
 
+    return {
+        "id": p.id,
+        "title": p.title or "",
+        "desc": p.summary or "상세 내용을 확인하세요.",
+        "category": p.genre or "기타",
+        "date": date_str,
+        "image": get_image_for_category(p.genre, p.id),  # 정책 id 기준 고정 이미지
+        "link": p.link or "#",
+        "region": p.region or "전국",
+        "colorCode": categoryColorMap.get(p.genre or "", "#777777"),
+        "is_active": p.is_active  # [NEW] 프론트엔드에서 마감 배지 표시 등에 사용
+    }
 
 # ==================== [라우터 엔드포인트] ====================
 
@@ -90,105 +98,128 @@ async def read_all_policies(request: Request):
 # 정책 카드 데이터 조회 API (전체보기 페이지용)
 @router.get("/api/cards")
 async def api_get_cards(
+    request: Request,
     region: Optional[str] = None,  # 지역 필터
     category: Optional[str] = None,  # 카테고리 필터
     keyword: Optional[str] = None,  # 검색 키워드
-    sort: Optional[str] = None,  # 정렬: 'latest', 'popular', 'deadline'
+    sort: Optional[str] = None,  # 정렬: 'latest', 'popular', 'deadline' (키워드 검색 시 기본은 관련도순)
+    cursor: Optional[str] = None,  # 이전 응답의 next_cursor (첫 페이지는 생략)
+    limit: int = Query(DEFAULT_CARDS_PAGE_SIZE, ge=1),  # 페이지 크기 (최대 MAX_CARDS_PAGE_SIZE)
     db: Session = Depends(get_db)
 ):
     """
     전체보기(All) 페이지용 API
     category 또는 keyword로 검색, sort로 정렬, region으로 지역 필터링
+    키셋 페이지네이션: {"items": [...], "next_cursor": "..." | null, "limit": n}
+    카탈로그 버전 기반 ETag → 변경이 없으면 304 (DB 조회 없음)
     """
-    query = db.query(Policy)
-    
-    # 지역 필터링 (전체보기 페이지용)
+    sort_name = sort if sort in CARD_SORT_KEYS else "default"
+
+    # 인기순은 트렌드 점수가 갱신되면 결과가 바뀌므로 트렌드 버전도 ETag에 포함
+    # (키워드 없으면 스냅샷이 들고 있는 점수 버전 = 실제로 응답에 쓰인 점수)
+    trend_tag = ""
+    if sort_name == "popular":
+        trend_tag = f"t{current_trend_version(db) if keyword else get_snapshot(db).trend_version}"
+    validators = catalog_validators(request, db, "cards", trend_tag)
+    if validators.matches(request):
+        return validators.not_modified()
+
+    sort_keys = CARD_SORT_KEYS[sort_name]
+
+    # 키워드 검색 + 별도 정렬 없음 → n-gram 색인 점수 기준 관련도순
+    matches = search_subquery(keyword) if keyword else None
+    if matches is not None and sort_name == "default":
+        sort_name = "relevance"
+        sort_keys = [
+            SortKey(Policy.is_active, descending=True),
+            SortKey(matches.c.score, descending=True),
+            SortKey(matches.c.policy_id),
+        ]
+    limit = min(limit, MAX_CARDS_PAGE_SIZE)
+
+    cursor_values = None
+    if cursor:
+        try:
+            cursor_values = decode_cursor(cursor, sort_name, len(sort_keys))
+        except ValueError:
+            raise HTTPException(status_code=400, detail="잘못된 커서입니다.")
+
+    # 지역 필터링 (전체보기 페이지용) - 표준 지역 코드로 변환 ('전라남도', 'detail_seoul' → 코드)
+    # 사전에 없는 지역/카테고리가 오면 일치하는 정책 없음 (unknown_filter)
+    region_value = None
+    unknown_filter = False
     if region and region != 'national' and region != '전체':
-        if region == '전국':
-            # 전국 선택 시: region="전국"인 정책만 필터링
-            query = query.filter(Policy.region == '전국')
-            print(f"🗺️ 지역 필터링: 전국 (region='전국'인 정책만)")
-        else:
-            # 특정 지역 선택 시: 해당 지역의 정책만 필터링
-            norm_region = normalize_region_name(region)
-            query = query.filter(Policy.region == norm_region)
-            print(f"🗺️ 지역 필터링: '{region}' -> '{norm_region}'")
+        # '전국' 선택 시 region="전국"인 정책만, 특정 지역 선택 시 해당 지역 정책만
+        region_value = region_code(region)
+        unknown_filter = region_value is None
+        print(f"🗺️ 지역 필터링: '{region}' -> {region_value}")
     else:
         # 전체 선택 시: 필터링 없음 (모든 지역 포함)
         print(f"🗺️ 지역 필터링: 전체 (필터링 없음)")
     
-    # 카테고리 필터링
+    # 카테고리 필터링 - 프론트엔드 카테고리('취업')를 장르 코드로 변환
+    db_category = None
     if category and category != 'all':
-        # 프론트엔드 카테고리를 DB genre 값으로 매핑
-        db_category = FRONT_TO_DB_CATEGORY.get(category, category)
-        # 정확한 매칭으로 필터링
-        query = query.filter(Policy.genre == db_category)
-        print(f"🔍 카테고리 필터링: '{category}' -> '{db_category}'")
-    
-    # 키워드 검색
-    if keyword:
-        search_pattern = f"%{keyword}%"
-        query = query.filter(or_(
-            Policy.title.like(search_pattern),
-            Policy.summary.like(search_pattern)
-        ))
-        print(f"🔎 키워드 검색: '{keyword}'")
-    
+        db_category = genre_code(category)
+        unknown_filter = unknown_filter or db_category is None
+        print(f"🔍 카테고리 필터링: '{category}' -> {db_category}")
+
     # 정렬 기능 - [수정] 모든 정렬 기준에 '모집 중(is_active=True)' 우선 적용
-    if sort == 'latest':
-        # 최신순: 모집중 우선 -> 생성일 내림차순
-        query = query.order_by(Policy.is_active.desc(), Policy.created_at.desc().nulls_last())
-        print(f"📅 정렬: 최신순 (Active First -> created_at DESC)")
-    elif sort == 'popular':
-        # 인기순: 모집중 우선 -> 조회수 내림차순
-        query = query.order_by(Policy.is_active.desc(), Policy.view_count.desc().nulls_last())
-        print(f"🔥 정렬: 인기순 (Active First -> view_count DESC)")
-    elif sort == 'deadline':
-        # 마감순: 모집중 우선 -> 마감 임박순 (end_date 오름차순)
-        query = query.order_by(Policy.is_active.desc(), Policy.end_date.asc().nulls_last())
-        print(f"⏰ 정렬: 마감순 (Active First -> end_date ASC)")
-    elif sort == 'closed':
-        # [NEW] 마감 정책 탭: 마감된 정책(is_active=False)만 모아보기
-        # 마감된 정책만 필터링 후, 최신 마감일 순(최근에 끝난 것부터)으로 정렬
-        query = query.filter(Policy.is_active == False).order_by(Policy.end_date.desc().nulls_last())
-        print(f"🚫 정렬: 마감 정책 (is_active=False Only -> end_date DESC)")
+    # latest: 생성일 내림차순 / popular: 트렌드 점수(최근 반응) → 조회수 내림차순 / deadline: 마감일 오름차순
+    # closed: 마감된 정책(is_active=False)만, 최근에 끝난 것부터 / 기본: id 오름차순
+    # (각 정렬의 마지막 키는 id → 동순위 정책도 페이지 경계에서 빠지거나 겹치지 않음)
+    print(f"📋 정렬: {sort_name}")
+
+    if unknown_filter:
+        policies, has_more, last_values = [], False, None
+    elif not keyword:
+        # [NEW] 키워드가 없으면 메모리 스냅샷에서 바로 조회 (DB 조회 없음)
+        snapshot = get_snapshot(db)
+        policies, has_more = snapshot.query(
+            sort_name, sort_keys,
+            region=region_value,
+            genre=db_category,
+            closed_only=(sort_name == 'closed'),
+            cursor_values=cursor_values,
+            limit=limit,
+        )
+        last_values = snapshot.cursor_values(policies[-1], sort_keys) if policies else None
     else:
-        # 기본 정렬: 모집중 우선 -> ID 오름차순
-        query = query.order_by(Policy.is_active.desc(), Policy.id.asc())
-        print(f"📋 정렬: 기본 (Active First -> id ASC)")
-    
-    # 전체보기 페이지에서는 모든 데이터를 가져옴
-    policies = query.all()
-
-    # JSON 응답 포맷 (프론트엔드와 호환)
-    result = []
-    for p in policies:
-        # 날짜 포맷팅
-        date_str = "상시 모집"
-        try:
-            if p.end_date:
-                # end_date가 있으면 마감일 표시
-                if isinstance(p.end_date, str):
-                    date_str = f"{p.end_date} 마감"
-                else:
-                    date_str = f"{p.end_date.strftime('%Y.%m.%d')} 마감"
-            elif p.period:
-                date_str = p.period
-        except Exception as e:
-            # 날짜 포맷팅 오류 시 period 사용
-            date_str = p.period or "상시 모집"
-        
-        result.append({
-            "id": p.id,
-            "title": p.title or "",
-            "desc": p.summary or "상세 내용을 확인하세요.",
-            "category": p.genre or "기타",
-            "date": date_str,
-            "image": get_image_for_category(p.genre),  # 랜덤 이미지 할당
-            "link": p.link or "#",
-            "region": p.region or "전국",
-            "colorCode": categoryColorMap.get(p.genre or "", "#777777"),
-            "is_active": p.is_active  # [NEW] 프론트엔드에서 마감 배지 표시 등에 사용
-        })
-    
-    return result
+        # 키워드 검색은 n-gram 색인이 있는 DB에서 처리
+        print(f"🔎 키워드 검색: '{keyword}'")
+        if sort_name == "relevance":
+            # 관련도순: 색인 점수 서브쿼리와 join
+            query = db.query(Policy, Policy.is_active, matches.c.score, matches.c.policy_id)\
+                .join(matches, matches.c.policy_id == Policy.id)
+        else:
+            query = db.query(Policy).filter(keyword_condition(keyword))
+
+        if region_value is not None:
+            query = query.filter(Policy.region_code == region_value)
+        if db_category is not None:
+            query = query.filter(Policy.genre_code == db_category)
+        if sort_name == 'closed':
+            query = query.filter(Policy.is_active == False)
+        query = order_by_keys(query, sort_keys)
+
+        # 커서 이후의 행만 (OFFSET 없이 인덱스 범위로 이어 읽기)
+        if cursor_values is not None:
+            query = apply_keyset(query, sort_keys, cursor_values)
+
+        # 다음 페이지 존재 여부 확인용으로 1개 더 가져옴
+        rows = query.limit(limit + 1).all()
+        has_more = len(rows) > limit
+        rows = rows[:limit]
+        policies = [r[0] for r in rows] if sort_name == "relevance" else rows
+        last_values = row_values(rows[-1], sort_keys) if rows else None
+
+    next_cursor = None
+    if has_more and last_values is not None:
+        next_cursor = encode_cursor(sort_name, last_values)
+
+    # JSON 응답 포맷 (프론트엔드와 호환) - 정책별로 캐시된 카드 JSON 조각을 이어 붙임
+    items = cards_array("all", serialize_card, policies, card_version(db))
+    return validators.apply(Response(
+        content=json_object(items=items, next_cursor=next_cursor, limit=limit),
+        media_type="application/json",
+    ))
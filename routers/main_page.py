@@ -1,47 +1,23 @@
-from fastapi import APIRouter, Request, Depends
+from fastapi import APIRouter, BackgroundTasks, Request, Depends
+from fastapi.responses import Response
 from fastapi.templating import Jinja2Templates
+from markupsafe import Markup
 from sqlalchemy.orm import Session
-from sqlalchemy.sql.expression import func
 from typing import Optional
 import os
-import random
-import json  # [추가] JSON 변환을 위해 필요
+import time
 
 from database import get_db
-from models import Policy, categoryColorMap, get_image_for_category
+from models import NATIONWIDE_CODE, categoryColorMap, get_image_for_category, region_code
+from services.cards import card_version, cards_array, json_object
+from services.deck_prefetch import prefetch_next_deck, take_prefetched, timed_build_deck
+from services.seen_set import load_seen, mark_seen, new_token, SeenBitmap
 
 router = APIRouter(tags=["main"])
 
 BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 templates = Jinja2Templates(directory=os.path.join(BASE_DIR, "templates"))
 
-# [헬퍼 함수] 랜딩페이지 지역 ID를 DB 지역명으로 변환
-def convert_region_id_to_db_name(region_id: str) -> Optional[str]:
-    """
-    랜딩페이지 지역 ID를 DB 지역명으로 변환
-    예: 'detail_seoul' -> '서울', 'detail_chungnam' -> '충남'
-    """
-    region_id_to_db_name = {
-        'detail_seoul': '서울',
-        'detail_incheon': '인천',
-        'detail_gyeonggi': '경기',
-        'detail_daejun': '대전',
-        'detail_saejong': '세종',
-        'detail_chungnam': '충남',
-        'detail_gwangju': '광주',
-        'detail_jeonnam': '전남',
-        'detail_daegu': '대구',
-        'detail_gyeongbug': '경북',
-        'detail_busan': '부산',
-        'detail_ulsan': '울산',
-        'detail_gyeongnam': '경남',
-        'gangwon': '강원',
-        'chungbug': '충북',
-        'jeonbug': '전북',
-        'jeju': '제주'
-    }
-    return region_id_to_db_name.get(region_id, None)
-
 # [헬퍼 함수] SQLAlchemy 객체를 안전한 Dict로 변환
 def serialize_policy(policy):
     return {
@@ -51,12 +27,31 @@ def serialize_policy(policy):
         "summary": (policy.summary or "").replace("\n", " ").replace("\r", ""), 
         "genre": policy.genre,
         "period": policy.period or "상시 모집",
-        "image": get_image_for_category(policy.genre), # 여기서 이미지 결정
+        "image": get_image_for_category(policy.genre, policy.id), # 여기서 이미지 결정 (정책 id 기준 고정)
         "link": policy.link or "",
         "region": policy.region or "전국",
         "colorCode": categoryColorMap.get((policy.genre or "")[:2], '#777777')
     }
 
+# [헬퍼 함수] 지역 필터 설정: 선택한 지역 + 전국 (표준 지역 코드 목록)
+# 랜딩페이지 지역 ID('detail_seoul' 등)는 models.REGION_ALIASES로 변환
+def get_filter_regions(region: Optional[str]) -> list:
+    filter_regions = [NATIONWIDE_CODE]  # 기본값: 전국만
+    if region:
+        code = region_code(region)
+        if code is not None and code != NATIONWIDE_CODE:
+            filter_regions = [code, NATIONWIDE_CODE]  # 선택 지역 + 전국
+    return filter_regions
+
+# [헬퍼 함수] 제외할 ID 목록 파싱 (쉼표로 구분된 문자열 -> set)
+def parse_exclude_ids(exclude_ids: Optional[str]) -> set:
+    if not exclude_ids:
+        return set()
+    try:
+        return {int(id.strip()) for id in exclude_ids.split(',') if id.strip()}
+    except ValueError:
+        return set()
+
 @router.get("/main.html")
 async def read_main(
     request: Request, 
@@ -64,113 +59,86 @@ async def read_main(
     exclude_ids: Optional[str] = None,  # 새로 추가: 쉼표로 구분된 ID 문자열
     db: Session = Depends(get_db)
 ):
-    target_categories = ["취업", "창업", "주거", "금융", "교육", "복지"]
-    all_picks = []
+    # 1~3. 카테고리별 3개씩 랜덤 추출 + 섞기, 슬라이드용 20개 (지역 필터 적용, 한 번에 추출)
+    all_picks, slider_policies, _ = timed_build_deck(
+        db, get_filter_regions(region), parse_exclude_ids(exclude_ids), slider_size=20
+    )
     
-    # 지역 필터 설정: 선택한 지역 + 전국
-    filter_regions = ['전국']  # 기본값: 전국만
-    if region:
-        db_region_name = convert_region_id_to_db_name(region)
-        if db_region_name:
-            filter_regions = [db_region_name, '전국']  # 선택 지역 + 전국
-    
-    # 제외할 ID 목록 파싱
-    exclude_id_list = []
-    if exclude_ids:
-        try:
-            exclude_id_list = [int(id.strip()) for id in exclude_ids.split(',') if id.strip()]
-        except ValueError:
-            exclude_id_list = []
-    
-    # 1. 카테고리별 랜덤 추출 (지역 필터 적용)
-    for cat in target_categories:
-        query = db.query(Policy)\
-            .filter(Policy.genre.contains(cat))\
-            .filter(Policy.region.in_(filter_regions))
-        
-        # 제외할 ID가 있으면 필터 추가
-        if exclude_id_list:
-            query = query.filter(~Policy.id.in_(exclude_id_list))
-        
-        policies = query\
-            .order_by(func.random())\
-            .limit(3)\
-            .all()
-        all_picks.extend(policies)
-
-    # 2. 섞기
-    random.shuffle(all_picks)
-        
-    # 3. 슬라이드용 데이터 (지역 필터 적용)
-    slider_policies = db.query(Policy)\
-        .filter(Policy.region.in_(filter_regions))\
-        .order_by(func.random())\
-        .limit(20)\
-        .all()
-    
-    # [핵심 수정] 객체를 Dict 리스트로 변환 (직렬화)
-    tinder_data_list = [serialize_policy(p) for p in all_picks]
-    slider_data_list = [serialize_policy(p) for p in slider_policies]
+    # [핵심 수정] 객체를 JSON으로 변환 (정책별 캐시된 카드 조각 사용)
+    version = card_version(db)
+    tinder_data_json = cards_array("main", serialize_policy, all_picks, version)
+    slider_data_json = cards_array("main", serialize_policy, slider_policies, version)
 
     # 4. 템플릿 렌더링 (데이터를 JSON 그대로 넘김)
     return templates.TemplateResponse("main.html", {
         "request": request,
-        # [중요] 여기서 Python 리스트를 그대로 넘깁니다. 
-        # HTML에서 tojson 필터를 쓰면 안전하게 변환됩니다.
-        "tinder_data_list": tinder_data_list,
-        "slider_data_list": slider_data_list
+        # [중요] 카드 조각은 tojson과 같은 방식으로 이미 HTML-safe 하게 인코딩되어 있으므로
+        # Markup으로 감싸 그대로 <script>에 넣습니다.
+        "tinder_data_json": Markup(tinder_data_json.decode("utf-8")),
+        "slider_data_json": Markup(slider_data_json.decode("utf-8"))
     })
 
+# [헬퍼 함수] 세션 토큰의 "이미 본 정책" 비트맵 (없거나 만료됐으면 새 토큰 발급) + 현재 화면 카드 추가
+def resolve_seen(db: Session, deck_token: Optional[str], exclude_ids: Optional[str]):
+    seen = load_seen(db, deck_token)
+    if seen is None:
+        deck_token, seen = new_token(), SeenBitmap()
+    seen.update(parse_exclude_ids(exclude_ids))
+    return deck_token, seen
+
+@router.post("/api/main/more-cards/prefetch")
+async def prefetch_more_cards(
+    background_tasks: BackgroundTasks,
+    region: Optional[str] = None,
+    exclude_ids: Optional[str] = None,  # 현재 화면의 카드 ID 목록
+    deck_token: Optional[str] = None,
+    db: Session = Depends(get_db)
+):
+    """
+    메인 페이지 로드 직후 호출: 현재 카드를 본 것으로 기록하고 다음 덱을 백그라운드에서 미리 생성
+    (이후 더보기 요청은 만들어 둔 덱을 바로 꺼내 씀)
+    """
+    deck_token, seen = resolve_seen(db, deck_token, exclude_ids)
+    mark_seen(db, deck_token, [], seen)
+    background_tasks.add_task(prefetch_next_deck, deck_token, get_filter_regions(region))
+    return {"deck_token": deck_token}
+
 @router.get("/api/main/more-cards")
 async def get_more_cards(
     request: Request,
+    background_tasks: BackgroundTasks,
     region: Optional[str] = None,
-    exclude_ids: Optional[str] = None,  # 쉼표로 구분된 ID 목록
+    exclude_ids: Optional[str] = None,  # 쉼표로 구분된 ID 목록 (현재 화면의 카드만 보내면 됨)
+    deck_token: Optional[str] = None,  # 세션 토큰: 서버에 저장된 "이미 본 정책" 비트맵
     db: Session = Depends(get_db)
 ):
     """
     스와이프 카드 더보기 API
     기존 read_main과 동일한 로직으로 카테고리별 3개씩 총 18개 정책 반환
-    exclude_ids가 있으면 해당 ID를 제외
+    - deck_token의 비트맵 + exclude_ids에 있는 정책은 제외
+    - 이번에 내려준 카드도 비트맵에 기록하고, (새로 발급됐을 수 있는) 토큰을 같이 반환
+    - 미리 만들어 둔 덱이 있으면 그대로 사용하고, 응답 후 다음 덱을 다시 미리 만듦
     """
-    target_categories = ["취업", "창업", "주거", "금융", "교육", "복지"]
-    all_picks = []
-    
-    # 지역 필터 설정: 선택한 지역 + 전국
-    filter_regions = ['전국']  # 기본값: 전국만
-    if region:
-        db_region_name = convert_region_id_to_db_name(region)
-        if db_region_name:
-            filter_regions = [db_region_name, '전국']  # 선택 지역 + 전국
-    
-    # 제외할 ID 목록 파싱
-    exclude_id_list = []
-    if exclude_ids:
-        try:
-            exclude_id_list = [int(id.strip()) for id in exclude_ids.split(',') if id.strip()]
-        except ValueError:
-            exclude_id_list = []
-    
-    # 1. 카테고리별 랜덤 추출 (지역 필터 및 제외 ID 적용)
-    for cat in target_categories:
-        query = db.query(Policy)\
-            .filter(Policy.genre.contains(cat))\
-            .filter(Policy.region.in_(filter_regions))
-        
-        # 제외할 ID가 있으면 필터 추가
-        if exclude_id_list:
-            query = query.filter(~Policy.id.in_(exclude_id_list))
-        
-        policies = query\
-            .order_by(func.random())\
-            .limit(3)\
-            .all()
-        all_picks.extend(policies)
-    
-    # 2. 섞기
-    random.shuffle(all_picks)
-    
-    # 3. 직렬화
-    cards_list = [serialize_policy(p) for p in all_picks]
-    
-    return {"cards": cards_list}
\ No newline at end of file
+    # 1. 세션의 "이미 본 정책" 불러오기
+    deck_token, seen = resolve_seen(db, deck_token, exclude_ids)
+    filter_regions = get_filter_regions(region)
+
+    # 2. 미리 만든 덱 꺼내기 → 없으면 카테고리별 랜덤 추출 + 섞기 (지역 필터 및 본 정책 제외)
+    started = time.perf_counter()
+    all_picks = take_prefetched(db, deck_token, filter_regions, seen)
+    source = "prefetch"
+    if all_picks is None:
+        all_picks, _, _ = timed_build_deck(db, filter_regions, seen)
+        source = "build"
+    elapsed_ms = (time.perf_counter() - started) * 1000
+    mark_seen(db, deck_token, [p.id for p in all_picks], seen)
+
+    # 3. 응답이 나간 뒤 다음 덱 미리 만들기
+    background_tasks.add_task(prefetch_next_deck, deck_token, filter_regions)
+
+    # 4. 직렬화 (정책별 캐시된 카드 조각 이어 붙이기)
+    cards_json = cards_array("main", serialize_policy, all_picks, card_version(db))
+
+    response = Response(content=json_object(cards=cards_json, deck_token=deck_token), media_type="application/json")
+    response.headers["Server-Timing"] = f'deck;dur={elapsed_ms:.1f};desc="{source}"'
+    return response
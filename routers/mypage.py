@@ -1,12 +1,22 @@
-from fastapi import APIRouter, Depends, HTTPException, Request
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, Request
+from fastapi.responses import Response
 from sqlalchemy.orm import Session
-from sqlalchemy import func
+from sqlalchemy import func, select
 from pydantic import BaseModel
 from typing import List, Optional
 import os
 from datetime import datetime, date, timedelta
 from database import get_db
-from models import UserAction, Policy, User, categoryColorMap, get_image_for_category, FRONT_TO_DB_CATEGORY, normalize_region_name
+from models import UserAction, UserCategoryStat, Policy, User, categoryColorMap, get_image_for_category, FRONT_TO_DB_CATEGORY, GENRE_SHORT_CODES, NATIONWIDE_CODE, genre_code, region_code
+from services.search import keyword_condition
+from services.pagination import SortKey, order_by_keys, apply_keyset, encode_cursor, decode_cursor
+from services.cards import card_version, cards_array, json_object
+from services.action_buffer import BUFFERED_TYPES, action_buffer, flush_actions
+from services.alert_feed import invalidate_alert_feeds
+from services.catalog_snapshot import get_snapshot
+from services.category_stats import OTHER_BUCKET, get_category_stats, record_action, remove_actions
+from services.user_actions import insert_like
+from services.liked_set import is_liked, liked_added, liked_bitmap, liked_ids, liked_removed
 
 # 라우터 설정 (태그 및 프리픽스 설정)
 router = APIRouter(prefix="/api/mypage", tags=["mypage"])
@@ -18,6 +28,12 @@ class ActionCreate(BaseModel):
     policy_id: int
     type: str  # 'like', 'pass' 등
 
+class ActionBatch(BaseModel):
+    actions: List[ActionCreate]  # 스와이프 액션 여러 건 ('like', 'pass'만)
+
+# 일괄 액션 요청 한 번에 받는 최대 건수
+MAX_BATCH_ACTIONS = 500
+
 class PolicyDto(BaseModel):
     id: int
     title: str
@@ -138,36 +154,21 @@ MBTI_DEFINITIONS = {
     }
 }
 
-def calculate_mbti_result(user_email: str, db: Session):
-    # 1. 유저의 Like 데이터 조회
-    acciones = db.query(Policy.genre)\
-        .join(UserAction, UserAction.policy_id == Policy.id)\
-        .filter(UserAction.user_email == user_email, UserAction.type == 'like')\
-        .all()
-    
-    if not acciones:
+def calculate_mbti_result(genre_counts: dict):
+    """
+    장르 코드별 찜 개수({genre_code: count}) → 정책 MBTI 결과
+    (프로필 집계 쿼리에서 이미 장르별로 센 값을 받으므로 찜 목록을 다시 읽지 않음)
+    """
+    if not genre_counts:
         return None 
         
-    # 2. 점수 집계
+    # 1. 점수 집계 (카테고리 순서 = 동점일 때 우선순위)
     scores = {}
     base_categories = ["취업", "창업", "주거", "금융", "교육", "복지"]
     for cat in base_categories:
-        scores[cat] = 0
-        
-    for (genre,) in acciones:
-        if not genre: continue
-        key = "기타"
-        if "취업" in genre: key = "취업"
-        elif "창업" in genre: key = "창업"
-        elif "주거" in genre: key = "주거"
-        elif "금융" in genre: key = "금융"
-        elif "교육" in genre: key = "교육"
-        elif "복지" in genre: key = "복지"
-        
-        if key in scores:
-            scores[key] += 1
+        scores[cat] = genre_counts.get(GENRE_SHORT_CODES[cat], 0)
             
-    # 3. 정렬 및 매핑
+    # 2. 정렬 및 매핑
     sorted_scores = sorted(scores.items(), key=lambda x: x[1], reverse=True)
     primary = sorted_scores[0][0]
     secondary = sorted_scores[1][0]
@@ -197,10 +198,32 @@ def calculate_mbti_result(user_email: str, db: Session):
         "교육": "growth", # 파일명은 growth 사용
         "복지": "welfare"
     }
-    # 1순위 기준 매핑, 없으면 welfare
-    result["category_code"] = cat_code_map.get(primary, "welfare")
-        
-    return result
+    # 1순위 기준 매핑, 없으면 welfare (공용 정의 dict는 건드리지 않도록 복사)
+    return {**result, "category_code": cat_code_map.get(primary, "welfare")}
+
+def serialize_liked_policy(policy):
+    """찜 목록 카드 포맷 (마감 여부는 오늘 날짜 기준 → 카드 캐시 버전에 날짜 포함)"""
+    today = date.today()
+
+    # Date Processing
+    date_str = "상시 모집"
+    if policy.end_date:
+        date_str = f"{policy.end_date} 마감"
+    elif policy.period:
+        date_str = policy.period
+
+    return {
+        "id": policy.id,
+        "title": policy.title,
+        "summary": policy.summary or "상세 내용을 확인하세요.",
+        "genre": policy.genre or "기타",
+        "period": date_str,
+        "image": get_image_for_category(policy.genre, policy.id),
+        "link": policy.link or "#",
+        "region": policy.region or "전국",
+        # Add is_active flag for frontend UI (gray out closed)
+        "is_active": not (policy.end_date and policy.end_date < today) if policy.end_date else True
+    }
 
 class IconUpdate(BaseModel):
     user_email: str
@@ -210,6 +233,22 @@ class LikeDeleteRequest(BaseModel):
     user_email: str
     policy_ids: List[int]
 
+class LikedLookup(BaseModel):
+    user_email: str
+    policy_ids: List[int]  # 화면에 보이는 카드들의 정책 id
+
+# 찜 여부 일괄 조회 한 번에 받는 최대 id 수
+MAX_LIKED_LOOKUP = 500
+
+# 찜 목록 키셋 모드 정렬 키 (마지막 키는 찜 id → 같은 시각/마감일이어도 페이지 경계에서 빠지거나 겹치지 않음)
+# popular 등 그 외 정렬은 기존과 같이 최근 찜한 순
+LIKED_SORT_KEYS = {
+    "latest": [SortKey(UserAction.created_at, descending=True), SortKey(UserAction.id, descending=True)],
+    "deadline": [SortKey(Policy.end_date), SortKey(UserAction.id, descending=True)],
+    "closed": [SortKey(Policy.end_date, descending=True), SortKey(UserAction.id, descending=True)],
+}
+MAX_LIKES_PAGE_SIZE = 100
+
 # ==================== [API 엔드포인트] ====================
 
 # 4. 사용자 프로필 및 활동 지수 조회 (우선 배치)
@@ -217,40 +256,49 @@ class LikeDeleteRequest(BaseModel):
 def get_user_profile(user_email: str, db: Session = Depends(get_db)):
     """
     사용자 기본 정보(이름, 이메일, 지역)와 활동 지수(레벨, 뱃지)를 반환합니다.
+    유저 + 장르별 찜 카운터(user_category_stats) + D-7 마감 임박 수를 쿼리 한 번으로,
+    지역 정책 수는 카탈로그 스냅샷의 지역별 개수로 계산 (찜이 수천 개여도 읽는 행은 장르 수만큼)
     """
-    # 1. 유저 정보 조회
-    user = db.query(User).filter(User.email == user_email).first()
+    # 1. 유저 정보 + 장르별 찜 수 (카운터 행이 없으면 genre_code=None인 행 하나)
+    today = date.today()
+    deadline = today + timedelta(days=7)
+    closing_soon = select(func.count(UserAction.id))\
+        .join(Policy, UserAction.policy_id == Policy.id)\
+        .where(
+            UserAction.user_email == User.email,
+            UserAction.type == 'like',
+            Policy.end_date >= today,
+            Policy.end_date <= deadline
+        ).correlate(User).scalar_subquery()
+    rows = db.query(User, UserCategoryStat.genre_code, UserCategoryStat.likes, closing_soon)\
+        .outerjoin(UserCategoryStat, UserCategoryStat.user_email == User.email)\
+        .filter(User.email == user_email)\
+        .all()
     
-    if not user:
+    if not rows:
         # 유저가 없으면 에러보다는 기본값 반환 (로그인 세션 문제일 수 있음)
         return {"error": "User not found", "name": "알 수 없음", "region": "지역 미설정"}
 
-    # 2. 활동 지수 계산 분모: 해당 지역 정책 개수
+    user, closing_soon_count = rows[0][0], rows[0][3]
+    genre_counts = {genre: likes for _, genre, likes, _ in rows if genre is not None and likes}
+    like_count = sum(likes or 0 for _, _, likes, _ in rows)  # 기타 버킷(장르 모름/삭제된 정책) 포함
+
+    # 2. 활동 지수 계산 분모: 해당 지역(+전국) 정책 개수 (스냅샷의 지역별 개수, DB 조회 없음)
     user_region = user.region or "전국"
-    search_region = normalize_region_name(user_region)
-    
-    # 지역 정책 개수
-    if search_region == "전국":
-        total_policies = db.query(Policy).count()
+    search_region = user.region_code if user.region_code is not None else region_code(user.region)
+    snapshot = get_snapshot(db)
+    if search_region is None or search_region == NATIONWIDE_CODE:
+        total_policies = snapshot.size
     else:
-        from sqlalchemy import or_
-        total_policies = db.query(Policy).filter(
-            or_(Policy.region.like(f"%{search_region}%"), Policy.region == "전국")
-        ).count()
+        total_policies = snapshot.region_count([search_region, NATIONWIDE_CODE])
         
     if total_policies == 0:
         total_policies = 1
 
-    # 3. 활동 지수 계산 분자: 내가 찜한 활동 개수
-    like_count = db.query(UserAction).filter(
-        UserAction.user_email == user_email, 
-        UserAction.type == 'like'
-    ).count()
-
-    # 4. 퍼센트 계산
+    # 3. 퍼센트 계산
     percentage = int((like_count / total_policies) * 100)
     
-    # 5. 레벨 및 칭호 부여
+    # 4. 레벨 및 칭호 부여
     level_badge = "#정책_기웃러 👀"
     if percentage >= 100:
         level_badge = "#정책_오지라퍼 🗣️📢"
@@ -261,19 +309,6 @@ def get_user_profile(user_email: str, db: Session = Depends(get_db)):
     elif percentage >= 11:
         level_badge = "#혜택_줍줍러 🍬"
 
-    # [NEW] 마감 임박 (D-7) 개수 계산
-    today = date.today()
-    deadline = today + timedelta(days=7)
-    
-    closing_soon_count = db.query(UserAction)\
-        .join(Policy, UserAction.policy_id == Policy.id)\
-        .filter(
-            UserAction.user_email == user_email,
-            UserAction.type == 'like',
-            Policy.end_date >= today,
-            Policy.end_date <= deadline
-        ).count()
-        
     return {
         "name": user.name,
         "email": user.email,
@@ -285,7 +320,7 @@ def get_user_profile(user_email: str, db: Session = Depends(get_db)):
         "apply_count": 0,
         "closing_soon_count": closing_soon_count, # [NEW]
         "profile_icon": user.profile_icon or "avatar_1",
-        "mbti": calculate_mbti_result(user_email, db)
+        "mbti": calculate_mbti_result(genre_counts)
     }
 
 # 5. 프로필 아이콘 변경
@@ -306,51 +341,92 @@ def save_user_action(action: ActionCreate, db: Session = Depends(get_db)):
     """
     사용자의 스와이프 액션(like/pass) 또는 모달 찜하기(like/unlike)를 처리합니다.
     """
-    # 1. 좋아요 취소 (unlike) 처리
+    # 1. 좋아요 취소 (unlike) 처리 - DELETE 한 문장, 실제로 지운 행이 있을 때만 상태 변화
     if action.type == 'unlike':
-        db.query(UserAction).filter(
-            UserAction.user_email == action.user_email,
-            UserAction.policy_id == action.policy_id,
-            UserAction.type == 'like'
-        ).delete()
+        discarded = action_buffer.discard(action.user_email, [action.policy_id])  # 버퍼에 남은 같은 찜이 나중에 저장되지 않도록
+        changed = remove_actions(db, action.user_email, 'like', [action.policy_id]) > 0  # 장르별 카운터도 함께 -1
+        if changed:
+            invalidate_alert_feeds(db, [action.user_email])  # 찜 목록이 바뀌었으니 다음 조회 때 알림 피드 재계산
         db.commit()
-        return {"message": "Like removed"}
+        if changed:
+            liked_removed(action.user_email, [action.policy_id])
+        changed = changed or discarded > 0  # 아직 저장 전이던 찜을 취소한 경우도 상태 변화
+        return {"message": "Like removed" if changed else "Not liked", "changed": changed}
 
-    # 2. 좋아요 (like) 중복 방지 처리
+    # 2. 좋아요 (like) - INSERT ... ON CONFLICT DO NOTHING 한 문장 (uq_users_action_like로 중복 방지)
     if action.type == 'like':
-        existing = db.query(UserAction).filter(
-            UserAction.user_email == action.user_email,
-            UserAction.policy_id == action.policy_id,
-            UserAction.type == 'like'
-        ).first()
-        
-        if existing:
-            return {"message": "Already liked"}
+        if not insert_like(db, action.user_email, action.policy_id):
+            db.rollback()
+            return {"message": "Already liked", "changed": False}
+        record_action(db, action.user_email, action.policy_id, 'like')  # 장르별 카운터 +1 (같은 트랜잭션)
+        invalidate_alert_feeds(db, [action.user_email])  # 찜 목록이 바뀌었으니 다음 조회 때 알림 피드 재계산
+        db.commit()
+        liked_added(action.user_email, [action.policy_id])
+        return {"message": "Action saved", "changed": True}
 
-    # 3. 새로운 액션 저장 (like or pass)
+    # 3. 새로운 액션 저장 (pass 등)
     new_action = UserAction(
         user_email=action.user_email,
         policy_id=action.policy_id,
         type=action.type
     )
     db.add(new_action)
+    record_action(db, action.user_email, action.policy_id, action.type)  # 장르별 카운터 +1 (같은 트랜잭션)
     db.commit()
     
-    return {"message": "Action saved", "action_id": new_action.id}
+    return {"message": "Action saved", "changed": True, "action_id": new_action.id}
+
+# 1-2. 스와이프 액션 일괄 저장 (쓰기 지연 버퍼)
+@router.post("/actions/batch", status_code=202)
+def save_user_actions_batch(data: ActionBatch, background_tasks: BackgroundTasks):
+    """
+    스와이프 액션(like/pass) 여러 건을 받아 서버 버퍼에 넣습니다.
+    버퍼는 일정 건수/시간마다 다중 행 INSERT 한 번으로 저장됩니다. (services/action_buffer.py)
+    """
+    if len(data.actions) > MAX_BATCH_ACTIONS:
+        raise HTTPException(status_code=413, detail=f"한 번에 최대 {MAX_BATCH_ACTIONS}건까지 보낼 수 있습니다.")
+    if any(a.type not in BUFFERED_TYPES for a in data.actions):
+        raise HTTPException(status_code=400, detail="일괄 저장은 like / pass만 지원합니다.")
+
+    if action_buffer.add((a.user_email, a.policy_id, a.type) for a in data.actions):
+        background_tasks.add_task(flush_actions)  # 버퍼가 꽉 찼으면 응답 후 바로 저장
+    return {"queued": len(data.actions)}
 
 # 1-1. 특정 정책에 대한 좋아요 여부 확인 (버튼 활성화용)
 @router.get("/check")
 def check_action_status(user_email: str, policy_id: int, db: Session = Depends(get_db)):
     """
     특정 유저가 특정 정책을 이미 'like' 했는지 확인합니다.
+    (여러 카드는 /liked로 한 번에 조회)
     """
-    existing = db.query(UserAction).filter(
-        UserAction.user_email == user_email,
-        UserAction.policy_id == policy_id,
-        UserAction.type == 'like'
-    ).first()
-    
-    return {"liked": True if existing else False}
+    return {"liked": is_liked(db, user_email, policy_id)}
+
+# 1-3. 찜 여부 일괄 조회 (카드 그리드 하트 표시용)
+@router.get("/liked")
+def get_liked_bitmap(user_email: str, db: Session = Depends(get_db)):
+    """
+    유저가 찜한 정책 id 전체를 비트맵(base64)으로 반환합니다.
+    바이트 i의 비트 j(하위 비트부터)가 1이면 정책 id i*8+j를 찜한 것입니다. (services/liked_set.py)
+    """
+    return liked_bitmap(db, user_email)
+
+@router.post("/liked")
+def lookup_liked(data: LikedLookup, db: Session = Depends(get_db)):
+    """
+    policy_ids 중 유저가 찜한 id만 반환합니다.
+    """
+    if len(data.policy_ids) > MAX_LIKED_LOOKUP:
+        raise HTTPException(status_code=413, detail=f"한 번에 최대 {MAX_LIKED_LOOKUP}개까지 조회할 수 있습니다.")
+    return {"liked": liked_ids(db, data.user_email, data.policy_ids)}
+
+
+def _liked_total(db: Session, user_email: str, category_code: Optional[int] = None) -> int:
+    """찜한 정책 수 - users_action 조인 COUNT 대신 user_category_stats 카운터 합계 (장르 지정 시 그 버킷만)"""
+    query = db.query(func.coalesce(func.sum(UserCategoryStat.likes), 0))\
+        .filter(UserCategoryStat.user_email == user_email)
+    if category_code is not None:
+        query = query.filter(UserCategoryStat.genre_code == category_code)
+    return int(query.scalar())
 
 
 # 2. 찜한 정책 목록 조회 (마이페이지용)
@@ -364,10 +440,14 @@ def get_liked_policies(
     category: Optional[str] = None,
     region: Optional[str] = None,
     sort: Optional[str] = None,
+    cursor: Optional[str] = None,  # 키셋 모드: 첫 페이지는 빈 값(cursor=), 이후는 이전 응답의 next_cursor
     db: Session = Depends(get_db)
 ):
     """
     해당 유저가 'like'한 정책들의 상세 정보를 반환합니다. (검색/필터/정렬/페이지네이션 적용)
+    - page 모드 (기존): {"policies", "total_count", "total_pages", "current_page"}
+    - cursor 모드: {"policies", "next_cursor", "total_count", "limit"} - OFFSET / 페이지마다 COUNT 없음
+    total_count는 가능하면 장르별 찜 카운터(user_category_stats)에서 읽습니다. (키워드/지역/마감 필터가 있으면 COUNT)
     """
     # 1. Base Query: Join UserAction and Policy to allow filtering on Policy fields
     query = db.query(UserAction, Policy).join(Policy, UserAction.policy_id == Policy.id).filter(
@@ -376,28 +456,30 @@ def get_liked_policies(
     )
     
     # 2. Apply Filters
-    # 2-1. Keyword Search (Title or Summary)
+    # 2-1. Keyword Search (Title or Summary, n-gram index)
     if keyword:
-        query = query.filter(
-            (Policy.title.ilike(f"%{keyword}%")) | 
-            (Policy.summary.ilike(f"%{keyword}%"))
-        )
+        query = query.filter(keyword_condition(keyword))
 
     # 2-2. Category Filter
+    # 사전에 없는 카테고리/지역이 오면 일치하는 정책 없음 (unknown_filter, all.py와 같은 규칙)
+    category_code = None
+    unknown_filter = False
     if category and category != "전체":
-        # Simply check if the genre string contains the category keyword
-        query = query.filter(Policy.genre.ilike(f"%{category}%"))
+        # '취업' / '취업/직무' → 장르 코드 동등 비교
+        category_code = genre_code(category)
+        unknown_filter = category_code is None
+        query = query.filter(Policy.genre_code == category_code)
 
     # 2-3. Region Filter
-    if region and region != "전체" and region != "전국":
+    region_filtered = bool(region and region != "전체" and region != "전국")
+    if region_filtered:
         # '전국' policies are usually shown for everyone, 
         # but if user specifically selects a region (e.g., 'Seoul'), 
         # they might want to see 'Seoul' ONLY or 'Seoul' + 'Nationwide'.
         # Following typical logic: Show policies matching region OR nationwide policies.
-        query = query.filter(
-            (Policy.region.ilike(f"%{region}%")) | 
-            (Policy.region == "전국")
-        )
+        region_value = region_code(region)
+        unknown_filter = unknown_filter or region_value is None
+        query = query.filter(Policy.region_code.in_([region_value, NATIONWIDE_CODE]))
 
     # 2-4. Closed Policy Filter (for 'closed' sort option or special filter)
     today = date.today()
@@ -409,6 +491,56 @@ def get_liked_policies(
     # But often users want to see "Active" policies by default. 
     # For "My Likes", we usually show everything unless filtered.
 
+    if unknown_filter:
+        if cursor is not None:
+            return {"policies": [], "next_cursor": None, "total_count": 0, "limit": min(max(limit, 1), MAX_LIKES_PAGE_SIZE)}
+        return {"policies": [], "total_count": 0, "total_pages": 0, "current_page": page}
+
+    # 장르별 찜 카운터로 전체 개수를 알 수 있는 필터 조합인지 (장르 필터만 있거나 필터 없음)
+    counter_total = not keyword and not region_filtered and sort != 'closed' \
+        and (category_code is not None or not category or category == "전체")
+
+    # 키셋(커서) 모드 - (정렬 키, 찜 id) 이후부터 이어 읽기
+    if cursor is not None:
+        sort_name = sort if sort in LIKED_SORT_KEYS else "latest"
+        sort_keys = LIKED_SORT_KEYS[sort_name]
+        limit = min(max(limit, 1), MAX_LIKES_PAGE_SIZE)
+        cursor_values = None
+        if cursor:
+            try:
+                cursor_values = decode_cursor(cursor, sort_name, len(sort_keys))
+            except ValueError:
+                raise HTTPException(status_code=400, detail="잘못된 커서입니다.")
+
+        total_count = None
+        if counter_total:
+            total_count = _liked_total(db, user_email, category_code)
+        elif cursor_values is None:
+            total_count = query.count()  # 카운터로 셀 수 없는 필터는 첫 페이지에서만 COUNT
+
+        query = order_by_keys(query, sort_keys)
+        if cursor_values is not None:
+            query = apply_keyset(query, sort_keys, cursor_values)
+        rows = query.limit(limit + 1).all()
+        next_cursor = None
+        if len(rows) > limit:
+            rows = rows[:limit]
+            action, policy = rows[-1]
+            next_cursor = encode_cursor(sort_name, [
+                getattr(action if key.column.class_ is UserAction else policy, key.attr) for key in sort_keys
+            ])
+
+        formatted_policies = cards_array("liked", serialize_liked_policy, [policy for action, policy in rows], card_version(db))
+        return Response(
+            content=json_object(
+                policies=formatted_policies,
+                next_cursor=next_cursor,
+                total_count=total_count,
+                limit=limit
+            ),
+            media_type="application/json"
+        )
+
     # 3. Apply Sorting
     if sort == 'deadline':
         # Order by closest deadline first (active policies first)
@@ -431,8 +563,8 @@ def get_liked_policies(
         # Default: Recently Liked
         query = query.order_by(UserAction.created_at.desc())
 
-    # 4. Count Total Results
-    total_count = query.count()
+    # 4. Count Total Results (필터가 카운터로 셀 수 있는 경우엔 조인 COUNT 대신 카운터 합계)
+    total_count = _liked_total(db, user_email, category_code) if counter_total else query.count()
     if total_count == 0:
         return {
             "policies": [],
@@ -452,39 +584,19 @@ def get_liked_policies(
     # 5. Fetch Data with Pagination
     # Note: Query returns tuples (UserAction, Policy) due to the join structure
     results = query.offset(offset).limit(limit).all()
-    
-    formatted_policies = []
-    
-    for action, policy in results:
-        # Image Processing
-        img_src = get_image_for_category(policy.genre)
-        
-        # Date Processing
-        date_str = "상시 모집"
-        if policy.end_date:
-            date_str = f"{policy.end_date} 마감"
-        elif policy.period:
-            date_str = policy.period
-
-        formatted_policies.append({
-            "id": policy.id,
-            "title": policy.title,
-            "summary": policy.summary or "상세 내용을 확인하세요.",
-            "genre": policy.genre or "기타",
-            "period": date_str,
-            "image": img_src,
-            "link": policy.link or "#",
-            "region": policy.region or "전국",
-            # Add is_active flag for frontend UI (gray out closed)
-            "is_active": not (policy.end_date and policy.end_date < today) if policy.end_date else True
-        })
-            
-    return {
-        "policies": formatted_policies,
-        "total_count": total_count,
-        "total_pages": total_pages,
-        "current_page": page
-    }
+
+    # 6. Serialize (cached per-policy card fragments)
+    formatted_policies = cards_array("liked", serialize_liked_policy, [policy for action, policy in results], card_version(db))
+
+    return Response(
+        content=json_object(
+            policies=formatted_policies,
+            total_count=total_count,
+            total_pages=total_pages,
+            current_page=page
+        ),
+        media_type="application/json"
+    )
 
 
 # 2-1. 찜한 정책 선택 삭제 [NEW]
@@ -493,15 +605,15 @@ def delete_liked_policies(data: LikeDeleteRequest, db: Session = Depends(get_db)
     """
     사용자가 선택한 찜한 정책들을 일괄 삭제합니다.
     """
-    # 1. 조건에 맞는(이메일, like타입, 정책ID리스트) 데이터 삭제
-    #    synchronize_session=False는 대량 삭제 시 세션 동기화 비용을 줄임
-    deleted_count = db.query(UserAction).filter(
-        UserAction.user_email == data.user_email,
-        UserAction.type == 'like',
-        UserAction.policy_id.in_(data.policy_ids)
-    ).delete(synchronize_session=False)
+    # 1. 조건에 맞는(이메일, like타입, 정책ID리스트) 데이터 삭제 + 장르별 카운터 차감
+    action_buffer.discard(data.user_email, data.policy_ids)  # 버퍼에 남은 같은 찜이 나중에 저장되지 않도록
+    deleted_count = remove_actions(db, data.user_email, 'like', data.policy_ids)
+    if deleted_count:
+        invalidate_alert_feeds(db, [data.user_email])  # 찜 목록이 바뀌었으니 다음 조회 때 알림 피드 재계산
     
     db.commit()
+    if deleted_count:
+        liked_removed(data.user_email, data.policy_ids)
     
     return {"message": "Deleted successfully", "count": deleted_count}
 
@@ -511,51 +623,25 @@ def delete_liked_policies(data: LikeDeleteRequest, db: Session = Depends(get_db)
 def get_user_stats(user_email: str, db: Session = Depends(get_db)):
     """
     유저의 like/pass 데이터를 분석하여 카테고리별 관심도를 반환합니다.
+    (액션 기록 전체 대신 user_category_stats의 장르별 카운터만 읽음)
     """
-    # 1. 해당 유저의 모든 액션 + 정책 장르 조인 조회
-    #    SELECT action.type, policy.genre 
-    #    FROM users_action AS action 
-    #    JOIN being_test AS policy ON action.policy_id = policy.id
-    #    WHERE action.user_email = ...
-    
-    results = db.query(UserAction.type, Policy.genre)\
-        .join(Policy, UserAction.policy_id == Policy.id)\
-        .filter(UserAction.user_email == user_email)\
-        .all()
-        
+    # 1. 장르 버킷별 (찜 수, 패스 수)
+    stats = get_category_stats(db, user_email)
+
     # 2. 점수 집계
-    #    Like: +10점, Pass: +1점 (예시 로직)
-    #    또는 단순히 Like 개수만 셀 수도 있음
-    
+    #    Like: +10점, Pass: +2점 (패스해도 봤다는 것에 의미를 둠)
     category_scores = {}
     
-    # 초기화 (모든 카테고리 0점으로 시작하고 싶다면)
+    # 초기화 (모든 카테고리 0점으로 시작)
     base_categories = ["취업", "창업", "주거", "금융", "교육", "복지"]
     for cat in base_categories:
-        category_scores[cat] = 0
-        
-    for type_, genre in results:
-        if not genre: continue
-        
-        # DB에 저장된 genre가 "취업/직무" 처럼 되어있을 수 있으므로 매핑 확인 필요
-        # models.py의 FRONT_TO_DB_CATEGORY는 프론트->DB용이므로, 여기선 DB값을 기준으로 그룹핑
-        
-        # 간단하게 앞 2글자만 따서 분류하거나 포함여부 확인
-        key = "기타"
-        if "취업" in genre: key = "취업"
-        elif "창업" in genre: key = "창업"
-        elif "주거" in genre: key = "주거"
-        elif "금융" in genre: key = "금융"
-        elif "교육" in genre: key = "교육"
-        elif "복지" in genre: key = "복지"
-        
-        score = 0
-        if type_ == 'like':
-            score = 10
-        elif type_ == 'pass':
-            score = 2  # 패스해도 봤다는 것에 의미를 둔다면 점수 부여 (선택사항)
-            
-        category_scores[key] = category_scores.get(key, 0) + score
+        likes, passes = stats.get(GENRE_SHORT_CODES[cat], (0, 0))
+        category_scores[cat] = likes * 10 + passes * 2
+
+    # 장르를 알 수 없는 정책에 남긴 액션은 "기타"
+    if OTHER_BUCKET in stats:
+        likes, passes = stats[OTHER_BUCKET]
+        category_scores["기타"] = likes * 10 + passes * 2
         
     # 3. 차트용 데이터 변환
     labels = list(category_scores.keys())
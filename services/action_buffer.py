@@ -0,0 +1,160 @@
+"""
+스와이프 액션 쓰기 지연 버퍼 (write-behind)
+스와이프마다 POST → 중복 SELECT + INSERT + 커밋 하던 것을, 메모리 버퍼에 모았다가 한 번에 저장합니다.
+- 버퍼: (유저, 정책, 종류) 키로 합침 → 같은 스와이프가 여러 번 와도 한 건 (시각은 처음 받은 시각)
+- 저장: FLUSH_SIZE건이 쌓이거나 FLUSH_INTERVAL초마다 (main.py 주기 작업) 다중 행 INSERT 한 번
+  없는 유저·정책은 저장 전에 IN 조회로 걸러내고, 이미 찜한 정책은 ON CONFLICT DO NOTHING으로 건너뜀
+  장르별 카운터(category_stats)도 같은 트랜잭션에서 갱신, 찜이 바뀐 유저의 알림 피드는 삭제만 (다음 조회 때 재계산)
+- 찜 취소: 삭제 전에 discard로 같은 (유저, 정책) 찜을 버퍼에서 빼고, 저장 중인 배치가 있으면 끝날 때까지 기다림
+  → 취소한 찜이 나중에 저장되어 되살아나지 않음 (같은 워커 안에서만 보장, 버퍼는 워커별 메모리)
+- 종료: main.py shutdown 이벤트에서 남은 액션을 모두 저장 (실패하면 저장하지 못한 액션을 로그로 남김)
+- 저장 실패(DB 연결 끊김 등) 시 버퍼에 되돌려 다음 주기에 다시 시도
+버퍼에 있는 동안(최대 FLUSH_INTERVAL초)은 찜 목록 등에 아직 보이지 않습니다.
+즉시 반영이 필요한 모달 찜/찜 취소는 기존 /api/mypage/action을 그대로 사용합니다.
+"""
+import threading
+from datetime import datetime
+from typing import Iterable, List, Tuple
+
+from sqlalchemy.orm import Session
+
+from database import SessionLocal
+from models import Policy, User
+from services.alert_feed import invalidate_alert_feeds
+from services.category_stats import record_actions
+from services.liked_set import liked_added
+from services.user_actions import insert_actions
+
+FLUSH_SIZE = 500          # 이만큼 쌓이면 바로 저장
+FLUSH_INTERVAL = 1.0      # 주기 저장 간격 (초)
+INSERT_CHUNK = 1000       # 다중 행 INSERT 한 문장에 넣는 최대 행 수
+BUFFERED_TYPES = ("like", "pass")
+
+ActionKey = Tuple[str, int, str]  # (user_email, policy_id, type)
+
+
+class ActionBuffer:
+    def __init__(self):
+        self._pending = {}                    # ActionKey -> created_at (삽입 순서 유지)
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()   # 저장은 한 번에 하나씩
+
+    def __len__(self):
+        return len(self._pending)
+
+    def add(self, actions: Iterable[ActionKey]) -> bool:
+        """액션 추가 → FLUSH_SIZE 이상 쌓였으면 True (호출한 쪽에서 flush 예약)"""
+        now = datetime.now()
+        with self._lock:
+            for key in actions:
+                self._pending.setdefault(key, now)
+            return len(self._pending) >= FLUSH_SIZE
+
+    def discard(self, user_email: str, policy_ids: Iterable[int], action_type: str = "like") -> int:
+        """
+        아직 저장 안 된 액션 제거 (찜 취소 직전에 호출) → 뺀 개수
+        저장 중인 배치가 끝날 때까지 기다리므로, 이후의 DELETE는 그 배치가 저장한 행까지 지움
+        """
+        with self._flush_lock:
+            with self._lock:
+                removed = 0
+                for policy_id in policy_ids:
+                    if self._pending.pop((user_email, policy_id, action_type), None) is not None:
+                        removed += 1
+                return removed
+
+    def pending(self) -> List[tuple]:
+        """저장 대기 중인 [((user_email, policy_id, type), created_at), ...] (로그용 사본)"""
+        with self._lock:
+            return list(self._pending.items())
+
+    def _take(self) -> List[tuple]:
+        with self._lock:
+            batch = list(self._pending.items())
+            self._pending = {}
+        return batch
+
+    def _restore(self, batch: List[tuple]):
+        with self._lock:
+            merged = dict(batch)
+            for key, created_at in self._pending.items():
+                merged.setdefault(key, created_at)
+            self._pending = merged
+
+    def flush(self) -> int:
+        """버퍼를 비우고 저장 → 저장한 행 수"""
+        with self._flush_lock:
+            batch = self._take()
+            if not batch:
+                return 0
+            try:
+                with SessionLocal() as db:
+                    saved = save_actions(db, batch)
+                    db.commit()
+            except Exception:
+                self._restore(batch)
+                raise
+            for email, policy_ids in _liked_by_user(saved).items():
+                liked_added(email, policy_ids)  # 커밋된 찜만 찜 집합 캐시에 반영
+            return len(saved)
+
+
+def _liked_by_user(saved: List[tuple]) -> dict:
+    by_user = {}
+    for email, policy_id, action_type in saved:
+        if action_type == "like":
+            by_user.setdefault(email, []).append(policy_id)
+    return by_user
+
+
+def save_actions(db: Session, batch: List[tuple]) -> List[tuple]:
+    """
+    [((user_email, policy_id, type), created_at), ...] 저장 (커밋은 호출한 쪽에서)
+    → 실제로 저장된 (user_email, policy_id, type) 목록
+    """
+    emails = list({email for (email, _, _), _ in batch})
+    policy_ids = list({policy_id for (_, policy_id, _), _ in batch})
+    valid_emails = {e for (e,) in db.query(User.email).filter(User.email.in_(emails))}
+    valid_ids = {pid for (pid,) in db.query(Policy.id).filter(Policy.id.in_(policy_ids))}
+
+    rows = [
+        {"user_email": email, "policy_id": policy_id, "type": action_type, "created_at": created_at}
+        for (email, policy_id, action_type), created_at in batch
+        if email in valid_emails and policy_id in valid_ids
+    ]
+    if not rows:
+        return []
+
+    # 이미 찜한 정책은 ON CONFLICT DO NOTHING으로 건너뜀 → RETURNING으로 실제 저장된 행만 카운터에 반영
+    saved = []
+    for start in range(0, len(rows), INSERT_CHUNK):
+        saved.extend(insert_actions(db, rows[start:start + INSERT_CHUNK]))
+    record_actions(db, saved)
+
+    # 찜 목록이 바뀐 유저는 알림 피드 삭제 (다음 조회 때 다시 계산)
+    invalidate_alert_feeds(db, _liked_by_user(saved))
+    return saved
+
+
+action_buffer = ActionBuffer()
+
+
+def flush_actions() -> int:
+    """주기 작업 / 백그라운드 작업용: 실패해도 예외 대신 로그만 (버퍼에는 남아 있음)"""
+    try:
+        return action_buffer.flush()
+    except Exception as e:
+        print(f"⚠️ 액션 버퍼 저장 실패 ({len(action_buffer)}건 대기): {e}")
+        return 0
+
+
+def flush_on_shutdown() -> int:
+    """종료 시 마지막 저장: 실패하면 저장하지 못한 액션을 한 줄씩 로그로 남김 (수동 복구용)"""
+    try:
+        return action_buffer.flush()
+    except Exception as e:
+        lost = action_buffer.pending()
+        print(f"⚠️ 종료 전 액션 버퍼 저장 실패, {len(lost)}건 저장 못 함: {e}")
+        for (email, policy_id, action_type), created_at in lost:
+            print(f"⚠️ 미저장 액션: {email}\t{policy_id}\t{action_type}\t{created_at.isoformat()}")
+        return 0
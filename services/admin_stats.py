@@ -0,0 +1,121 @@
+"""
+관리자 대시보드 통계 스냅샷
+대시보드를 열 때마다 COUNT 여러 번 + 유저 지역 GROUP BY를 하던 것을, 주기 작업이 한 번에 집계해
+admin_stat_snapshot에 시각과 함께 쌓아 둡니다. 대시보드는 최신 스냅샷 한 행만 읽습니다.
+- 찜/패스 총계: users_action 전체 대신 user_category_stats 카운터 합계
+- 인기 정책: policy_trend 점수 인덱스 상위 TOP_POLICIES개 (정책 제목은 같은 조인으로)
+- SNAPSHOT_INTERVAL마다 한 장 (main.py 주기 작업) / 관리자가 "지금 갱신"을 누르면 바로 한 장
+- HISTORY_DAYS가 지난 스냅샷은 새 스냅샷을 만들 때 삭제
+
+실행: python -m services.admin_stats  (스냅샷 한 장 생성)
+"""
+import json
+from datetime import date, datetime, timedelta
+from typing import List, Optional
+
+from sqlalchemy import case, func
+from sqlalchemy.orm import Session
+
+from models import AdminStatSnapshot, Policy, PolicyTrend, User, UserCategoryStat
+from services.trending import decayed_score
+
+SNAPSHOT_INTERVAL = 10 * 60     # 주기 스냅샷 간격 (초)
+HISTORY_DAYS = 90               # 스냅샷 보관 기간
+TOP_POLICIES = 5
+
+
+def take_snapshot(db: Session) -> AdminStatSnapshot:
+    """현재 통계를 집계해 스냅샷 한 장 저장 (커밋 포함)"""
+    total_users, premium_users = db.query(
+        func.count(User.id),
+        func.coalesce(func.sum(case((User.subscription_level == "premium", 1), else_=0)), 0),
+    ).one()
+    total_policies, active_policies, empty_summary_count = db.query(
+        func.count(Policy.id),
+        func.coalesce(func.sum(case((Policy.is_active == True, 1), else_=0)), 0),
+        func.coalesce(func.sum(case(((Policy.summary == None) | (Policy.summary == ""), 1), else_=0)), 0),
+    ).one()
+    total_likes, total_passes = db.query(
+        func.coalesce(func.sum(UserCategoryStat.likes), 0),
+        func.coalesce(func.sum(UserCategoryStat.passes), 0),
+    ).one()
+
+    now = datetime.now()
+    hot_policies = [
+        {"id": pid, "title": title, "count": round(decayed_score(score, now), 1)}
+        for pid, title, score in db.query(Policy.id, Policy.title, PolicyTrend.score)
+            .join(PolicyTrend, PolicyTrend.policy_id == Policy.id)
+            .order_by(PolicyTrend.score.desc()).limit(TOP_POLICIES)
+    ]
+    user_regions = [
+        [region, count]
+        for region, count in db.query(User.region, func.count(User.id))
+            .group_by(User.region).order_by(func.count(User.id).desc())
+    ]
+
+    snapshot = AdminStatSnapshot(
+        created_at=now,
+        total_users=total_users,
+        premium_users=premium_users,
+        total_policies=total_policies,
+        active_policies=active_policies,
+        empty_summary_count=empty_summary_count,
+        total_likes=total_likes,
+        total_passes=total_passes,
+        hot_policies=json.dumps(hot_policies, ensure_ascii=False),
+        user_regions=json.dumps(user_regions, ensure_ascii=False),
+    )
+    db.add(snapshot)
+    db.query(AdminStatSnapshot).filter(
+        AdminStatSnapshot.created_at < now - timedelta(days=HISTORY_DAYS)
+    ).delete(synchronize_session=False)
+    db.commit()
+    return snapshot
+
+
+def latest_snapshot(db: Session) -> Optional[AdminStatSnapshot]:
+    return db.query(AdminStatSnapshot).order_by(AdminStatSnapshot.created_at.desc()).first()
+
+
+def refresh_if_stale(db: Session, max_age: float = SNAPSHOT_INTERVAL) -> Optional[AdminStatSnapshot]:
+    """최신 스냅샷이 max_age초보다 오래됐으면 새로 만듦 → 새 스냅샷 (그대로면 None)"""
+    latest = db.query(func.max(AdminStatSnapshot.created_at)).scalar()
+    if latest is not None and latest > datetime.now() - timedelta(seconds=max_age):
+        return None
+    return take_snapshot(db)
+
+
+def daily_history(db: Session, days: int = 14) -> List[dict]:
+    """최근 days일의 날짜별 마지막 스냅샷 (오래된 날짜부터)"""
+    since = datetime.combine(date.today() - timedelta(days=days - 1), datetime.min.time())
+    rows = db.query(
+        AdminStatSnapshot.created_at,
+        AdminStatSnapshot.total_users,
+        AdminStatSnapshot.premium_users,
+        AdminStatSnapshot.total_policies,
+        AdminStatSnapshot.active_policies,
+        AdminStatSnapshot.total_likes,
+        AdminStatSnapshot.total_passes,
+    ).filter(AdminStatSnapshot.created_at >= since).order_by(AdminStatSnapshot.created_at)
+
+    by_day = {}
+    for row in rows:
+        by_day[row.created_at.date()] = {
+            "date": row.created_at.date().isoformat(),
+            "taken_at": row.created_at.isoformat(timespec="seconds"),
+            "total_users": row.total_users,
+            "premium_users": row.premium_users,
+            "total_policies": row.total_policies,
+            "active_policies": row.active_policies,
+            "total_likes": row.total_likes,
+            "total_passes": row.total_passes,
+        }
+    return list(by_day.values())
+
+
+if __name__ == "__main__":
+    from database import SessionLocal
+
+    with SessionLocal() as session:
+        snapshot = take_snapshot(session)
+        print(f"📊 관리자 통계 스냅샷 저장 완료 ({snapshot.created_at:%Y-%m-%d %H:%M:%S})")
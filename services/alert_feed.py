@@ -0,0 +1,237 @@
+"""
+사용자별 알림 피드 (nav.html → /api/recommend/status)
+페이지마다 7개 쿼리로 알림을 계산하던 것을 user_alert_feed 테이블에 미리 저장해 두고 PK로 한 번만 읽습니다.
+- 찜/찜 취소: 해당 유저 피드 행만 삭제 (invalidate_alert_feeds, PK DELETE 한 문장)
+  → 쓰기 트랜잭션은 가볍게 두고, 다음 알림 조회 때 한 번만 다시 계산 (스와이프가 여러 번이어도 계산은 1번)
+- 카탈로그 변경 / 날짜 변경: 저장된 catalog_version, feed_date가 다르면 읽을 때 다시 계산
+  (트렌드 점수는 1분마다 바뀌므로 비교하지 않음 → 인기 알림은 하루/찜/카탈로그 변경 단위로 갱신)
+- 유저 정보(지역, 이름) 변경: 피드 삭제 → 다음 조회 때 다시 계산 (invalidate_alert_feed)
+"""
+import json
+from datetime import date, datetime, timedelta
+from typing import Iterable, Optional
+
+from sqlalchemy import desc, func
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from models import NATIONWIDE_CODE, Policy, PolicyTrend, User, UserAction, UserAlertFeed, region_code
+from services.catalog import current_catalog_version
+from services.embeddings import similar_policy_ids
+from services.item_neighbors import neighbor_scores
+from services.trending import current_trend_version
+
+# 비로그인 공용 피드 키
+ANONYMOUS_KEY = ""
+
+# 관심 분야 추천 후보 수 (협업 필터링 이웃 / 내용이 비슷한 정책 중 같은 장르 + 미찜 정책을 이 안에서 고름)
+SIMILAR_CANDIDATES = 20
+
+
+def popular_first(query):
+    """트렌드 점수(최근 반응) 높은 순 → 점수가 없으면 누적 조회수 순"""
+    return query.outerjoin(PolicyTrend, PolicyTrend.policy_id == Policy.id).order_by(
+        PolicyTrend.score.desc().nulls_last(), desc(Policy.view_count)
+    )
+
+
+def compute_alerts(db: Session, user_email: Optional[str]) -> Optional[list]:
+    """알림 목록 계산 (유저가 없으면 None → 저장하지 않음)"""
+    alerts = []
+
+    # 0. 비로그인 유저 (기본 인기 정책만)
+    if not user_email:
+        # 전국 인기 정책 1개
+        best = popular_first(db.query(Policy)).first()
+        if best:
+            alerts.append({
+                "type": "best",
+                "icon": "🔥",
+                "title": "지금 가장 핫한 정책",
+                "message": f"'{best.title}' 지금 확인해보세요!",
+                "link": f"/all.html?policy_id={best.id}" # 상세 페이지로 바로 이동
+            })
+        return alerts
+
+    # 로그인 유저 정보 가져오기
+    user = db.query(User).filter(User.email == user_email).first()
+    if not user:
+        return None
+
+    user_region = user.region if user.region else "전국"
+    user_region_code = user.region_code if user.region_code is not None else region_code(user_region)
+    if user_region_code is None:
+        user_region_code = NATIONWIDE_CODE
+
+    # ====================================================
+    # 1. [New Arrivals] 우리 동네 신규 (최근 7일)
+    # ====================================================
+    seven_days_ago = datetime.now() - timedelta(days=7)
+    new_count = db.query(Policy).filter(
+        Policy.region_code == user_region_code,
+        Policy.created_at >= seven_days_ago
+    ).count()
+
+    if new_count > 0:
+        alerts.append({
+            "type": "new",
+            "icon": "✨",
+            "title": f"{user_region} 신규 정책",
+            "message": f"최근 7일간 <span class='text-primary-teal font-bold'>{new_count}건</span>이 새로 올라왔어요.",
+            "link": f"/all.html?region={user_region}&sort=new"
+        })
+
+    # ====================================================
+    # 2. [Deadline Watch] 찜한 정책 마감 임박 (3일 내)
+    # ====================================================
+    # 유저가 좋아요(like)한 정책 ID 목록
+    liked_policy_ids = db.query(UserAction.policy_id).filter(
+        UserAction.user_email == user_email,
+        UserAction.type == "like"
+    ).all()
+    liked_ids = [pid[0] for pid in liked_policy_ids]
+
+    if liked_ids:
+        three_days_later = datetime.now().date() + timedelta(days=3)
+        today = datetime.now().date()
+
+        imminent_policy = db.query(Policy).filter(
+            Policy.id.in_(liked_ids),
+            Policy.end_date >= today,
+            Policy.end_date <= three_days_later
+        ).first()
+
+        if imminent_policy:
+            days_left = (imminent_policy.end_date - today).days
+            d_day_str = "오늘 마감" if days_left == 0 else f"D-{days_left}"
+
+            alerts.append({
+                "type": "deadline",
+                "icon": "🚨",
+                "title": "찜한 정책 마감 임박",
+                "message": f"'{imminent_policy.title}' (<span class='text-red-500 font-bold'>{d_day_str}</span>)",
+                "link": f"/mypage.html?policy_id={imminent_policy.id}&open_modal=true"
+            })
+
+    # ====================================================
+    # 3. [Interest Match] 관심 분야 추천
+    # ====================================================
+    # 유저가 가장 많이 찜한 카테고리 추출
+    if liked_ids:
+        # 가장 많이 등장한 카테고리 1위
+        top_category = db.query(Policy.genre).filter(Policy.id.in_(liked_ids))\
+            .group_by(Policy.genre).order_by(func.count(Policy.genre).desc()).first()
+
+        if top_category:
+            cat_name = top_category[0]
+            # 1순위: 찜한 정책들을 함께 찜한 사람들이 많이 찜한 정책 (협업 필터링 이웃, 같은 카테고리)
+            rec_policy = None
+            cf_ids = [pid for pid, _ in neighbor_scores(db, liked_ids, SIMILAR_CANDIDATES)]
+            if cf_ids:
+                candidates = {p.id: p for p in db.query(Policy).filter(
+                    Policy.id.in_(cf_ids),
+                    Policy.genre == cat_name
+                ).all()}
+                rec_policy = next((candidates[pid] for pid in cf_ids if pid in candidates), None)
+
+            # 2순위: 해당 카테고리에서 가장 최근에 찜한 정책과 내용이 비슷한 정책 (이미 찜한 것 제외)
+            if rec_policy is None:
+                anchor = db.query(UserAction.policy_id).join(Policy, Policy.id == UserAction.policy_id).filter(
+                    UserAction.user_email == user_email,
+                    UserAction.type == "like",
+                    Policy.genre == cat_name
+                ).order_by(UserAction.created_at.desc()).first()
+                similar_ids = [pid for pid in similar_policy_ids(db, anchor[0], SIMILAR_CANDIDATES) if pid not in liked_ids] if anchor else []
+                if similar_ids:
+                    candidates = {p.id: p for p in db.query(Policy).filter(
+                        Policy.id.in_(similar_ids),
+                        Policy.genre == cat_name
+                    ).all()}
+                    rec_policy = next((candidates[pid] for pid in similar_ids if pid in candidates), None)
+
+            # 3순위: 해당 카테고리의 인기(트렌드) 정책
+            if rec_policy is None:
+                rec_policy = popular_first(db.query(Policy).filter(
+                    Policy.genre == cat_name,
+                    ~Policy.id.in_(liked_ids)
+                )).first()
+
+            if rec_policy:
+                alerts.append({
+                    "type": "interest",
+                    "icon": "❤️",
+                    "title": f"<span class='text-blue-500 font-bold'>'{cat_name}'</span> 분야 추천",
+                    "message": f"<span class='text-primary-orange font-bold'>{user.name}</span>님 취향저격! '{rec_policy.title}'",
+                    "link": f"/all.html?policy_id={rec_policy.id}&open_modal=true"
+                })
+
+    # ====================================================
+    # 4. [Region Best] 우리 동네 인기 1위
+    # ====================================================
+    local_best = popular_first(db.query(Policy).filter(
+        Policy.region_code == user_region_code
+    )).first()
+
+    if local_best:
+        alerts.append({
+            "type": "best_local",
+            "icon": "🔥",
+            "title": f"{user_region} 인기 <span class='text-red-500 font-bold'>1위</span>",
+            "message": f"'{local_best.title}'",
+            "link": f"/all.html?policy_id={local_best.id}&open_modal=true"
+        })
+
+    return alerts
+
+
+def refresh_alert_feed(db: Session, user_email: Optional[str]) -> str:
+    """
+    피드를 다시 계산해서 저장 (커밋은 호출한 쪽에서)
+    반환값: 응답으로 그대로 보낼 JSON 문자열
+    """
+    alerts = compute_alerts(db, user_email)
+    if alerts is None:
+        invalidate_alert_feed(db, user_email)
+        return "[]"
+
+    payload = json.dumps(alerts, ensure_ascii=False)
+    key = user_email or ANONYMOUS_KEY
+    row = db.get(UserAlertFeed, key)
+    if row is None:
+        row = UserAlertFeed(feed_key=key)
+        db.add(row)
+    row.alerts = payload
+    row.catalog_version = current_catalog_version(db)
+    row.trend_version = current_trend_version(db)
+    row.feed_date = date.today()
+    row.updated_at = datetime.now()
+    return payload
+
+
+def invalidate_alert_feed(db: Session, user_email: Optional[str]):
+    """피드 삭제 (다음 조회 때 다시 계산, 커밋은 호출한 쪽에서)"""
+    db.query(UserAlertFeed).filter(
+        UserAlertFeed.feed_key == (user_email or ANONYMOUS_KEY)
+    ).delete(synchronize_session=False)
+
+
+def invalidate_alert_feeds(db: Session, user_emails: Iterable[str]):
+    """여러 유저 피드를 한 문장으로 삭제 (찜 저장/취소 시, 커밋은 호출한 쪽에서)"""
+    keys = list(set(user_emails))
+    if keys:
+        db.query(UserAlertFeed).filter(UserAlertFeed.feed_key.in_(keys)).delete(synchronize_session=False)
+
+
+def get_alert_feed(db: Session, user_email: Optional[str]) -> str:
+    """저장된 피드(JSON 문자열) 조회, 카탈로그 버전이나 날짜가 바뀌었으면 다시 계산"""
+    row = db.get(UserAlertFeed, user_email or ANONYMOUS_KEY)
+    if row is not None and row.catalog_version == current_catalog_version(db) and row.feed_date == date.today():
+        return row.alerts
+
+    payload = refresh_alert_feed(db, user_email)
+    try:
+        db.commit()
+    except IntegrityError:
+        # 동시에 같은 피드를 처음 만든 요청이 있으면 그쪽 결과를 사용
+        db.rollback()
+    return payload
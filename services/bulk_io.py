@@ -0,0 +1,492 @@
+"""
+관리자용 대량 내보내기 / 가져오기 (CSV, NDJSON)
+- 내보내기: being_test / users / users_action을 서버 측 커서(yield_per)로 EXPORT_CHUNK행씩 읽어 바로 스트리밍
+  → 테이블 크기와 관계없이 메모리 일정 / users는 비밀번호 해시를 내보내지 않음
+- 가져오기: 업로드 파일(임시 파일)을 한 행씩 읽어 검증 → IMPORT_CHUNK행마다 임시 스테이징 테이블에 적재
+  (PostgreSQL은 COPY, 그 외 DB는 다중 행 INSERT) → 끝나면 INSERT ... SELECT로 본 테이블에 한 번에 반영 (한 트랜잭션)
+  - policies: id가 있으면 그 정책을 덮어쓰고(파일에 있는 컬럼만), 없으면 새 정책 / 지역·장르 코드도 함께 계산
+  - actions: 없는 유저/정책은 거절, 이미 찜한 정책은 건너뜀 (uq_users_action_like)
+  - users는 비밀번호가 얽혀 있어 가져오기를 지원하지 않음
+  - 반영 후 검색 색인 / 장르별 카운터 / 트렌드 / 이웃 정책 등 파생 데이터 갱신
+- 진행 상황: 작업(ImportJob)별로 읽은 행 / 적재 / 거절 / 오류 예시를 메모리에 보관 → 관리자 API로 조회
+"""
+import csv
+import io
+import json
+import os
+import secrets
+import threading
+from datetime import date, datetime
+from typing import Iterator, List, Optional
+
+from cachetools import TTLCache
+from sqlalchemy import Column, MetaData, Table, func, select
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import Session
+
+from database import SessionLocal
+from models import Policy, User, UserAction, UserAlertFeed, genre_code, region_code
+
+EXPORT_CHUNK = 2000           # 내보내기: 서버 측 커서에서 한 번에 가져와 내보내는 행 수
+IMPORT_CHUNK = 5000           # 가져오기: 스테이징 테이블에 한 번에 적재하는 행 수
+MAX_ERRORS = 20               # 진행 상황에 보관하는 오류 예시 수
+JOB_TTL = 24 * 60 * 60        # 끝난 작업 진행 상황 보관 시간 (초)
+
+FORMATS = {
+    "csv": "text/csv; charset=utf-8",
+    "ndjson": "application/x-ndjson",
+}
+
+# 내보내기 대상 → 컬럼 (첫 컬럼 순서로 정렬)
+EXPORT_COLUMNS = {
+    "policies": [
+        Policy.id, Policy.title, Policy.summary, Policy.period, Policy.link, Policy.genre, Policy.region,
+        Policy.original_id, Policy.created_at, Policy.end_date, Policy.view_count, Policy.is_active,
+    ],
+    "users": [
+        User.id, User.email, User.name, User.region, User.provider, User.subscription_level, User.profile_icon,
+    ],
+    "actions": [
+        UserAction.id, UserAction.user_email, UserAction.policy_id, UserAction.type, UserAction.created_at,
+    ],
+}
+
+
+# ==================== [내보내기] ====================
+
+def _plain(value):
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    return value
+
+
+def export_stream(table: str, fmt: str) -> Iterator[bytes]:
+    """테이블 전체를 CSV/NDJSON 바이트 조각으로 (StreamingResponse용, 세션은 스트림이 끝날 때 닫힘)"""
+    columns = EXPORT_COLUMNS[table]
+    names = [c.key for c in columns]
+    buffer = io.StringIO()
+    writer = csv.writer(buffer) if fmt == "csv" else None
+    if writer is not None:
+        buffer.write("\ufeff")  # 엑셀에서 한글이 깨지지 않도록 BOM
+        writer.writerow(names)
+
+    with SessionLocal() as db:
+        rows = db.query(*columns).order_by(columns[0]).execution_options(yield_per=EXPORT_CHUNK)
+        for count, row in enumerate(rows, 1):
+            values = [_plain(v) for v in row]
+            if writer is not None:
+                writer.writerow(["" if v is None else v for v in values])
+            else:
+                buffer.write(json.dumps(dict(zip(names, values)), ensure_ascii=False))
+                buffer.write("\n")
+            if count % EXPORT_CHUNK == 0:
+                yield buffer.getvalue().encode("utf-8")
+                buffer.seek(0)
+                buffer.truncate()
+    if buffer.tell():
+        yield buffer.getvalue().encode("utf-8")
+
+
+# ==================== [가져오기: 값 검증] ====================
+
+def _text(value):
+    if value is None:
+        return None
+    value = str(value)
+    return value if value.strip() else None
+
+
+def _int(value):
+    if value is None or value == "":
+        return None
+    if isinstance(value, bool):
+        raise ValueError("정수가 아닙니다")
+    return int(value)
+
+
+def _date(value):
+    if value is None or value == "":
+        return None
+    return date.fromisoformat(str(value)[:10])
+
+
+def _datetime(value):
+    if value is None or value == "":
+        return None
+    return datetime.fromisoformat(str(value))
+
+
+def _bool(value):
+    if value is None or value == "":
+        return None
+    if isinstance(value, bool):
+        return value
+    text = str(value).strip().lower()
+    if text in ("true", "t", "1", "y", "yes"):
+        return True
+    if text in ("false", "f", "0", "n", "no"):
+        return False
+    raise ValueError("true/false 값이 아닙니다")
+
+
+# (컬럼, 변환 함수, 필수 여부, 빈 값일 때 기본값)
+IMPORT_FIELDS = {
+    "policies": [
+        ("id", _int, False, None),
+        ("title", _text, True, None),
+        ("summary", _text, False, None),
+        ("period", _text, False, None),
+        ("link", _text, False, None),
+        ("genre", _text, False, None),
+        ("region", _text, False, None),
+        ("original_id", _text, False, None),
+        ("created_at", _datetime, False, None),
+        ("end_date", _date, False, None),
+        ("view_count", _int, False, 0),
+        ("is_active", _bool, False, True),
+    ],
+    "actions": [
+        ("user_email", _text, True, None),
+        ("policy_id", _int, True, None),
+        ("type", _text, True, None),
+        ("created_at", _datetime, False, None),
+    ],
+}
+IMPORT_MODELS = {"policies": Policy, "actions": UserAction}
+ACTION_TYPES = ("like", "pass", "view")
+
+
+# ==================== [가져오기: 작업 / 진행 상황] ====================
+
+class ImportJob:
+    def __init__(self, table: str, fmt: str, path: str, filename: str):
+        self.id = secrets.token_urlsafe(8)
+        self.table = table
+        self.fmt = fmt
+        self.path = path
+        self.filename = filename
+        self.status = "queued"         # queued → running → done / failed
+        self.rows_read = 0
+        self.rows_staged = 0
+        self.rows_rejected = 0
+        self.rows_loaded = 0
+        self.errors: List[str] = []
+        self.started_at: Optional[datetime] = None
+        self.finished_at: Optional[datetime] = None
+
+    def reject(self, line: int, message: str):
+        self.rows_rejected += 1
+        if len(self.errors) < MAX_ERRORS:
+            self.errors.append(f"{line}행: {message}")
+
+    def to_dict(self) -> dict:
+        return {
+            "job_id": self.id,
+            "table": self.table,
+            "format": self.fmt,
+            "filename": self.filename,
+            "status": self.status,
+            "rows_read": self.rows_read,
+            "rows_staged": self.rows_staged,
+            "rows_rejected": self.rows_rejected,
+            "rows_loaded": self.rows_loaded,
+            "errors": self.errors,
+            "started_at": self.started_at.isoformat(timespec="seconds") if self.started_at else None,
+            "finished_at": self.finished_at.isoformat(timespec="seconds") if self.finished_at else None,
+        }
+
+
+_jobs = TTLCache(maxsize=200, ttl=JOB_TTL)
+_jobs_lock = threading.Lock()
+_import_lock = threading.Lock()  # 가져오기는 한 번에 하나씩 (파생 데이터 재계산이 겹치지 않도록)
+
+
+def create_job(table: str, fmt: str, path: str, filename: str) -> ImportJob:
+    job = ImportJob(table, fmt, path, filename)
+    with _jobs_lock:
+        _jobs[job.id] = job
+    return job
+
+
+def get_job(job_id: str) -> Optional[ImportJob]:
+    with _jobs_lock:
+        return _jobs.get(job_id)
+
+
+def detect_format(filename: str, fmt: Optional[str] = None) -> Optional[str]:
+    if fmt:
+        return fmt if fmt in FORMATS else None
+    ext = os.path.splitext(filename or "")[1].lower()
+    return {".csv": "csv", ".ndjson": "ndjson", ".jsonl": "ndjson"}.get(ext)
+
+
+# ==================== [가져오기: 파일 읽기 → 스테이징 → 반영] ====================
+
+def _records(job: ImportJob):
+    """(행 번호, dict) 순서대로 - 파싱할 수 없는 행은 거절 처리"""
+    with open(job.path, encoding="utf-8-sig", newline="") as f:
+        if job.fmt == "csv":
+            reader = csv.DictReader(f)
+            for record in reader:
+                yield reader.line_num, record
+        else:
+            for line_no, line in enumerate(f, 1):
+                if not line.strip():
+                    continue
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    job.rows_read += 1
+                    job.reject(line_no, "JSON 형식이 아닙니다")
+                    continue
+                if not isinstance(record, dict):
+                    job.rows_read += 1
+                    job.reject(line_no, "JSON 객체가 아닙니다")
+                    continue
+                yield line_no, record
+
+
+def _header(job: ImportJob) -> List[str]:
+    """파일에 있는 컬럼 (CSV는 헤더, NDJSON은 첫 객체의 키)"""
+    with open(job.path, encoding="utf-8-sig", newline="") as f:
+        if job.fmt == "csv":
+            return next(csv.reader(f), [])
+        for line in f:
+            if line.strip():
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    return []
+                return list(record) if isinstance(record, dict) else []
+    return []
+
+
+def _staging_table(table: str, names: List[str]) -> Table:
+    model = IMPORT_MODELS[table]
+    columns = model.__table__.c
+    return Table(
+        f"import_staging_{table}", MetaData(),
+        *[Column(name, columns[name].type) for name in names],
+        prefixes=["TEMPORARY"],
+    )
+
+
+def _copy_rows(db: Session, staging: Table, names: List[str], rows: List[dict]):
+    """청크를 스테이징 테이블에 적재 (PostgreSQL은 COPY FROM STDIN)"""
+    if db.get_bind().dialect.name != "postgresql":
+        db.execute(staging.insert(), rows)
+        return
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    for row in rows:
+        writer.writerow(["\\N" if row[n] is None else _plain(row[n]) for n in names])
+    buffer.seek(0)
+    cursor = db.connection().connection.cursor()
+    try:
+        cursor.copy_expert(
+            f"COPY {staging.name} ({', '.join(names)}) FROM STDIN WITH (FORMAT csv, NULL '\\N')", buffer
+        )
+    finally:
+        cursor.close()
+
+
+def _validate_actions(db: Session, job: ImportJob, pending: List[tuple]) -> List[dict]:
+    """청크 단위로 유저/정책 존재 여부 확인 (IN 조회 두 번)"""
+    emails = list({row["user_email"] for _, row in pending})
+    policy_ids = list({row["policy_id"] for _, row in pending})
+    valid_emails = {e for (e,) in db.query(User.email).filter(User.email.in_(emails))}
+    valid_ids = {pid for (pid,) in db.query(Policy.id).filter(Policy.id.in_(policy_ids))}
+    rows = []
+    for line, row in pending:
+        if row["user_email"] not in valid_emails:
+            job.reject(line, f"없는 유저입니다 ({row['user_email']})")
+        elif row["policy_id"] not in valid_ids:
+            job.reject(line, f"없는 정책입니다 ({row['policy_id']})")
+        else:
+            rows.append(row)
+    return rows
+
+
+def _insert(db: Session, model):
+    dialect = postgresql if db.get_bind().dialect.name == "postgresql" else sqlite
+    return dialect.insert(model)
+
+
+def _merge_policies(db: Session, staging: Table, names: List[str]) -> int:
+    loaded = 0
+    if "id" in names:
+        stmt = _insert(db, Policy).from_select(
+            names, select(*[staging.c[n] for n in names]).where(staging.c.id.isnot(None))
+        )
+        set_ = {n: stmt.excluded[n] for n in names if n != "id"}
+        if "is_active" in names:
+            set_["sync_deactivated"] = False  # 관리자가 공개 여부를 직접 정했으므로 카탈로그 동기화가 되돌리지 않음
+        stmt = stmt.on_conflict_do_update(index_elements=[Policy.id], set_=set_)
+        loaded += db.execute(stmt).rowcount
+        if db.get_bind().dialect.name == "postgresql":
+            # id를 직접 넣었으므로 시퀀스를 최댓값 뒤로 (import_all_data.py와 같은 처리)
+            db.execute(select(func.setval(
+                func.pg_get_serial_sequence(Policy.__tablename__, "id"),
+                func.coalesce(func.max(Policy.id), 1),
+            )))
+    new_names = [n for n in names if n != "id"]
+    new_rows = select(*[staging.c[n] for n in new_names])
+    if "id" in names:
+        new_rows = new_rows.where(staging.c.id.is_(None))
+    loaded += db.execute(Policy.__table__.insert().from_select(new_names, new_rows)).rowcount
+    return loaded
+
+
+def _merge_actions(db: Session, staging: Table, names: List[str]) -> int:
+    stmt = _insert(db, UserAction).from_select(
+        names, select(*[staging.c[n] for n in names]).where(staging.c.policy_id.isnot(None))
+    ).on_conflict_do_nothing(
+        index_elements=[UserAction.user_email, UserAction.policy_id],
+        index_where=UserAction.type == "like",
+    )
+    return db.execute(stmt).rowcount
+
+
+def _parse(fields, record: dict) -> dict:
+    row = {}
+    for name, convert, required, default in fields:
+        try:
+            value = convert(record.get(name))
+        except (TypeError, ValueError):
+            raise ValueError(f"{name} 값이 올바르지 않습니다 ({record.get(name)!r})")
+        if value is None:
+            if required:
+                raise ValueError(f"{name} 값이 없습니다")
+            value = default
+        row[name] = value
+    return row
+
+
+def _refresh_derived(table: str, touched_emails: set):
+    """본 테이블 반영 후 파생 데이터 갱신 (각 함수가 커밋)"""
+    from services.catalog import bump_catalog_version, invalidate_catalog_version
+    from services.category_stats import rebuild_category_stats
+    from services.item_neighbors import refresh_item_neighbors
+    from services.liked_set import clear_liked_cache
+    from services.search import rebuild_search_index
+    from services.trending import invalidate_trend_version, refresh_trending
+
+    with SessionLocal() as db:
+        if table == "policies":
+            rebuild_search_index(db)
+            if db.get_bind().dialect.name == "postgresql":
+                from services.embeddings import rebuild_embeddings
+                rebuild_embeddings(db)
+            rebuild_category_stats(db)  # 기존 정책의 장르가 바뀌었을 수 있음
+            bump_catalog_version(db)    # 스냅샷 / 카드 캐시 / 알림 피드 / 관리자 필터 목록이 다시 만들어짐
+            db.commit()
+            invalidate_catalog_version()
+        else:
+            rebuild_category_stats(db)
+            if refresh_trending(db):
+                invalidate_trend_version()
+            refresh_item_neighbors(db)
+            emails = list(touched_emails)
+            for start in range(0, len(emails), 1000):
+                db.query(UserAlertFeed).filter(UserAlertFeed.feed_key.in_(emails[start:start + 1000]))\
+                    .delete(synchronize_session=False)
+            db.commit()
+            clear_liked_cache()
+
+
+def run_import(job: ImportJob):
+    """업로드 파일 가져오기 (백그라운드 작업) - 진행 상황은 job에 기록"""
+    with _import_lock:
+        job.status = "running"
+        job.started_at = datetime.now()
+        try:
+            _run_import(job)
+            job.status = "done"
+        except Exception as e:
+            job.status = "failed"
+            job.errors.append(f"가져오기 실패: {e}")
+        finally:
+            job.finished_at = datetime.now()
+            try:
+                os.remove(job.path)
+            except OSError:
+                pass
+
+
+def _run_import(job: ImportJob):
+    header = set(_header(job))
+    fields = [f for f in IMPORT_FIELDS[job.table] if f[0] in header]
+    missing = [name for name, _, required, _ in IMPORT_FIELDS[job.table] if required and name not in header]
+    if missing:
+        raise ValueError(f"필수 컬럼이 없습니다: {', '.join(missing)}")
+
+    names = [f[0] for f in fields]
+    if job.table == "policies":
+        # 지역/장르가 파일에 있으면 표준 코드도 함께 저장 (원시 INSERT라 ORM 이벤트가 돌지 않음)
+        names += [code for source, code in (("region", "region_code"), ("genre", "genre_code")) if source in names]
+    elif "created_at" not in names:
+        names.append("created_at")
+
+    staging = _staging_table(job.table, names)
+    touched_emails = set()
+    seen_ids = set()
+
+    with SessionLocal() as db:
+        staging.drop(db.connection(), checkfirst=True)  # 이전 작업이 실패하며 남긴 스테이징 테이블 (같은 커넥션 재사용 시)
+        staging.create(db.connection())
+        try:
+            pending: List[tuple] = []
+
+            def load(pending):
+                rows = [row for _, row in pending]
+                if job.table == "actions":
+                    rows = _validate_actions(db, job, pending)
+                    touched_emails.update(row["user_email"] for row in rows)
+                if rows:
+                    _copy_rows(db, staging, names, rows)
+                    job.rows_staged += len(rows)
+
+            for line, record in _records(job):
+                job.rows_read += 1
+                try:
+                    row = _parse(fields, record)
+                except ValueError as e:
+                    job.reject(line, str(e))
+                    continue
+
+                if job.table == "policies":
+                    if row.get("id") is not None:
+                        if row["id"] in seen_ids:
+                            job.reject(line, f"파일 안에서 id가 중복됩니다 ({row['id']})")
+                            continue
+                        seen_ids.add(row["id"])
+                    if "region" in row:
+                        row["region_code"] = region_code(row["region"])
+                    if "genre" in row:
+                        row["genre_code"] = genre_code(row["genre"])
+                else:
+                    if row["type"] not in ACTION_TYPES:
+                        job.reject(line, f"지원하지 않는 액션 종류입니다 ({row['type']})")
+                        continue
+                    if row.get("created_at") is None:
+                        row["created_at"] = datetime.now()
+
+                pending.append((line, row))
+                if len(pending) >= IMPORT_CHUNK:
+                    load(pending)
+                    pending = []
+            if pending:
+                load(pending)
+
+            # 스테이징 → 본 테이블 (한 문장씩, 전체가 한 트랜잭션)
+            if job.rows_staged:
+                merge = _merge_policies if job.table == "policies" else _merge_actions
+                job.rows_loaded = merge(db, staging, names)
+            staging.drop(db.connection())
+            db.commit()
+        except Exception:
+            db.rollback()
+            raise
+
+    if job.rows_loaded:
+        _refresh_derived(job.table, touched_emails)
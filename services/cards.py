@@ -0,0 +1,66 @@
+"""
+정책 카드 직렬화 캐시
+각 라우터의 카드 포맷 함수(serializer)가 만든 dict를 JSON bytes 조각으로 한 번만 인코딩해 두고,
+목록 응답은 조각을 이어 붙이기만 합니다.
+- 캐시 키: (카드 스타일, 정책 id), 값: (카드 버전, bytes)
+- 카드 버전 = (카탈로그 버전, 오늘 날짜) → 정책 수정/import 또는 날짜가 바뀌면 자동으로 다시 만듦
+- HTML <script> 안에 그대로 넣어도 안전하도록 Jinja tojson과 같은 방식으로 이스케이프
+"""
+import json
+import threading
+from datetime import date
+from typing import Callable, Iterable
+
+from cachetools import LRUCache
+from sqlalchemy.orm import Session
+
+from services.catalog import current_catalog_version
+
+# 스타일 4종 x 정책 수를 고려한 상한 (조각 1개 ≈ 0.5KB)
+MAX_CACHED_CARDS = 200_000
+
+_cache = LRUCache(maxsize=MAX_CACHED_CARDS)
+_lock = threading.Lock()
+
+
+def card_version(db: Session) -> tuple:
+    return (current_catalog_version(db), date.today().toordinal())
+
+
+def to_json_bytes(obj) -> bytes:
+    """HTML에 삽입해도 안전한 JSON (Jinja의 |tojson 과 같은 이스케이프)"""
+    text = json.dumps(obj, ensure_ascii=False, separators=(",", ":"))
+    text = (text.replace("<", "\\u003c").replace(">", "\\u003e")
+                .replace("&", "\\u0026").replace("'", "\\u0027"))
+    return text.encode("utf-8")
+
+
+def card_fragment(style: str, serializer: Callable, policy, version: tuple) -> bytes:
+    key = (style, policy.id)
+    with _lock:
+        cached = _cache.get(key)
+    if cached is not None and cached[0] == version:
+        return cached[1]
+
+    fragment = to_json_bytes(serializer(policy))
+    with _lock:
+        _cache[key] = (version, fragment)
+    return fragment
+
+
+def cards_array(style: str, serializer: Callable, policies: Iterable, version: tuple) -> bytes:
+    """카드 목록 → JSON 배열 bytes (b'[{...},{...}]')"""
+    return b"[" + b",".join(card_fragment(style, serializer, p, version) for p in policies) + b"]"
+
+
+def json_object(**fields) -> bytes:
+    """
+    이미 인코딩된 조각(bytes)과 일반 값을 섞어 JSON 객체 bytes 생성
+    예: json_object(items=cards_array(...), next_cursor="abc")
+    """
+    parts = []
+    for name, value in fields.items():
+        encoded = value if isinstance(value, bytes) else to_json_bytes(value)
+        parts.append(to_json_bytes(name) + b":" + encoded)
+    return b"{" + b",".join(parts) + b"}"
+
@@ -0,0 +1,66 @@
+"""
+정책 카탈로그 버전 관리
+being_test 내용이 바뀌는 곳(관리자 수정/삭제, import_all_data.py)에서 bump_catalog_version을 호출하고,
+메모리 캐시들은 current_catalog_version 값이 달라졌을 때만 다시 만듭니다.
+"""
+import time
+from datetime import datetime
+
+from sqlalchemy.orm import Session
+
+from models import CatalogMeta
+
+CATALOG_KEY = "policies"
+
+# 버전 확인 주기 (초) - 이 사이에는 DB를 전혀 보지 않고 마지막으로 읽은 값을 사용
+VERSION_CHECK_INTERVAL = 5.0
+
+_cached_state = None  # (version, updated_at)
+_checked_at = 0.0
+
+
+def get_catalog_state(db: Session) -> tuple:
+    """(version, 마지막 변경 시각) - 한 번도 바뀐 적 없으면 (0, None)"""
+    meta = db.get(CatalogMeta, CATALOG_KEY)
+    return (meta.version, meta.updated_at) if meta else (0, None)
+
+
+def get_catalog_version(db: Session) -> int:
+    return get_catalog_state(db)[0]
+
+
+def bump_catalog_version(db: Session) -> int:
+    """
+    버전을 1 올립니다. (커밋은 호출한 쪽에서 → 정책 변경과 같은 트랜잭션으로 반영)
+    """
+    meta = db.get(CatalogMeta, CATALOG_KEY, with_for_update=True)
+    if meta is None:
+        meta = CatalogMeta(key=CATALOG_KEY, version=0)
+        db.add(meta)
+    meta.version = (meta.version or 0) + 1
+    meta.updated_at = datetime.now()
+    db.flush()
+    return meta.version
+
+
+def current_catalog_state(db: Session) -> tuple:
+    """
+    프로세스 내 캐시된 (version, updated_at) (VERSION_CHECK_INTERVAL마다 한 번만 DB 확인)
+    """
+    global _cached_state, _checked_at
+    now = time.monotonic()
+    if _cached_state is None or now - _checked_at >= VERSION_CHECK_INTERVAL:
+        _cached_state = get_catalog_state(db)
+        _checked_at = now
+    return _cached_state
+
+
+def current_catalog_version(db: Session) -> int:
+    """메모리 캐시들의 무효화 기준으로 사용하는 카탈로그 버전"""
+    return current_catalog_state(db)[0]
+
+
+def invalidate_catalog_version():
+    """같은 프로세스에서 카탈로그를 바꾼 직후 호출 → 다음 요청에서 바로 버전 재확인"""
+    global _checked_at
+    _checked_at = 0.0
@@ -0,0 +1,255 @@
+"""
+정책 카탈로그 메모리 스냅샷 (읽기 전용, 컬럼 단위 NumPy 배열)
+/api/cards의 지역/카테고리/정렬 조회를 DB 대신 메모리에서 처리합니다.
+- 지역/장르는 DB의 표준 코드(region_code / genre_code)를 int16 배열로, 날짜는 정수(ordinal / 마이크로초)로 보관
+- 트렌드 점수(인기순)는 float, 점수가 갱신되면(trend 버전 변경) 주기 작업이 점수 배열만 바꾼 사본으로 교체
+  (요청 경로에서는 카탈로그 버전만 확인 → 액션이 쌓여도 being_test 전체를 다시 읽지 않음)
+- 필터는 벡터 마스크, 정렬은 정렬 모드별로 한 번 계산해 둔 순열(argsort)로 처리
+- catalog_meta 버전이 바뀌면 새 스냅샷을 통째로 만든 뒤 참조만 교체 (읽는 쪽은 락 없음)
+"""
+import copy
+import threading
+from collections import namedtuple
+from datetime import datetime, timedelta
+from typing import Dict, Optional
+
+import numpy as np
+from sqlalchemy.orm import Session
+
+from models import CatalogMeta, Policy, PolicyTrend
+from services.catalog import current_catalog_version
+from services.trending import TREND_VERSION_KEY
+
+_EPOCH = datetime(1970, 1, 1)
+_NULL_KEY = np.iinfo(np.int64).max  # NULLS LAST: 정규화된 키에서 항상 가장 큰 값
+_NULL_FLOAT_KEY = np.inf
+
+# 카드 직렬화에 필요한 필드만 담은 행 (Policy와 같은 속성 이름)
+PolicyRow = namedtuple("PolicyRow", [
+    "id", "title", "summary", "period", "link", "genre", "region",
+    "end_date", "is_active", "created_at", "view_count", "trend_score",
+    "region_code", "genre_code",
+])
+
+# 정렬 키로 쓰일 수 있는 컬럼 → 값 변환 방식
+_SORTABLE = {
+    "id": "int",
+    "view_count": "int",
+    "trend_score": "float",
+    "is_active": "bool",
+    "end_date": "date",
+    "created_at": "datetime",
+}
+
+
+def _to_key(kind: str, value):
+    if kind == "date":
+        return value.toordinal()
+    if kind == "datetime":
+        return (value - _EPOCH) // timedelta(microseconds=1)
+    if kind == "float":
+        return float(value)
+    return int(value)
+
+
+class CatalogSnapshot:
+    def __init__(self, version: int, rows: list):
+        self.version = version
+        self.trend_version = 0
+        self.built_at = datetime.now()
+        self.size = len(rows)
+        self.rows = rows
+
+        # 표준 지역/장르 코드 (코드가 없는 행은 -1 → 어떤 필터에도 걸리지 않음)
+        self.region_code = np.array([-1 if r.region_code is None else r.region_code for r in rows], dtype=np.int16)
+        self.genre_code = np.array([-1 if r.genre_code is None else r.genre_code for r in rows], dtype=np.int16)
+        # 지역 코드별 정책 수 (코드 없음(-1)은 0번 칸) - 마이페이지 활동 지수 분모 등
+        self._region_counts = np.bincount(self.region_code.astype(np.int64) + 1)
+
+        # 정렬 가능 컬럼: 정수 값 + NULL 마스크
+        self._values = {}
+        self._nulls = {}
+        for attr, kind in _SORTABLE.items():
+            raw = [getattr(r, attr) for r in rows]
+            nulls = np.array([v is None for v in raw], dtype=bool)
+            dtype = np.float64 if kind == "float" else np.int64
+            values = np.array([0 if v is None else _to_key(kind, v) for v in raw], dtype=dtype)
+            self._values[attr] = values
+            self._nulls[attr] = nulls
+        self.is_active = np.where(self._nulls["is_active"], -1, self._values["is_active"]).astype(np.int8)
+        self.ids = self._values["id"]
+
+        self._orders = {}
+        self._order_lock = threading.Lock()
+
+    # ---------- 정렬 ----------
+    def _normalized(self, attr: str, descending: bool) -> np.ndarray:
+        """오름차순 정렬 결과가 원하는 순서(방향 + NULLS LAST)와 같아지도록 변환한 키"""
+        values = -self._values[attr] if descending else self._values[attr].copy()
+        values[self._nulls[attr]] = _NULL_FLOAT_KEY if _SORTABLE[attr] == "float" else _NULL_KEY
+        return values
+
+    def _order(self, sort_name: str, sort_keys):
+        order = self._orders.get(sort_name)
+        if order is None:
+            with self._order_lock:
+                order = self._orders.get(sort_name)
+                if order is None:
+                    keys = [self._normalized(k.attr, k.descending) for k in sort_keys]
+                    # np.lexsort는 마지막 키가 1순위
+                    perm = np.lexsort(keys[::-1]) if self.size else np.empty(0, dtype=np.int64)
+                    order = (keys, perm, {k.attr for k in sort_keys})
+                    self._orders[sort_name] = order
+        return order[0], order[1]
+
+    # ---------- 트렌드 점수 교체 ----------
+    def with_trend_scores(self, trend_version: int, scores: Dict[int, float]) -> "CatalogSnapshot":
+        """
+        트렌드 점수만 바꾼 새 스냅샷 (나머지 배열/행은 공유, 원본은 그대로 → 읽는 쪽은 락 없이 계속 사용)
+        scores: {정책 id: 점수} 전체 (없는 정책은 점수 없음)
+        """
+        values = np.zeros(self.size, dtype=np.float64)
+        nulls = np.ones(self.size, dtype=bool)
+        if scores and self.size:
+            ids = np.fromiter(scores.keys(), dtype=np.int64, count=len(scores))
+            found = np.fromiter(scores.values(), dtype=np.float64, count=len(scores))
+            positions = np.minimum(np.searchsorted(self.ids, ids), self.size - 1)
+            hit = self.ids[positions] == ids
+            values[positions[hit]] = found[hit]
+            nulls[positions[hit]] = False
+
+        new = copy.copy(self)
+        new.trend_version = trend_version
+        new._values = dict(self._values, trend_score=values)
+        new._nulls = dict(self._nulls, trend_score=nulls)
+        # 커서 값은 행에서 읽으므로 점수가 바뀐 행만 새 값으로 교체
+        old_values, old_nulls = self._values["trend_score"], self._nulls["trend_score"]
+        changed = np.flatnonzero((old_nulls != nulls) | (~nulls & (old_values != values)))
+        if len(changed):
+            new.rows = list(self.rows)
+            for i in changed:
+                new.rows[i] = new.rows[i]._replace(trend_score=None if nulls[i] else float(values[i]))
+        # 트렌드 점수를 쓰지 않는 정렬 순열은 그대로 재사용
+        new._orders = {name: order for name, order in self._orders.items() if "trend_score" not in order[2]}
+        new._order_lock = threading.Lock()
+        return new
+
+    def _cursor_key(self, attr: str, descending: bool, value) -> int:
+        if value is None:
+            return _NULL_FLOAT_KEY if _SORTABLE[attr] == "float" else _NULL_KEY
+        v = _to_key(_SORTABLE[attr], value)
+        return -v if descending else v
+
+    # ---------- 조회 ----------
+    def query(
+        self,
+        sort_name: str,
+        sort_keys,
+        region: Optional[int] = None,
+        genre: Optional[int] = None,
+        closed_only: bool = False,
+        cursor_values: Optional[list] = None,
+        limit: int = 12,
+    ):
+        """
+        조건에 맞는 행을 정렬 순서대로 최대 limit개 반환 (region / genre는 표준 코드)
+        반환값: (행 목록, 다음 페이지 존재 여부)
+        """
+        mask = np.ones(self.size, dtype=bool)
+        if region is not None:
+            mask &= self.region_code == region
+        if genre is not None:
+            mask &= self.genre_code == genre
+        if closed_only:
+            mask &= self.is_active == 0
+
+        keys, perm = self._order(sort_name, sort_keys)
+
+        # 커서 이후: (k1, k2, ...) > (c1, c2, ...) 사전식 비교를 벡터로 계산
+        if cursor_values is not None:
+            after = np.zeros(self.size, dtype=bool)
+            same = np.ones(self.size, dtype=bool)
+            for key, sk, value in zip(keys, sort_keys, cursor_values):
+                c = self._cursor_key(sk.attr, sk.descending, value)
+                after |= same & (key > c)
+                same &= key == c
+            mask &= after
+
+        picked = perm[mask[perm]][:limit + 1]
+        has_more = len(picked) > limit
+        return [self.rows[i] for i in picked[:limit]], has_more
+
+    def region_count(self, codes) -> int:
+        """지역 코드 목록에 속한 정책 수"""
+        return int(sum(self._region_counts[c + 1] for c in set(codes) if 0 <= c + 1 < len(self._region_counts)))
+
+    def cursor_values(self, row: PolicyRow, sort_keys) -> list:
+        return [getattr(row, k.attr) for k in sort_keys]
+
+
+# ==================== [스냅샷 보관 / 갱신] ====================
+
+_snapshot: Optional[CatalogSnapshot] = None
+_build_lock = threading.Lock()
+
+
+def _read_trend_version(db: Session) -> int:
+    meta = db.get(CatalogMeta, TREND_VERSION_KEY)
+    return meta.version if meta else 0
+
+
+def build_snapshot(db: Session, version: int, trend_version: int = 0) -> CatalogSnapshot:
+    rows = [
+        PolicyRow(*r)
+        for r in db.query(
+            Policy.id, Policy.title, Policy.summary, Policy.period, Policy.link,
+            Policy.genre, Policy.region, Policy.end_date, Policy.is_active,
+            Policy.created_at, Policy.view_count, PolicyTrend.score,
+            Policy.region_code, Policy.genre_code,
+        ).outerjoin(PolicyTrend, PolicyTrend.policy_id == Policy.id)
+        .order_by(Policy.id).yield_per(2000)
+    ]
+    snapshot = CatalogSnapshot(version, rows)
+    snapshot.trend_version = trend_version
+    return snapshot
+
+
+def get_snapshot(db: Session) -> CatalogSnapshot:
+    """
+    최신 스냅샷 반환. 카탈로그 버전이 바뀌었으면 새로 만든 뒤 교체합니다.
+    (버전 확인 자체도 몇 초에 한 번뿐이라 평소에는 DB를 보지 않음)
+    트렌드 점수 갱신은 여기서 보지 않음 → refresh_trend_scores(주기 작업)가 점수 배열만 교체
+    """
+    global _snapshot
+    version = current_catalog_version(db)
+    current = _snapshot
+    if current is not None and current.version == version:
+        return current
+
+    with _build_lock:
+        if _snapshot is None or _snapshot.version != version:
+            trend_version = _read_trend_version(db)
+            _snapshot = build_snapshot(db, version, trend_version)
+            print(f"📦 카탈로그 스냅샷 생성: v{version} (트렌드 v{trend_version}), {_snapshot.size}건")
+        return _snapshot
+
+
+def refresh_trend_scores(db: Session) -> bool:
+    """
+    트렌드 버전이 스냅샷과 다르면 policy_trend 점수만 읽어 교체 (main.py 주기 작업, 워커마다 실행)
+    → 교체했으면 True (스냅샷이 아직 없으면 다음 요청이 만들 때 최신 점수로 만들어지므로 건너뜀)
+    """
+    global _snapshot
+    current = _snapshot
+    if current is None:
+        return False
+    trend_version = _read_trend_version(db)
+    if current.trend_version == trend_version:
+        return False
+
+    scores = dict(db.query(PolicyTrend.policy_id, PolicyTrend.score))
+    with _build_lock:
+        if _snapshot is not current:
+            return False  # 그 사이 카탈로그가 바뀌어 새로 만들어짐 (최신 점수 포함)
+        _snapshot = current.with_trend_scores(trend_version, scores)
+    return True
@@ -0,0 +1,308 @@
+"""
+정책 카탈로그 증분 동기화 (shared_being_test.json 등 원본 목록 → being_test)
+import_all_data.py처럼 TRUNCATE ... CASCADE 후 전체를 다시 넣으면 users_action까지 지워지고
+적재가 끝날 때까지 테이블이 잠기므로, original_id로 기존 정책과 맞춰 바뀐 것만 반영합니다.
+- 원본 레코드마다 내용 해시(content_hash)를 계산 → 저장된 해시와 같으면 건너뜀
+- 새 정책 / 내용이 바뀐 정책: BATCH_SIZE개씩 INSERT ... ON CONFLICT (original_id) DO UPDATE
+  (해시가 같으면 갱신하지 않는 조건 포함 → 같은 파일로 여러 번 돌려도 결과가 같음)
+- 원본에서 사라진 정책: 삭제하지 않고 is_active=False + sync_deactivated=True (찜/행동 로그 유지)
+  → 다음 동기화에서 다시 나타나면 내용이 같아도 다시 공개 (일부만 담긴 원본 파일로 영구히 숨겨지지 않도록)
+- 배치마다 짧은 트랜잭션으로 커밋 + 검색 색인/임베딩/장르 카운터는 바뀐 정책만 갱신
+  → 동기화 중에도 사이트는 평소처럼 읽힘, 메모리 캐시는 끝에 카탈로그 버전을 한 번 올려서 갱신
+- 조회수(view_count)와 공개 여부(is_active)는 사이트에서 바뀌는 값이라 기존 정책에는 덮어쓰지 않음
+  (공개 여부는 동기화가 직접 비활성화한 정책만 되돌림)
+- content_hash는 "마지막으로 동기화한 원본"의 해시 → 관리자가 고친 내용은 원본이 바뀌기 전까지 유지
+
+실행: python -m services.catalog_sync [파일] [--dry-run] [--keep-missing]
+"""
+import hashlib
+import json
+from collections import namedtuple
+from datetime import date, datetime
+from typing import Iterable, List, Optional
+
+from sqlalchemy import func, inspect, text, update
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session
+
+from models import Policy, genre_code, region_code
+
+ORIGINAL_ID_INDEX = "uq_being_test_original_id"
+DEFAULT_SOURCE = "shared_being_test.json"
+BATCH_SIZE = 500
+
+# 해시/동기화 대상 필드 (id, view_count, is_active는 사이트 쪽 값이라 제외)
+SYNC_FIELDS = ("title", "summary", "period", "link", "genre", "region", "created_at", "end_date")
+
+# 기존 DB에 추가할 동기화용 컬럼
+SYNC_COLUMNS = [
+    ("content_hash", "VARCHAR(64)"),
+    ("sync_deactivated", "BOOLEAN DEFAULT FALSE"),
+]
+
+SyncResult = namedtuple("SyncResult", ["inserted", "updated", "unchanged", "deactivated", "reactivated", "skipped"])
+
+
+def _parse_date(value) -> Optional[date]:
+    if value is None or value == "":
+        return None
+    if isinstance(value, datetime):
+        return value.date()
+    if isinstance(value, date):
+        return value
+    return date.fromisoformat(str(value)[:10])
+
+
+def _parse_datetime(value) -> Optional[datetime]:
+    if value is None or value == "":
+        return None
+    if isinstance(value, datetime):
+        return value
+    return datetime.fromisoformat(str(value))
+
+
+def _normalize(record: dict) -> dict:
+    """원본 레코드 → DB에 넣을 값 (빈 문자열은 NULL)"""
+    row = {}
+    for name in SYNC_FIELDS:
+        value = record.get(name)
+        if name == "created_at":
+            value = _parse_datetime(value)
+        elif name == "end_date":
+            value = _parse_date(value)
+        elif value == "":
+            value = None
+        row[name] = value
+    return row
+
+
+def content_hash(row: dict) -> str:
+    """정규화된 값의 sha256 (DB 행과 원본 레코드에서 같은 값이 나오도록 날짜는 ISO 문자열로)"""
+    values = []
+    for name in SYNC_FIELDS:
+        value = row.get(name)
+        if isinstance(value, (date, datetime)):
+            value = value.isoformat()
+        values.append(None if value == "" else value)
+    return hashlib.sha256(json.dumps(values, ensure_ascii=False).encode("utf-8")).hexdigest()
+
+
+# ==================== [마이그레이션] ====================
+
+def ensure_sync_columns(engine: Engine) -> bool:
+    """
+    기존 DB에 동기화용 컬럼(SYNC_COLUMNS) / original_id 부분 유니크 인덱스가 없으면 추가
+    → 동기화할 준비가 됐으면 True (original_id가 중복된 정책이 있으면 인덱스를 만들지 않고 False)
+    """
+    inspector = inspect(engine)
+    if Policy.__tablename__ not in inspector.get_table_names():
+        return False
+    existing = {c["name"] for c in inspector.get_columns(Policy.__tablename__)}
+    with engine.begin() as conn:
+        for column, ddl in SYNC_COLUMNS:
+            if column not in existing:
+                conn.execute(text(f"ALTER TABLE {Policy.__tablename__} ADD COLUMN {column} {ddl}"))
+    if any(ix["name"] == ORIGINAL_ID_INDEX for ix in inspector.get_indexes(Policy.__tablename__)):
+        return True
+
+    with Session(bind=engine) as db:
+        duplicates = db.query(Policy.original_id).filter(Policy.original_id.isnot(None))\
+            .group_by(Policy.original_id).having(func.count(Policy.id) > 1).limit(5).all()
+    if duplicates:
+        print(f"⚠️ original_id가 중복된 정책이 있어 동기화 인덱스를 만들지 않았습니다: {[d[0] for d in duplicates]}")
+        return False
+    index = next(ix for ix in Policy.__table__.indexes if ix.name == ORIGINAL_ID_INDEX)
+    index.create(bind=engine, checkfirst=True)
+    return True
+
+
+def backfill_content_hashes(db: Session, batch_size: int = 5000) -> int:
+    """
+    해시가 비어 있는 정책(전체 적재 직후 등)의 해시를 현재 DB 내용으로 채움 (커밋 포함) → 채운 행 수
+    그래야 첫 동기화에서 전체가 "바뀜"으로 잡히지 않음
+    """
+    filled = 0
+    while True:
+        rows = db.query(Policy.id, *[getattr(Policy, name) for name in SYNC_FIELDS]).filter(
+            Policy.original_id.isnot(None), Policy.content_hash.is_(None)
+        ).order_by(Policy.id).limit(batch_size).all()
+        if not rows:
+            break
+        db.execute(
+            update(Policy),
+            [{"id": row.id, "content_hash": content_hash(row._asdict())} for row in rows],
+            execution_options={"synchronize_session": False},
+        )
+        db.commit()
+        filled += len(rows)
+    return filled
+
+
+# ==================== [동기화] ====================
+
+def _insert(db: Session):
+    dialect = postgresql if db.get_bind().dialect.name == "postgresql" else sqlite
+    return dialect.insert(Policy)
+
+
+def _upsert_batch(db: Session, rows: List[dict]) -> List[int]:
+    """INSERT ... ON CONFLICT (original_id) DO UPDATE (해시가 다를 때만) → 실제로 쓴 정책 id"""
+    stmt = _insert(db).values(rows)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[Policy.original_id],
+        index_where=Policy.original_id.isnot(None),
+        set_={
+            name: stmt.excluded[name]
+            for name in (*SYNC_FIELDS, "content_hash", "region_code", "genre_code")
+        },
+        where=Policy.content_hash.is_distinct_from(stmt.excluded.content_hash),
+    ).returning(Policy.id)
+    return [pid for (pid,) in db.execute(stmt)]
+
+
+def _refresh_policies(db: Session, policy_ids: List[int], old_genre_codes: dict):
+    """동기화로 바뀐 정책의 검색 색인 / 임베딩 / 유저별 장르 카운터 갱신 (커밋은 호출한 쪽에서)"""
+    from services import search
+    from services.category_stats import move_policy_genre
+    from services.embeddings import index_policy_embedding
+
+    for policy in db.query(Policy).filter(Policy.id.in_(policy_ids)):
+        if policy.id in old_genre_codes:
+            move_policy_genre(db, policy.id, old_genre_codes[policy.id], policy.genre_code)
+        search.index_policy(db, policy)
+        index_policy_embedding(db, policy)
+
+
+def sync_policies(db: Session, records: Iterable[dict], deactivate_missing: bool = True,
+                  dry_run: bool = False, batch_size: int = BATCH_SIZE) -> SyncResult:
+    """
+    원본 레코드 목록을 being_test에 증분 반영 (배치마다 커밋) → 변경 요약
+    ensure_sync_columns로 original_id 유니크 인덱스가 준비돼 있어야 함
+    """
+    from services.catalog import bump_catalog_version, invalidate_catalog_version
+
+    # 현재 DB 상태: original_id → (id, 해시, 장르 코드, 공개 여부, 동기화로 비활성화됐는지)
+    existing = {
+        row.original_id: row
+        for row in db.query(
+            Policy.original_id, Policy.id, Policy.content_hash, Policy.genre_code, Policy.is_active,
+            Policy.sync_deactivated,
+        ).filter(Policy.original_id.isnot(None))
+    }
+
+    seen = set()
+    inserts, updates, reactivate = [], [], []
+    unchanged = skipped = 0
+    for record in records:
+        original_id = record.get("original_id")
+        original_id = str(original_id) if original_id not in (None, "") else None
+        # original_id 없음 / 파일 안 중복은 건너뜀
+        if original_id is None or original_id in seen:
+            skipped += 1
+            continue
+        # 날짜 형식 오류 / 제목 없음도 건너뜀 (원본에는 있으므로 비활성화 대상은 아님)
+        seen.add(original_id)
+        try:
+            row = _normalize(record)
+        except (TypeError, ValueError):
+            row = None
+        if row is None or not row["title"]:
+            skipped += 1
+            continue
+
+        row["original_id"] = original_id
+        row["content_hash"] = content_hash(row)
+        current = existing.get(original_id)
+        if current is not None and current.sync_deactivated:
+            reactivate.append(current.id)  # 지난 동기화에서 빠졌다가 다시 나타난 정책
+        if current is not None and current.content_hash == row["content_hash"]:
+            unchanged += 1
+            continue
+        row["region_code"] = region_code(row["region"])
+        row["genre_code"] = genre_code(row["genre"])
+        if current is None:
+            row["view_count"] = record.get("view_count") or 0
+            row["is_active"] = True
+            inserts.append(row)
+        else:
+            updates.append(row)
+
+    missing = [
+        row.id for original_id, row in existing.items()
+        if original_id not in seen and row.is_active is not False
+    ] if deactivate_missing else []
+
+    if dry_run:
+        return SyncResult(len(inserts), len(updates), unchanged, len(missing), len(reactivate), skipped)
+
+    old_genre_codes = {existing[row["original_id"]].id: existing[row["original_id"]].genre_code for row in updates}
+    inserted = updated = deactivated = reactivated = 0
+    # 다중 행 INSERT의 컬럼이 같도록 새 정책 / 기존 정책을 따로 묶음
+    for rows, is_new in ((inserts, True), (updates, False)):
+        for start in range(0, len(rows), batch_size):
+            written = _upsert_batch(db, rows[start:start + batch_size])
+            if written:
+                _refresh_policies(db, written, old_genre_codes)
+            db.commit()
+            if is_new:
+                inserted += len(written)
+            else:
+                updated += len(written)
+
+    for start in range(0, len(missing), batch_size):
+        deactivated += db.execute(
+            update(Policy).where(Policy.id.in_(missing[start:start + batch_size]), Policy.is_active.isnot(False))
+            .values(is_active=False, sync_deactivated=True),
+            execution_options={"synchronize_session": False},
+        ).rowcount
+        db.commit()
+
+    for start in range(0, len(reactivate), batch_size):
+        reactivated += db.execute(
+            update(Policy).where(Policy.id.in_(reactivate[start:start + batch_size]), Policy.sync_deactivated == True)
+            .values(is_active=True, sync_deactivated=False),
+            execution_options={"synchronize_session": False},
+        ).rowcount
+        db.commit()
+
+    if inserted or updated or deactivated or reactivated:
+        if inserted and db.get_bind().dialect.name == "postgresql":
+            # 새 정책이 늘어 DF가 달라졌으므로 임베딩은 전체 재계산 (정책 수천 건 규모라 금방 끝남)
+            from services.embeddings import rebuild_embeddings
+            rebuild_embeddings(db)
+        bump_catalog_version(db)  # 스냅샷 / 카드 캐시 / 알림 피드 / 관리자 필터 목록이 다시 만들어짐
+        db.commit()
+        invalidate_catalog_version()
+    return SyncResult(inserted, updated, unchanged, deactivated, reactivated, skipped)
+
+
+def load_records(path: str) -> List[dict]:
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def format_result(result: SyncResult, dry_run: bool = False) -> str:
+    prefix = "🔍 (dry-run) " if dry_run else "🔄 "
+    return (
+        f"{prefix}추가 {result.inserted} / 수정 {result.updated} / 변경 없음 {result.unchanged}"
+        f" / 비활성화 {result.deactivated} / 재공개 {result.reactivated} / 건너뜀 {result.skipped}"
+    )
+
+
+if __name__ == "__main__":
+    import sys
+
+    from database import SessionLocal, engine
+
+    args = [a for a in sys.argv[1:] if not a.startswith("--")]
+    dry_run = "--dry-run" in sys.argv
+    if not ensure_sync_columns(engine):
+        sys.exit(1)
+    with SessionLocal() as session:
+        backfill_content_hashes(session)
+        result = sync_policies(
+            session, load_records(args[0] if args else DEFAULT_SOURCE),
+            deactivate_missing="--keep-missing" not in sys.argv, dry_run=dry_run,
+        )
+    print(format_result(result, dry_run))
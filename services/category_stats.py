@@ -0,0 +1,155 @@
+"""
+유저별 장르 버킷 찜/패스 카운터 (user_category_stats)
+MBTI / 관심 분야 차트 / 활동 지수가 유저의 액션 기록 전체를 읽는 대신 장르별 행 몇 개만 읽도록,
+액션이 저장/삭제되는 곳에서 같은 트랜잭션으로 카운터를 더하고 뺍니다. (커밋은 모두 호출한 쪽에서)
+- record_action / record_actions: like/pass 저장 직후 +1 (일괄 저장은 (유저, 버킷)별로 모아서)
+- remove_actions: 찜 취소/선택 삭제 - DELETE ... RETURNING으로 실제 지운 행의 장르별 개수만큼 -1
+- move_policy_genre: 관리자가 정책 장르를 바꾸면 그 정책에 남긴 액션 수만큼 버킷 이동
+- rebuild_category_stats: users_action에서 전체 재집계 (최초 적재 / 어긋났을 때)
+
+실행: python -m services.category_stats  (전체 재집계)
+"""
+from collections import Counter
+from typing import Dict, Iterable, Optional
+
+from sqlalchemy import case, delete, func, insert, select, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from models import Policy, UserAction, UserCategoryStat
+
+# 장르를 알 수 없는 정책(코드 없음, 삭제된 정책)의 버킷 = 기타
+OTHER_BUCKET = 0
+
+# 카운터로 관리하는 액션 종류 → 컬럼
+COUNTED_TYPES = {
+    "like": "likes",
+    "pass": "passes",
+}
+
+
+def _bucket(code: Optional[int]) -> int:
+    return OTHER_BUCKET if code is None else code
+
+
+def _add(db: Session, user_email: str, bucket: int, column: str, delta: int):
+    """(유저, 버킷) 행의 column에 delta를 더함 - 행이 없으면 만듦"""
+    if not delta:
+        return
+    target = getattr(UserCategoryStat, column)
+    stmt = update(UserCategoryStat).where(
+        UserCategoryStat.user_email == user_email,
+        UserCategoryStat.genre_code == bucket,
+    ).values({column: target + delta}).execution_options(synchronize_session=False)
+    if db.execute(stmt).rowcount:
+        return
+    values = {"likes": 0, "passes": 0}
+    values[column] = max(delta, 0)  # 행이 없는데 빼는 경우(어긋난 카운터)는 0에서 시작
+    try:
+        with db.begin_nested():
+            db.add(UserCategoryStat(user_email=user_email, genre_code=bucket, **values))
+    except IntegrityError:
+        # 동시에 같은 행을 처음 만든 요청이 있으면 그 행에 더함
+        db.execute(stmt)
+
+
+def record_action(db: Session, user_email: str, policy_id: int, action_type: str, count: int = 1):
+    """액션 저장 직후 호출 (like/pass 외의 종류는 무시)"""
+    column = COUNTED_TYPES.get(action_type)
+    if column is None:
+        return
+    code = db.query(Policy.genre_code).filter(Policy.id == policy_id).scalar()
+    _add(db, user_email, _bucket(code), column, count)
+
+
+def record_actions(db: Session, actions: Iterable[tuple]):
+    """여러 액션 (user_email, policy_id, action_type)을 한 번에 반영 - 정책 장르는 IN 조회 한 번"""
+    actions = [a for a in actions if a[2] in COUNTED_TYPES]
+    if not actions:
+        return
+    policy_ids = list({policy_id for _, policy_id, _ in actions})
+    codes = dict(db.query(Policy.id, Policy.genre_code).filter(Policy.id.in_(policy_ids)))
+    deltas = Counter(
+        (user_email, _bucket(codes.get(policy_id)), COUNTED_TYPES[action_type])
+        for user_email, policy_id, action_type in actions
+    )
+    for (user_email, bucket, column), count in deltas.items():
+        _add(db, user_email, bucket, column, count)
+
+
+def remove_actions(db: Session, user_email: str, action_type: str, policy_ids: Iterable[int]) -> int:
+    """
+    유저의 action_type 액션 중 policy_ids에 해당하는 행을 DELETE ... RETURNING 한 문장으로 삭제하고
+    실제로 지운 행만큼 카운터를 뺌 → 삭제한 행 수 (0이면 상태 변화 없음)
+    """
+    deleted = db.execute(
+        delete(UserAction).where(
+            UserAction.user_email == user_email,
+            UserAction.type == action_type,
+            UserAction.policy_id.in_(list(policy_ids)),
+        ).returning(UserAction.policy_id),
+        execution_options={"synchronize_session": False},
+    ).scalars().all()
+    if not deleted:
+        return 0
+
+    column = COUNTED_TYPES.get(action_type)
+    if column is not None:
+        codes = dict(db.query(Policy.id, Policy.genre_code).filter(Policy.id.in_(set(deleted))))
+        removed = Counter(_bucket(codes.get(policy_id)) for policy_id in deleted)
+        for bucket, count in removed.items():
+            _add(db, user_email, bucket, column, -count)
+    return len(deleted)
+
+
+def move_policy_genre(db: Session, policy_id: int, old_code: Optional[int], new_code: Optional[int]):
+    """정책 장르 변경 시 그 정책에 액션을 남긴 유저들의 카운터를 새 버킷으로 옮김"""
+    old_bucket, new_bucket = _bucket(old_code), _bucket(new_code)
+    if old_bucket == new_bucket:
+        return
+    rows = db.query(UserAction.user_email, UserAction.type, func.count(UserAction.id)).filter(
+        UserAction.policy_id == policy_id,
+        UserAction.type.in_(list(COUNTED_TYPES))
+    ).group_by(UserAction.user_email, UserAction.type)
+    for user_email, action_type, count in rows:
+        column = COUNTED_TYPES[action_type]
+        _add(db, user_email, old_bucket, column, -count)
+        _add(db, user_email, new_bucket, column, count)
+
+
+def get_category_stats(db: Session, user_email: str) -> Dict[int, tuple]:
+    """{장르 버킷: (찜 수, 패스 수)}"""
+    return {
+        code: (likes, passes)
+        for code, likes, passes in db.query(
+            UserCategoryStat.genre_code, UserCategoryStat.likes, UserCategoryStat.passes
+        ).filter(UserCategoryStat.user_email == user_email)
+    }
+
+
+def rebuild_category_stats(db: Session) -> int:
+    """users_action 전체 재집계 (커밋 포함) → 저장한 행 수"""
+    bucket = func.coalesce(Policy.genre_code, OTHER_BUCKET)
+    totals = select(
+        UserAction.user_email,
+        bucket,
+        func.sum(case((UserAction.type == "like", 1), else_=0)),
+        func.sum(case((UserAction.type == "pass", 1), else_=0)),
+    ).select_from(UserAction).outerjoin(Policy, Policy.id == UserAction.policy_id).where(
+        UserAction.user_email.isnot(None),
+        UserAction.type.in_(list(COUNTED_TYPES)),
+    ).group_by(UserAction.user_email, bucket)
+
+    db.execute(delete(UserCategoryStat))
+    result = db.execute(insert(UserCategoryStat).from_select(
+        ["user_email", "genre_code", "likes", "passes"], totals
+    ))
+    db.commit()
+    return result.rowcount
+
+
+if __name__ == "__main__":
+    from database import SessionLocal
+
+    with SessionLocal() as session:
+        print(f"📊 유저별 장르 카운터 재집계 완료 ({rebuild_category_stats(session)}행)")
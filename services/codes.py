@@ -0,0 +1,67 @@
+"""
+표준 지역/장르 코드 컬럼 관리 (being_test.region_code / genre_code, users.region_code)
+코드 사전과 변환 함수는 models.py(REGION_CODES, GENRE_CODES, region_code, genre_code)에 있고,
+ORM으로 저장되는 행은 이벤트로 자동 계산되므로 여기서는 그 밖의 경우만 처리합니다.
+- ensure_code_columns: 기존 DB에 컬럼/인덱스 추가 (create_all은 기존 테이블에 컬럼을 추가하지 않음)
+- backfill_codes: 원시 SQL로 적재된 행(import_all_data.py) 등 코드가 비어 있거나 틀린 행 채우기
+  지역/장르의 서로 다른 값은 수십 개뿐이라 값별 UPDATE 한 번씩으로 끝남
+
+실행: python -m services.codes
+"""
+from sqlalchemy import inspect, text, update
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session
+
+from models import Policy, User, genre_code, region_code
+
+# (테이블, 컬럼) - 인덱스 이름은 SQLAlchemy 기본 규칙(ix_테이블_컬럼)과 같게
+CODE_COLUMNS = [
+    ("being_test", "region_code"),
+    ("being_test", "genre_code"),
+    ("users", "region_code"),
+]
+
+
+def ensure_code_columns(engine: Engine) -> int:
+    """없는 코드 컬럼/인덱스 추가 → 추가한 컬럼 수"""
+    inspector = inspect(engine)
+    added = 0
+    with engine.begin() as conn:
+        for table, column in CODE_COLUMNS:
+            if table not in inspector.get_table_names():
+                continue
+            existing = {c["name"] for c in inspector.get_columns(table)}
+            if column not in existing:
+                conn.execute(text(f"ALTER TABLE {table} ADD COLUMN {column} SMALLINT"))
+                added += 1
+            conn.execute(text(f"CREATE INDEX IF NOT EXISTS ix_{table}_{column} ON {table} ({column})"))
+    return added
+
+
+def _backfill(db: Session, model, source, target, convert) -> int:
+    updated = 0
+    for (value,) in db.query(source).distinct():
+        code = convert(value)
+        condition = source.is_(None) if value is None else source == value
+        updated += db.execute(
+            update(model).where(condition, target.is_distinct_from(code)).values({target.key: code}),
+            execution_options={"synchronize_session": False},
+        ).rowcount
+    return updated
+
+
+def backfill_codes(db: Session) -> int:
+    """region/genre 값별로 코드 컬럼 갱신 (커밋 포함) → 바뀐 행 수"""
+    updated = _backfill(db, Policy, Policy.region, Policy.region_code, region_code)
+    updated += _backfill(db, Policy, Policy.genre, Policy.genre_code, genre_code)
+    updated += _backfill(db, User, User.region, User.region_code, region_code)
+    db.commit()
+    return updated
+
+
+if __name__ == "__main__":
+    from database import SessionLocal, engine
+
+    print(f"🏷️ 코드 컬럼 추가: {ensure_code_columns(engine)}개")
+    with SessionLocal() as session:
+        print(f"🏷️ 지역/장르 코드 채우기 완료 ({backfill_codes(session)}행)")
@@ -0,0 +1,143 @@
+"""
+응답 압축 미들웨어 (Accept-Encoding 협상: br > gzip)
+- JSON/HTML/JS/CSS/SVG 같은 텍스트 응답만 압축
+- ETag가 붙은 응답(카탈로그 JSON, /static 파일)은 (ETag, 경로, 인코딩)별로 압축 결과를 저장해
+  같은 버전은 한 번만 압축하고 이후에는 저장된 bytes를 그대로 보냄
+- 압축본은 원본과 바이트가 다르므로 ETag를 약한(W/) ETag로 바꿔서 내려줌
+  (If-None-Match 비교 시 conditional.py / StaticFiles 모두 W/ 접두어를 무시함)
+"""
+import gzip
+import threading
+
+from cachetools import LRUCache
+from starlette.datastructures import Headers, MutableHeaders
+
+try:
+    import brotli
+except ImportError:  # brotli 미설치 환경에서는 gzip만 사용
+    brotli = None
+
+MIN_SIZE = 500                        # 이보다 작으면 압축 이득이 없음
+MAX_SIZE = 4 * 1024 * 1024            # 이보다 큰 응답은 버퍼링하지 않고 그대로 통과
+CACHE_BYTES = 64 * 1024 * 1024        # 압축 결과 캐시 총 용량
+
+COMPRESSIBLE_TYPES = (
+    "application/json",
+    "application/javascript",
+    "text/",
+    "image/svg+xml",
+)
+
+_cache = LRUCache(maxsize=CACHE_BYTES, getsizeof=len)
+_lock = threading.Lock()
+
+
+def choose_encoding(accept_encoding: str):
+    """Accept-Encoding에서 q>0인 인코딩 중 br → gzip 순으로 선택"""
+    accepted = set()
+    for part in accept_encoding.lower().split(","):
+        name, _, params = part.strip().partition(";")
+        q = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                q = float(params[2:])
+            except ValueError:
+                q = 0.0
+        if q > 0:
+            accepted.add(name.strip())
+    if brotli is not None and "br" in accepted:
+        return "br"
+    if "gzip" in accepted or "*" in accepted:
+        return "gzip"
+    return None
+
+
+def compress(body: bytes, encoding: str) -> bytes:
+    if encoding == "br":
+        return brotli.compress(body, quality=5)
+    return gzip.compress(body, compresslevel=6)
+
+
+def _is_compressible(headers: Headers) -> bool:
+    if "content-encoding" in headers:
+        return False
+    content_type = headers.get("content-type", "")
+    if not content_type.startswith(COMPRESSIBLE_TYPES):
+        return False
+    length = headers.get("content-length")
+    if length is None or not length.isdigit():
+        return False  # 길이를 모르는 스트리밍 응답은 통과
+    return MIN_SIZE <= int(length) <= MAX_SIZE
+
+
+class CompressionMiddleware:
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        # HEAD 응답은 본문이 없으므로 압축 대상 아님
+        if scope["type"] != "http" or scope.get("method") == "HEAD":
+            await self.app(scope, receive, send)
+            return
+
+        encoding = choose_encoding(Headers(scope=scope).get("accept-encoding", ""))
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+
+        start_message = None
+        body_parts = []
+        passthrough = False
+
+        async def send_wrapper(message):
+            nonlocal start_message, passthrough
+            if passthrough:
+                await send(message)
+                return
+
+            if message["type"] == "http.response.start":
+                headers = Headers(raw=message["headers"])
+                if message["status"] != 200 or not _is_compressible(headers):
+                    passthrough = True
+                    await send(message)
+                    return
+                start_message = message
+                return
+
+            if message["type"] == "http.response.body":
+                body_parts.append(message.get("body", b""))
+                if message.get("more_body", False):
+                    return
+                await self._send_compressed(scope, send, start_message, b"".join(body_parts), encoding)
+                return
+
+            await send(message)
+
+        await self.app(scope, receive, send_wrapper)
+
+    async def _send_compressed(self, scope, send, start_message, body, encoding):
+        headers = MutableHeaders(raw=start_message["headers"])
+        etag = headers.get("etag")
+
+        compressed = None
+        cache_key = None
+        if etag:
+            cache_key = (etag, scope.get("path"), encoding)
+            with _lock:
+                compressed = _cache.get(cache_key)
+
+        if compressed is None:
+            compressed = compress(body, encoding)
+            if cache_key is not None:
+                with _lock:
+                    _cache[cache_key] = compressed
+
+        headers["content-encoding"] = encoding
+        headers["content-length"] = str(len(compressed))
+        headers.add_vary_header("Accept-Encoding")
+        if etag and not etag.startswith("W/"):
+            headers["etag"] = f"W/{etag}"
+
+        await send(start_message)
+        await send({"type": "http.response.body", "body": compressed})
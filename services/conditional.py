@@ -0,0 +1,76 @@
+"""
+조건부 GET (ETag / Last-Modified)
+카탈로그에만 의존하는 응답은 (카탈로그 버전 + 정규화된 쿼리 파라미터)로 강한 ETag를 만들고,
+브라우저가 보낸 If-None-Match / If-Modified-Since가 맞으면 DB 조회 없이 304를 돌려줍니다.
+- 카탈로그 외의 버전(extra)에도 의존하는 응답은 Last-Modified를 보내지 않음
+  (카탈로그 수정 시각만으로는 트렌드 갱신을 알 수 없어 If-Modified-Since만 보낸 클라이언트가 낡은 순위로 304를 받음)
+"""
+import hashlib
+from datetime import timezone
+from email.utils import format_datetime, parsedate_to_datetime
+from typing import Optional
+
+from fastapi import Request
+from fastapi.responses import Response
+from sqlalchemy.orm import Session
+
+from services.catalog import current_catalog_state
+
+# 매번 서버에 재검증 요청 (304면 본문 없이 끝남)
+CACHE_CONTROL = "no-cache"
+
+
+class CatalogValidators:
+    def __init__(self, etag: str, last_modified: Optional[str], last_modified_dt):
+        self.etag = etag
+        self.last_modified = last_modified
+        self._last_modified_dt = last_modified_dt
+
+    def matches(self, request: Request) -> bool:
+        """요청의 조건부 헤더가 현재 버전과 일치하는지 (If-None-Match 우선)"""
+        if_none_match = request.headers.get("if-none-match")
+        if if_none_match is not None:
+            tags = [t.strip() for t in if_none_match.split(",")]
+            return "*" in tags or self.etag in tags or f"W/{self.etag}" in tags
+
+        if_modified_since = request.headers.get("if-modified-since")
+        if if_modified_since and self._last_modified_dt is not None:
+            try:
+                since = parsedate_to_datetime(if_modified_since)
+            except (TypeError, ValueError):
+                return False
+            return self._last_modified_dt.replace(microsecond=0) <= since
+        return False
+
+    def apply(self, response: Response) -> Response:
+        response.headers["ETag"] = self.etag
+        response.headers["Cache-Control"] = CACHE_CONTROL
+        if self.last_modified:
+            response.headers["Last-Modified"] = self.last_modified
+        return response
+
+    def not_modified(self) -> Response:
+        return self.apply(Response(status_code=304))
+
+
+def _normalized_params(request: Request) -> str:
+    """빈 값은 버리고 이름순 정렬 → 파라미터 순서만 다른 URL도 같은 ETag"""
+    items = sorted((k, v) for k, v in request.query_params.multi_items() if v != "")
+    return "&".join(f"{k}={v}" for k, v in items)
+
+
+def catalog_validators(request: Request, db: Session, scope: str, extra: str = "") -> CatalogValidators:
+    """
+    scope: 엔드포인트 구분자 (같은 파라미터라도 엔드포인트가 다르면 다른 ETag)
+    extra: 카탈로그 외에 응답이 의존하는 버전 (예: 인기순 정렬의 트렌드 버전)
+           → 지정하면 ETag로만 검증 (Last-Modified 없음, If-Modified-Since 무시)
+    """
+    version, updated_at = current_catalog_state(db)
+    raw = f"{scope}|v{version}|{extra}|{request.url.path}|{_normalized_params(request)}"
+    etag = '"' + hashlib.sha1(raw.encode("utf-8")).hexdigest()[:24] + '"'
+
+    last_modified = last_modified_dt = None
+    if updated_at is not None and not extra:
+        last_modified_dt = updated_at.astimezone(timezone.utc)
+        last_modified = format_datetime(last_modified_dt, usegmt=True)
+    return CatalogValidators(etag, last_modified, last_modified_dt)
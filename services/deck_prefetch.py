@@ -0,0 +1,122 @@
+"""
+다음 스와이프 덱 미리 만들기 (세션 토큰별)
+덱을 내려준 직후 백그라운드에서 다음 덱을 만들어 두고, /api/main/more-cards는 저장된 덱을 꺼내기만 합니다.
+- 저장: (토큰, 지역 필터) -> (카탈로그 버전, 덱), PREFETCH_TTL이 지나면 만료
+- 꺼낼 때 카탈로그 버전이 다르거나, 그사이 (동시 요청 등으로) 본 것으로 표시된 정책이 덱에 섞여 있으면
+  버리고 새로 만듦 (잘리거나 빈 덱을 내려주지 않도록 미스로 처리)
+- 덱 생성 시간은 build_stats에 기록 (/admin/metrics/deck, Server-Timing 헤더)
+"""
+import threading
+import time
+from collections import deque
+from typing import List, Optional, Tuple
+
+from cachetools import TTLCache
+from sqlalchemy.orm import Session
+
+from database import SessionLocal
+from services.catalog import current_catalog_version
+from services.deck_sampler import build_deck
+from services.seen_set import SeenBitmap, load_seen
+
+PREFETCH_TTL = 10 * 60          # 초 단위 (10분)
+MAX_PREFETCHED = 20_000         # 미리 만들어 둘 세션 수 상한
+STATS_WINDOW = 1000             # 백분위 계산에 쓰는 최근 측정 개수
+
+_decks = TTLCache(maxsize=MAX_PREFETCHED, ttl=PREFETCH_TTL)
+_pending = set()
+_lock = threading.Lock()
+
+
+class DeckBuildStats:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._recent = deque(maxlen=STATS_WINDOW)
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+        self.prefetch_hits = 0
+        self.prefetch_misses = 0
+
+    def record(self, seconds: float):
+        with self._lock:
+            self._recent.append(seconds)
+            self.count += 1
+            self.total += seconds
+            self.max = max(self.max, seconds)
+
+    def record_lookup(self, hit: bool):
+        with self._lock:
+            if hit:
+                self.prefetch_hits += 1
+            else:
+                self.prefetch_misses += 1
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            recent = sorted(self._recent)
+            lookups = self.prefetch_hits + self.prefetch_misses
+
+            def percentile(p):
+                return round(recent[min(len(recent) - 1, int(len(recent) * p))] * 1000, 2) if recent else 0.0
+
+            return {
+                "builds": self.count,
+                "avg_ms": round(self.total / self.count * 1000, 2) if self.count else 0.0,
+                "p50_ms": percentile(0.50),
+                "p95_ms": percentile(0.95),
+                "max_ms": round(self.max * 1000, 2),
+                "prefetch_hits": self.prefetch_hits,
+                "prefetch_misses": self.prefetch_misses,
+                "prefetch_hit_rate": round(self.prefetch_hits / lookups, 3) if lookups else 0.0,
+                "prefetched_sessions": len(_decks),
+            }
+
+
+build_stats = DeckBuildStats()
+
+
+def timed_build_deck(db: Session, regions: List[int], exclude_ids=None, slider_size: int = 0) -> Tuple[list, list, float]:
+    """build_deck + 소요 시간(초) 기록"""
+    started = time.perf_counter()
+    deck, slider = build_deck(db, regions, exclude_ids, slider_size=slider_size)
+    elapsed = time.perf_counter() - started
+    build_stats.record(elapsed)
+    return deck, slider, elapsed
+
+
+def take_prefetched(db: Session, token: str, regions: List[int], seen: SeenBitmap) -> Optional[list]:
+    """미리 만든 덱 꺼내기 (없거나, 카탈로그가 바뀌었거나, 이미 본 정책이 섞여 있으면 None)"""
+    with _lock:
+        entry = _decks.pop((token, tuple(regions)), None)
+    deck = None
+    if entry is not None and entry[0] == current_catalog_version(db):
+        deck = entry[1]
+        if any(p.id in seen for p in deck):
+            deck = None  # 걸러내면 덱이 짧아지므로 새로 만드는 쪽이 나음
+    build_stats.record_lookup(deck is not None)
+    return deck
+
+
+def prefetch_next_deck(token: str, regions: List[int]):
+    """
+    백그라운드 작업: 토큰의 비트맵을 제외하고 다음 덱을 만들어 저장
+    (요청이 끝난 뒤 실행되므로 별도 세션 사용)
+    """
+    key = (token, tuple(regions))
+    with _lock:
+        if key in _pending:
+            return
+        _pending.add(key)
+    try:
+        with SessionLocal() as db:
+            seen = load_seen(db, token) or SeenBitmap()
+            version = current_catalog_version(db)
+            deck, _, _ = timed_build_deck(db, regions, seen)
+        with _lock:
+            _decks[key] = (version, deck)
+    except Exception as e:
+        print(f"⚠️ 다음 덱 미리 만들기 실패: {e}")
+    finally:
+        with _lock:
+            _pending.discard(key)
@@ -0,0 +1,130 @@
+"""
+스와이프 덱 랜덤 추출기
+ORDER BY random() LIMIT k (필터된 테이블 전체 정렬) 대신,
+카탈로그 스냅샷에서 (지역 코드, 장르 코드)별 행 번호 풀을 만들어 두고 무작위 인덱스를 k번 뽑습니다.
+- 제외 ID(exclude_ids)는 뽑은 뒤 거절하는 방식 → 제외가 드문 보통의 경우 O(k)
+  (set 또는 seen_set.SeenBitmap - `in` 검사만 하므로 세션 비트맵을 그대로 넘김)
+- 풀 대부분이 제외된 경우에만 남은 후보를 모아서 추출
+- 카탈로그 버전이 바뀌면 (스냅샷과 함께) 풀도 다시 만듦
+- build_deck: /main.html, /api/main/more-cards 공용 (덱 + 슬라이더를 한 번에, DB 왕복 없음)
+"""
+import random
+import threading
+from typing import Iterable, List, Optional, Tuple
+
+from sqlalchemy.orm import Session
+
+from models import GENRE_SHORT_CODES
+from services.catalog_snapshot import CatalogSnapshot, get_snapshot
+
+# 메인 페이지 카드 카테고리 → 장르 코드 (덱 버킷)
+TARGET_CATEGORIES = ["취업", "창업", "주거", "금융", "교육", "복지"]
+TARGET_GENRES = [GENRE_SHORT_CODES[cat] for cat in TARGET_CATEGORIES]
+
+# 거절 샘플링 시도 횟수 배수 (이만큼 실패하면 남은 후보를 직접 모음)
+MAX_ATTEMPTS_PER_PICK = 8
+
+
+class DeckSampler:
+    def __init__(self, snapshot: CatalogSnapshot):
+        self.version = snapshot.version
+        self.rows = snapshot.rows
+
+        # (region_code, genre_code) -> 행 번호 목록 / genre_code=None 은 장르 무관 (슬라이더용)
+        pools = {}
+        for i, row in enumerate(self.rows):
+            if row.region_code is None:
+                continue
+            pools.setdefault((row.region_code, None), []).append(i)
+            if row.genre_code is not None:
+                pools.setdefault((row.region_code, row.genre_code), []).append(i)
+        self._pools = pools
+
+    def sample(
+        self,
+        regions: Iterable[int],
+        bucket: Optional[int],
+        k: int,
+        exclude_ids: Optional[set] = None,
+        taken: Optional[set] = None,
+    ) -> list:
+        """
+        regions(지역 코드) 중 하나에 속하고 bucket 장르 코드인 정책을 최대 k개 무작위 추출
+        taken: 이번 덱에서 이미 뽑은 id (뽑힌 id가 추가됨 → 카테고리 간 중복 방지)
+        """
+        exclude_ids = exclude_ids or set()
+        taken = taken if taken is not None else set()
+        pools = [p for p in (self._pools.get((r, bucket)) for r in regions) if p]
+        total = sum(len(p) for p in pools)
+        if total == 0 or k <= 0:
+            return []
+
+        picked = []
+        attempts = 0
+        while len(picked) < k and attempts < k * MAX_ATTEMPTS_PER_PICK:
+            attempts += 1
+            j = random.randrange(total)
+            for pool in pools:
+                if j < len(pool):
+                    row = self.rows[pool[j]]
+                    break
+                j -= len(pool)
+            if row.id in exclude_ids or row.id in taken:
+                continue
+            picked.append(row)
+            taken.add(row.id)
+
+        if len(picked) < k:
+            # 후보 대부분이 제외된 경우: 남은 후보만 모아서 추출
+            remaining = [
+                self.rows[i] for pool in pools for i in pool
+                if self.rows[i].id not in exclude_ids and self.rows[i].id not in taken
+            ]
+            extra = random.sample(remaining, min(k - len(picked), len(remaining)))
+            taken.update(row.id for row in extra)
+            picked.extend(extra)
+        return picked
+
+
+_sampler: Optional[DeckSampler] = None
+_lock = threading.Lock()
+
+
+def get_sampler(db: Session) -> DeckSampler:
+    global _sampler
+    snapshot = get_snapshot(db)
+    current = _sampler
+    if current is not None and current.version == snapshot.version:
+        return current
+    with _lock:
+        if _sampler is None or _sampler.version != snapshot.version:
+            _sampler = DeckSampler(snapshot)
+        return _sampler
+
+
+def draw_deck(db: Session, regions: List[int], exclude_ids: Optional[set] = None, per_category: int = 3) -> list:
+    """카테고리별 per_category개씩 뽑아 섞은 스와이프 덱 (스냅샷 행 목록)"""
+    sampler = get_sampler(db)
+    taken = set()
+    picks = []
+    for genre in TARGET_GENRES:
+        picks.extend(sampler.sample(regions, genre, per_category, exclude_ids, taken))
+    random.shuffle(picks)
+    return picks
+
+
+def draw_slider(db: Session, regions: List[int], size: int = 20) -> list:
+    """슬라이더용: 장르 무관 size개"""
+    return get_sampler(db).sample(regions, None, size)
+
+
+def build_deck(
+    db: Session,
+    regions: List[int],
+    exclude_ids: Optional[set] = None,
+    slider_size: int = 0,
+) -> Tuple[list, list]:
+    """/main.html, /api/main/more-cards 공용: (스와이프 덱, 슬라이더) - 스냅샷 풀에서 추출"""
+    deck = draw_deck(db, regions, exclude_ids)
+    slider = draw_slider(db, regions, slider_size) if slider_size > 0 else []
+    return deck, slider
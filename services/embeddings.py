@@ -0,0 +1,193 @@
+"""
+내용 기반 "비슷한 정책" (외부 모델 API 없이 오프라인 임베딩)
+- 특징: 제목/요약의 글자 2·3-gram (토큰 내부) + 장르/지역 토큰, 필드별 가중치
+- 벡터: 특징을 EMBEDDING_DIM 칸으로 해싱(부호 해싱)하고 TF-IDF 가중치를 준 뒤 L2 정규화
+- 저장/검색: PostgreSQL은 policy_embedding(pgvector) + HNSW 인덱스 코사인 거리,
+  그 외(SQLite 테스트 등)는 카탈로그 스냅샷으로 만든 NumPy 행렬에서 전수 비교
+"""
+import math
+import threading
+import zlib
+from collections import Counter
+from typing import Iterable, List, Optional
+
+import numpy as np
+from sqlalchemy import delete, insert
+from sqlalchemy.orm import Session
+
+from models import EMBEDDING_DIM, Policy, PolicyEmbedding
+from services.catalog_snapshot import get_snapshot
+from services.search import tokenize
+
+NGRAM_SIZES = (2, 3)
+TITLE_WEIGHT = 2.0
+SUMMARY_WEIGHT = 1.0
+GENRE_WEIGHT = 3.0
+REGION_WEIGHT = 1.5
+
+
+def policy_features(title: Optional[str], summary: Optional[str], genre: Optional[str], region: Optional[str]) -> Counter:
+    """정책 1건의 특징 → 가중 빈도"""
+    features = Counter()
+    for text, weight in ((title, TITLE_WEIGHT), (summary, SUMMARY_WEIGHT)):
+        for token in tokenize(text):
+            if len(token) < NGRAM_SIZES[0]:
+                features[token] += weight
+                continue
+            for n in NGRAM_SIZES:
+                for i in range(len(token) - n + 1):
+                    features[token[i:i + n]] += weight
+    if genre:
+        features["g:" + genre] += GENRE_WEIGHT
+        features["g:" + genre.split("/")[0]] += GENRE_WEIGHT
+    if region:
+        features["r:" + region] += REGION_WEIGHT
+    return features
+
+
+def _bucket(feature: str):
+    """특징 → (칸 번호, 부호) / 프로세스마다 값이 바뀌는 hash() 대신 crc32 사용"""
+    h = zlib.crc32(feature.encode("utf-8"))
+    return h % EMBEDDING_DIM, (1.0 if h >> 31 else -1.0)
+
+
+class Vectorizer:
+    """문서 빈도(DF)를 들고 있다가 특징 → 정규화된 벡터로 변환"""
+
+    def __init__(self, documents: Iterable[Counter]):
+        self.df = Counter()
+        self.n_docs = 0
+        for features in documents:
+            self.df.update(features.keys())
+            self.n_docs += 1
+
+    def idf(self, feature: str) -> float:
+        return math.log((1 + self.n_docs) / (1 + self.df.get(feature, 0))) + 1.0
+
+    def transform(self, features: Counter) -> np.ndarray:
+        vector = np.zeros(EMBEDDING_DIM, dtype=np.float32)
+        for feature, tf in features.items():
+            index, sign = _bucket(feature)
+            vector[index] += sign * (1.0 + math.log(tf)) * self.idf(feature)
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm > 0 else vector
+
+
+def _features_of(p) -> Counter:
+    return policy_features(p.title, p.summary, p.genre, p.region)
+
+
+# ==================== [pgvector 저장소] ====================
+
+_vectorizer: Optional[Vectorizer] = None
+_vectorizer_lock = threading.Lock()
+
+
+def get_vectorizer(db: Session) -> Vectorizer:
+    """마지막 전체 재생성 때의 DF (서버 재시작 후에는 처음 필요할 때 한 번 계산)"""
+    global _vectorizer
+    if _vectorizer is None:
+        with _vectorizer_lock:
+            if _vectorizer is None:
+                policies = db.query(Policy.title, Policy.summary, Policy.genre, Policy.region).all()
+                _vectorizer = Vectorizer(_features_of(p) for p in policies)
+    return _vectorizer
+
+
+def rebuild_embeddings(db: Session) -> int:
+    """전체 정책 임베딩 재생성 (DF도 새로 계산, 커밋 포함) → 저장한 정책 수"""
+    global _vectorizer
+    policies = db.query(Policy.id, Policy.title, Policy.summary, Policy.genre, Policy.region).all()
+    features = [_features_of(p) for p in policies]
+    vectorizer = Vectorizer(features)
+
+    db.execute(delete(PolicyEmbedding))
+    rows = [
+        {"policy_id": p.id, "embedding": vectorizer.transform(f)}
+        for p, f in zip(policies, features)
+    ]
+    for start in range(0, len(rows), 1000):
+        db.execute(insert(PolicyEmbedding), rows[start:start + 1000])
+    db.commit()
+
+    with _vectorizer_lock:
+        _vectorizer = vectorizer
+    return len(rows)
+
+
+def index_policy_embedding(db: Session, policy: Policy):
+    """정책 1건의 임베딩 갱신 (DF는 기존 값 사용, 커밋은 호출한 쪽에서)"""
+    vector = get_vectorizer(db).transform(_features_of(policy))
+    row = db.get(PolicyEmbedding, policy.id)
+    if row is None:
+        db.add(PolicyEmbedding(policy_id=policy.id, embedding=vector))
+    else:
+        row.embedding = vector
+
+
+def _similar_pgvector(db: Session, policy_id: int, k: int) -> Optional[List[int]]:
+    target = db.query(PolicyEmbedding.embedding).filter(PolicyEmbedding.policy_id == policy_id).scalar()
+    if target is None:
+        return None
+    rows = (
+        db.query(PolicyEmbedding.policy_id)
+        .filter(PolicyEmbedding.policy_id != policy_id)
+        .order_by(PolicyEmbedding.embedding.cosine_distance(target))
+        .limit(k)
+        .all()
+    )
+    return [r[0] for r in rows] or None
+
+
+# ==================== [NumPy 전수 비교 (SQLite/테스트용)] ====================
+
+class MemoryEmbeddingIndex:
+    def __init__(self, version: int, rows: list):
+        self.version = version
+        features = [_features_of(r) for r in rows]
+        vectorizer = Vectorizer(features)
+        self.ids = np.array([r.id for r in rows], dtype=np.int64)
+        self._position = {int(pid): i for i, pid in enumerate(self.ids)}
+        self.matrix = (
+            np.vstack([vectorizer.transform(f) for f in features])
+            if rows else np.zeros((0, EMBEDDING_DIM), dtype=np.float32)
+        )
+
+    def similar(self, policy_id: int, k: int) -> List[int]:
+        position = self._position.get(policy_id)
+        if position is None or k <= 0:
+            return []
+        scores = self.matrix @ self.matrix[position]
+        scores[position] = -np.inf
+        k = min(k, len(scores) - 1)
+        if k <= 0:
+            return []
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top], kind="stable")]
+        return [int(self.ids[i]) for i in top]
+
+
+_memory_index: Optional[MemoryEmbeddingIndex] = None
+_memory_lock = threading.Lock()
+
+
+def get_memory_index(db: Session) -> MemoryEmbeddingIndex:
+    global _memory_index
+    snapshot = get_snapshot(db)
+    current = _memory_index
+    if current is not None and current.version == snapshot.version:
+        return current
+    with _memory_lock:
+        if _memory_index is None or _memory_index.version != snapshot.version:
+            _memory_index = MemoryEmbeddingIndex(snapshot.version, snapshot.rows)
+        return _memory_index
+
+
+def similar_policy_ids(db: Session, policy_id: int, k: int = 6) -> List[int]:
+    """policy_id와 내용이 비슷한 정책 id (가까운 순, 자기 자신 제외)"""
+    if db.get_bind().dialect.name == "postgresql":
+        ids = _similar_pgvector(db, policy_id, k)
+        if ids is not None:
+            return ids
+    # 임베딩이 아직 없거나 PostgreSQL이 아니면 메모리에서 계산
+    return get_memory_index(db).similar(policy_id, k)
@@ -0,0 +1,70 @@
+"""
+관리자 정책 관리 화면의 필터 목록(장르/지역 값별 정책 수)과 페이지 수 계산용 개수
+요청마다 SELECT DISTINCT genre / region + 필터 COUNT를 하던 것을 카탈로그 스냅샷(catalog_snapshot)에서 계산합니다.
+- 값 목록 + 정책 수: 카탈로그 버전당 한 번만 계산 → 관리자 수정/삭제, import로 버전이 바뀌면 자동으로 다시 계산
+  원본 문자열이 아니라 스냅샷의 코드 배열로 세고 표준 이름('취업/직무', '서울')으로 표시
+  → 체크박스 옆 숫자와 그 값으로 필터한 결과 수가 항상 같음 (코드가 없는 정책은 목록에 나오지 않음)
+- 장르/지역 체크박스 필터 개수: 스냅샷의 코드 배열 마스크로 정확히 셈 (DB 조회 없음)
+- 키워드 검색처럼 스냅샷으로 셀 수 없는 필터만 호출한 쪽에서 DB COUNT (n-gram 색인으로 범위가 좁음)
+"""
+import threading
+from collections import namedtuple
+from typing import List, Optional
+
+import numpy as np
+from sqlalchemy.orm import Session
+
+from models import GENRE_CODES, REGION_CODES, genre_code, region_code
+from services.catalog_snapshot import get_snapshot
+
+# genres / regions: [(표준 이름, 정책 수), ...] 코드 순
+Facets = namedtuple("Facets", ["version", "genres", "regions"])
+
+GENRE_NAMES = {code: name for name, code in GENRE_CODES.items()}
+REGION_NAMES = {code: name for name, code in REGION_CODES.items()}
+
+_facets: Optional[Facets] = None
+_lock = threading.Lock()
+
+
+def _code_counts(codes: np.ndarray, names: dict) -> list:
+    """코드 배열(-1은 코드 없음) → [(표준 이름, 정책 수), ...] (정책이 있는 코드만)"""
+    counts = np.bincount(codes[codes >= 0].astype(np.int64), minlength=max(names) + 1)
+    return [(names[code], int(n)) for code, n in enumerate(counts) if n and code in names]
+
+
+def get_facets(db: Session) -> Facets:
+    """현재 카탈로그 버전의 장르/지역 코드별 정책 수 (필터와 같은 코드 기준)"""
+    global _facets
+    snapshot = get_snapshot(db)
+    current = _facets
+    if current is not None and current.version == snapshot.version:
+        return current
+
+    with _lock:
+        if _facets is None or _facets.version != snapshot.version:
+            _facets = Facets(
+                version=snapshot.version,
+                genres=_code_counts(snapshot.genre_code, GENRE_NAMES),
+                regions=_code_counts(snapshot.region_code, REGION_NAMES),
+            )
+        return _facets
+
+
+def filtered_count(db: Session, genres: List[str] = None, regions: List[str] = None) -> int:
+    """
+    장르/지역 체크박스 필터에 걸리는 정책 수 (관리자 목록의 코드 IN 조건과 같은 규칙)
+    사전에 없는 값은 코드가 없으므로 어떤 정책과도 일치하지 않음
+    """
+    snapshot = get_snapshot(db)
+    if not genres and not regions:
+        return snapshot.size
+
+    mask = np.ones(snapshot.size, dtype=bool)
+    if genres:
+        codes = [c for c in (genre_code(g) for g in genres) if c is not None]
+        mask &= np.isin(snapshot.genre_code, codes)
+    if regions:
+        codes = [c for c in (region_code(r) for r in regions) if c is not None]
+        mask &= np.isin(snapshot.region_code, codes)
+    return int(mask.sum())
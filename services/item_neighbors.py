@@ -0,0 +1,290 @@
+"""
+아이템 기반 협업 필터링 (배치 작업)
+users_action의 찜(like)으로 유저 x 정책 행렬을 만들고, 정책끼리 코사인 유사도를 계산해
+정책마다 Top-K 이웃만 policy_neighbor에 저장합니다. 추천 API는 이 테이블을 조인만 합니다.
+- 전체 재생성: 희소 (유저 x 정책) 0/1 행렬 X에 대해 C = Xᵀ·X 를 유저별 (정책, 정책) 쌍으로 누적 (PairCounter)
+  → 계산량은 Σ(유저별 찜 수)², 메모리는 0이 아닌 칸 수에 비례 / Top-K도 밀집 행렬 없이 행별로 고름
+- 증분 갱신: 마지막으로 처리한 users_action.id(워터마크) 이후의 찜만 읽어 함께 찜한 횟수에 더하고,
+  값이 바뀐 정책(및 그 정책과 함께 찜된 정책)의 이웃 목록만 다시 계산
+- 찜 취소(행 삭제)는 증분으로 알 수 없으므로 주기적으로 전체 재생성 (--full)
+- pass는 "관심 없음"이라 함께 찜한 횟수에 넣지 않음
+
+실행: python -m services.item_neighbors [--full]
+(서버 실행 중에는 main.py가 REFRESH_INTERVAL마다 증분 갱신, 찜 취소 반영용 --full은 cron 등으로 주기 실행)
+"""
+import sys
+from collections import defaultdict
+from datetime import datetime
+from typing import Iterable, List
+
+import numpy as np
+from sqlalchemy import delete, func, insert
+from sqlalchemy.orm import Session
+
+from models import CatalogMeta, Policy, PolicyCooccurrence, PolicyNeighbor, UserAction
+
+TOP_K = 20                   # 정책당 저장할 이웃 수
+PAIR_CHUNK = 2_000_000       # 전체 재생성 시 이만큼 쌍이 쌓이면 합침 (메모리 상한 조절)
+REFRESH_INTERVAL = 5 * 60.0  # 서버 내 증분 갱신 주기 (초)
+MIN_COOCCURRENCE = 1         # 이보다 적게 함께 찜한 쌍은 이웃에서 제외
+WATERMARK_KEY = "item_neighbors"  # catalog_meta에 마지막 처리한 users_action.id 저장
+
+
+def _get_watermark(db: Session):
+    meta = db.get(CatalogMeta, WATERMARK_KEY, with_for_update=True)
+    return meta.version if meta else None
+
+
+def _set_watermark(db: Session, action_id: int):
+    meta = db.get(CatalogMeta, WATERMARK_KEY)
+    if meta is None:
+        meta = CatalogMeta(key=WATERMARK_KEY)
+        db.add(meta)
+    meta.version = action_id
+    meta.updated_at = datetime.now()
+
+
+def _liked_rows(db: Session, *conditions):
+    return db.query(UserAction.user_email, UserAction.policy_id).filter(
+        UserAction.type == "like", *conditions
+    )
+
+
+class PairCounter:
+    """
+    (정책, 정책) 쌍별 함께 찜한 횟수를 희소 형태(COO)로 누적
+    유저 1명이 찜한 정책 m개 → 쌍 m²개(자기 자신 포함)를 키(i * n + j)로 모아 두고,
+    PAIR_CHUNK개가 쌓일 때마다 np.unique로 합침 → 메모리는 0이 아닌 칸 수에 비례 ((정책 수)² 아님)
+    """
+
+    def __init__(self, n: int):
+        self.n = n
+        self._keys = np.empty(0, dtype=np.int64)
+        self._counts = np.empty(0, dtype=np.int64)
+        self._pending: List[np.ndarray] = []
+        self._pending_size = 0
+
+    def add_user(self, cols: Iterable[int]):
+        cols = np.fromiter(set(cols), dtype=np.int64)  # 같은 정책을 두 번 찜한 행이 있어도 1
+        pairs = (cols[:, None] * self.n + cols[None, :]).ravel()
+        self._pending.append(pairs)
+        self._pending_size += len(pairs)
+        if self._pending_size >= PAIR_CHUNK:
+            self._merge()
+
+    def _merge(self):
+        if not self._pending:
+            return
+        keys = np.concatenate([self._keys, *self._pending])
+        counts = np.concatenate([self._counts, np.ones(self._pending_size, dtype=np.int64)])
+        self._keys, inverse = np.unique(keys, return_inverse=True)
+        self._counts = np.bincount(inverse, weights=counts).astype(np.int64)
+        self._pending, self._pending_size = [], 0
+
+    def result(self):
+        """→ (행 번호, 열 번호, 횟수) 배열 (행 → 열 순으로 정렬됨)"""
+        self._merge()
+        return self._keys // self.n, self._keys % self.n, self._counts
+
+
+def top_neighbors(rows: np.ndarray, cols: np.ndarray, counts: np.ndarray, k: int = TOP_K):
+    """
+    함께 찜한 횟수(COO, 대각선 = 그 정책을 찜한 유저 수) → 행별 코사인 Top-K
+    → (행 번호, 이웃 열 번호, 점수) 배열 (행 순, 같은 행 안에서는 점수 높은 순)
+    """
+    diag = np.zeros(int(rows.max()) + 1 if len(rows) else 0, dtype=np.float64)
+    on_diag = rows == cols
+    diag[rows[on_diag]] = counts[on_diag]
+
+    keep = ~on_diag & (counts >= MIN_COOCCURRENCE)
+    rows, cols, counts = rows[keep], cols[keep], counts[keep]
+    norms = np.sqrt(diag[rows] * diag[cols])
+    with np.errstate(divide="ignore", invalid="ignore"):
+        scores = np.where(norms > 0, counts / norms, 0.0)
+
+    # 행 오름차순 → 점수 내림차순으로 정렬한 뒤 행마다 앞에서 k개만
+    order = np.lexsort((-scores, rows))
+    rows, cols, scores = rows[order], cols[order], scores[order]
+    if not len(rows):
+        return rows, cols, scores
+    row_start = np.flatnonzero(np.r_[True, rows[1:] != rows[:-1]])
+    rank = np.arange(len(rows)) - np.repeat(row_start, np.diff(np.r_[row_start, len(rows)]))
+    keep = (rank < k) & (scores > 0)
+    return rows[keep], cols[keep], scores[keep]
+
+
+def _insert_batches(db: Session, model, rows: list, batch_size: int = 5000):
+    for start in range(0, len(rows), batch_size):
+        db.execute(insert(model), rows[start:start + batch_size])
+
+
+# ==================== [전체 재생성] ====================
+
+def rebuild_item_neighbors(db: Session) -> int:
+    """함께 찜한 횟수 + 이웃 전체 재생성 (커밋 포함) → 저장한 이웃 행 수"""
+    _get_watermark(db)  # 같은 작업이 동시에 돌지 않도록 워터마크 행 잠금
+    max_action_id = db.query(func.max(UserAction.id)).scalar() or 0
+
+    policy_ids = np.array([pid for (pid,) in db.query(Policy.id).order_by(Policy.id)], dtype=np.int64)
+    column = {int(pid): i for i, pid in enumerate(policy_ids)}
+    counter = PairCounter(len(policy_ids))
+
+    # 유저 순으로 읽어서 한 명씩 (찜한 정책 쌍)을 누적
+    current_email, user_cols = None, set()
+    rows = _liked_rows(db, UserAction.id <= max_action_id).order_by(UserAction.user_email).yield_per(50_000)
+    for email, policy_id in rows:
+        col = column.get(policy_id)
+        if col is None:
+            continue
+        if email != current_email:
+            if user_cols:
+                counter.add_user(user_cols)
+            current_email, user_cols = email, set()
+        user_cols.add(col)
+    if user_cols:
+        counter.add_user(user_cols)
+    pair_rows, pair_cols, pair_counts = counter.result()
+
+    # 함께 찜한 횟수 저장 (0이 아닌 칸만)
+    db.execute(delete(PolicyCooccurrence))
+    _insert_batches(db, PolicyCooccurrence, [
+        {"policy_id": int(policy_ids[i]), "other_id": int(policy_ids[j]), "count": int(c)}
+        for i, j, c in zip(pair_rows, pair_cols, pair_counts)
+    ])
+
+    # 이웃 Top-K 저장
+    top_rows, top_cols, top_scores = top_neighbors(pair_rows, pair_cols, pair_counts)
+    neighbor_rows = [
+        {"policy_id": int(policy_ids[i]), "neighbor_id": int(policy_ids[j]), "score": float(score)}
+        for i, j, score in zip(top_rows, top_cols, top_scores)
+    ]
+    db.execute(delete(PolicyNeighbor))
+    _insert_batches(db, PolicyNeighbor, neighbor_rows)
+
+    _set_watermark(db, max_action_id)
+    db.commit()
+    return len(neighbor_rows)
+
+
+# ==================== [증분 갱신] ====================
+
+def refresh_item_neighbors(db: Session) -> int:
+    """
+    워터마크 이후 새 찜만 반영 (커밋 포함) → 이웃을 다시 계산한 정책 수
+    워터마크가 없거나 users_action이 다시 적재돼 id가 줄었으면 전체 재생성
+    """
+    watermark = _get_watermark(db)
+    max_action_id = db.query(func.max(UserAction.id)).scalar() or 0
+    if watermark is None or max_action_id < watermark:
+        rebuild_item_neighbors(db)
+        return -1
+    if max_action_id == watermark:
+        db.rollback()
+        return 0
+
+    new_likes = _liked_rows(db, UserAction.id > watermark, UserAction.id <= max_action_id)\
+        .order_by(UserAction.id).all()
+    valid_ids = {pid for (pid,) in db.query(Policy.id)}
+
+    # 새 찜을 한 유저들의 기존 찜 목록
+    users = {email for email, _ in new_likes}
+    liked_before = defaultdict(set)
+    user_list = list(users)
+    for start in range(0, len(user_list), 1000):
+        for email, policy_id in _liked_rows(
+            db, UserAction.user_email.in_(user_list[start:start + 1000]), UserAction.id <= watermark
+        ):
+            liked_before[email].add(policy_id)
+
+    # 함께 찜한 횟수 변화량 (새 찜 i와 그 유저의 기존 찜 j 쌍마다 +1)
+    delta = defaultdict(int)
+    for email, policy_id in new_likes:
+        liked = liked_before[email]
+        if policy_id in liked or policy_id not in valid_ids:
+            continue
+        delta[(policy_id, policy_id)] += 1
+        for other in liked:
+            if other in valid_ids:
+                delta[(policy_id, other)] += 1
+                delta[(other, policy_id)] += 1
+        liked.add(policy_id)
+
+    if delta:
+        affected = sorted({a for a, _ in delta})
+        existing = {
+            (row.policy_id, row.other_id): row
+            for row in db.query(PolicyCooccurrence).filter(PolicyCooccurrence.policy_id.in_(affected))
+        }
+        for (a, b), inc in delta.items():
+            row = existing.get((a, b))
+            if row is None:
+                db.add(PolicyCooccurrence(policy_id=a, other_id=b, count=inc))
+            else:
+                row.count += inc
+        db.flush()
+        # 찜한 수(대각선)가 바뀐 정책과 함께 찜된 적 있는 정책들도 코사인 분모가 바뀌므로 같이 다시 계산
+        grown = [a for (a, b) in delta if a == b]
+        affected = sorted(set(affected) | {
+            pid for (pid,) in db.query(PolicyCooccurrence.policy_id)
+            .filter(PolicyCooccurrence.other_id.in_(grown)).distinct()
+        })
+        _recompute_neighbors(db, affected)
+
+    _set_watermark(db, max_action_id)
+    db.commit()
+    return len(affected) if delta else 0
+
+
+def _recompute_neighbors(db: Session, policy_ids: List[int]):
+    """지정한 정책들의 이웃 목록만 함께 찜한 횟수 테이블에서 다시 계산"""
+    diag = dict(db.query(PolicyCooccurrence.policy_id, PolicyCooccurrence.count)
+                .filter(PolicyCooccurrence.policy_id == PolicyCooccurrence.other_id))
+    rows = defaultdict(dict)
+    for a, b, count in db.query(PolicyCooccurrence.policy_id, PolicyCooccurrence.other_id, PolicyCooccurrence.count)\
+            .filter(PolicyCooccurrence.policy_id.in_(policy_ids), PolicyCooccurrence.policy_id != PolicyCooccurrence.other_id):
+        rows[a][b] = count
+
+    neighbor_rows = []
+    for a in policy_ids:
+        others = rows.get(a)
+        if not others or not diag.get(a):
+            continue
+        ids = np.array(list(others.keys()), dtype=np.int64)
+        counts = np.array(list(others.values()), dtype=np.float64)
+        norms = np.sqrt(diag[a] * np.array([diag.get(int(b), 0) for b in ids], dtype=np.float64))
+        with np.errstate(divide="ignore", invalid="ignore"):
+            scores = np.where((norms > 0) & (counts >= MIN_COOCCURRENCE), counts / norms, 0.0)
+        order = np.argsort(-scores, kind="stable")[:TOP_K]
+        neighbor_rows.extend(
+            {"policy_id": a, "neighbor_id": int(ids[i]), "score": float(scores[i])}
+            for i in order if scores[i] > 0
+        )
+
+    db.execute(delete(PolicyNeighbor).where(PolicyNeighbor.policy_id.in_(policy_ids)))
+    _insert_batches(db, PolicyNeighbor, neighbor_rows)
+
+
+# ==================== [조회] ====================
+
+def neighbor_scores(db: Session, liked_ids: List[int], limit: int = 20) -> List[tuple]:
+    """
+    찜한 정책들의 이웃 점수 합 (이미 찜한 정책 제외) → [(policy_id, score), ...] 높은 순
+    """
+    if not liked_ids:
+        return []
+    total = func.sum(PolicyNeighbor.score)
+    return db.query(PolicyNeighbor.neighbor_id, total).filter(
+        PolicyNeighbor.policy_id.in_(liked_ids),
+        ~PolicyNeighbor.neighbor_id.in_(liked_ids)
+    ).group_by(PolicyNeighbor.neighbor_id).order_by(total.desc()).limit(limit).all()
+
+
+if __name__ == "__main__":
+    from database import SessionLocal
+
+    with SessionLocal() as session:
+        if "--full" in sys.argv:
+            print(f"🤝 이웃 정책 전체 재생성 완료 ({rebuild_item_neighbors(session)}행)")
+        else:
+            changed = refresh_item_neighbors(session)
+            print("🤝 워터마크 없음 → 전체 재생성 완료" if changed < 0 else f"🤝 이웃 정책 증분 갱신 완료 ({changed}건)")
@@ -0,0 +1,101 @@
+"""
+유저별 찜한 정책 id 집합 캐시
+모달을 열 때마다 /api/mypage/check로 한 건씩 묻는 대신, 찜 목록 전체(비트맵) 또는 여러 id를 한 번에 조회합니다.
+- 형식: 정책 id = 비트 번호 (seen_set.SeenBitmap과 같은 비트맵, 찜 100개여도 정책 id 범위/8 바이트)
+- 1차: 프로세스 메모리 (TTLCache) / 없으면 users_action에서 찜한 id만 읽어서 채움
+- 찜/찜 취소/일괄 저장이 커밋된 뒤 liked_added / liked_removed로 캐시를 바로 고침
+- 다른 워커(프로세스)에서 바뀐 찜은 LIKED_TTL이 지나 다시 읽을 때 반영
+"""
+import base64
+import threading
+from typing import Dict, Iterable, List
+
+from cachetools import TTLCache
+from sqlalchemy.orm import Session
+
+from models import UserAction
+from services.seen_set import SeenBitmap
+
+LIKED_TTL = 5 * 60          # 초 단위 (다른 워커의 변경이 늦게 보이는 최대 시간)
+MAX_USERS = 20_000          # 메모리에 들고 있을 유저 수 상한
+
+_cache = TTLCache(maxsize=MAX_USERS, ttl=LIKED_TTL)
+_changed = TTLCache(maxsize=MAX_USERS, ttl=LIKED_TTL)  # email -> 마지막 변경 세대
+_generation = 0
+_cleared = 0  # 마지막으로 캐시 전체를 비운 세대
+_lock = threading.Lock()
+
+
+def _load(db: Session, user_email: str) -> SeenBitmap:
+    with _lock:
+        liked = _cache.get(user_email)
+        generation = _generation
+    if liked is not None:
+        return liked
+
+    liked = SeenBitmap()
+    liked.update(pid for (pid,) in db.query(UserAction.policy_id).filter(
+        UserAction.user_email == user_email,
+        UserAction.type == "like",
+    ))
+    with _lock:
+        # 읽는 동안 찜이 바뀌었으면 이번 결과는 캐시하지 않음 (다음 조회에서 다시 읽음)
+        if max(_changed.get(user_email, -1), _cleared) <= generation:
+            _cache[user_email] = liked
+    return liked
+
+
+def liked_ids(db: Session, user_email: str, policy_ids: Iterable[int]) -> List[int]:
+    """policy_ids 중 유저가 찜한 id (요청 순서 유지)"""
+    liked = _load(db, user_email)
+    with _lock:
+        return [pid for pid in policy_ids if pid in liked]
+
+
+def is_liked(db: Session, user_email: str, policy_id: int) -> bool:
+    liked = _load(db, user_email)
+    with _lock:
+        return policy_id in liked
+
+
+def liked_bitmap(db: Session, user_email: str) -> Dict:
+    """찜한 id 전체 → {"count": 개수, "bitmap": base64 비트맵 (바이트 i의 비트 j = 정책 id i*8+j)}"""
+    liked = _load(db, user_email)
+    with _lock:
+        data = liked.to_bytes()
+        count = len(liked)
+    return {"count": count, "bitmap": base64.b64encode(data).decode("ascii")}
+
+
+def _apply(user_email: str, policy_ids: Iterable[int], add: bool):
+    global _generation
+    with _lock:
+        _generation += 1
+        _changed[user_email] = _generation
+        liked = _cache.get(user_email)
+        if liked is None:
+            return
+        for policy_id in policy_ids:
+            if add:
+                liked.add(policy_id)
+            else:
+                liked.discard(policy_id)
+
+
+def liked_added(user_email: str, policy_ids: Iterable[int]):
+    """찜 저장이 커밋된 뒤 호출"""
+    _apply(user_email, policy_ids, add=True)
+
+
+def liked_removed(user_email: str, policy_ids: Iterable[int]):
+    """찜 삭제가 커밋된 뒤 호출"""
+    _apply(user_email, policy_ids, add=False)
+
+
+def clear_liked_cache():
+    """일괄 가져오기 등으로 찜이 대량으로 바뀐 뒤 호출 → 모든 유저를 다음 조회 때 다시 읽음"""
+    global _generation, _cleared
+    with _lock:
+        _generation += 1
+        _cleared = _generation
+        _cache.clear()
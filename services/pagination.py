@@ -0,0 +1,109 @@
+"""
+키셋(커서) 페이지네이션 헬퍼
+OFFSET 대신 "마지막으로 본 행의 정렬 키" 이후부터 읽어서
+몇 번째 페이지든 인덱스 범위 스캔 한 번으로 끝나도록 합니다.
+"""
+import base64
+import json
+from datetime import date, datetime
+from typing import List, Optional
+
+from sqlalchemy import and_, or_, false
+
+
+class SortKey:
+    """
+    정렬 키 하나 (컬럼 + 방향)
+    모든 키는 NULLS LAST로 정렬되며, 커서 비교도 같은 규칙을 따릅니다.
+    """
+    def __init__(self, column, descending: bool = False):
+        self.column = column
+        self.descending = descending
+        self.attr = column.key
+
+    def order_clause(self):
+        clause = self.column.desc() if self.descending else self.column.asc()
+        return clause.nulls_last()
+
+    def after(self, value):
+        """정렬 순서상 value 보다 뒤에 오는 행 조건"""
+        if value is None:
+            # NULL은 항상 맨 뒤이므로 그 뒤에는 아무것도 없음
+            return false()
+        if isinstance(value, bool):
+            # Boolean 컬럼은 대소 비교 연산자를 쓸 수 없으므로 반대 값과의 일치로 표현
+            has_next = value if self.descending else not value
+            beyond = self.column == (not value) if has_next else false()
+        else:
+            beyond = self.column < value if self.descending else self.column > value
+        return or_(beyond, self.column.is_(None))
+
+    def equals(self, value):
+        if value is None:
+            return self.column.is_(None)
+        return self.column == value
+
+
+def order_by_keys(query, keys: List[SortKey]):
+    return query.order_by(*[k.order_clause() for k in keys])
+
+
+def apply_keyset(query, keys: List[SortKey], values: list):
+    """
+    (k1, k2, ...) > (v1, v2, ...) 조건을 방향/NULL 처리까지 고려해 풀어 씁니다.
+    k1 after v1 OR (k1 = v1 AND k2 after v2) OR ...
+    """
+    conditions = []
+    for i, key in enumerate(keys):
+        prefix = [keys[j].equals(values[j]) for j in range(i)]
+        conditions.append(and_(*prefix, key.after(values[i])))
+    return query.filter(or_(*conditions))
+
+
+def row_values(row, keys: List[SortKey]) -> list:
+    return [getattr(row, k.attr) for k in keys]
+
+
+# ==================== [커서 인코딩] ====================
+
+def _encode_value(value):
+    if value is None:
+        return None
+    if isinstance(value, datetime):
+        return {"dt": value.isoformat()}
+    if isinstance(value, date):
+        return {"d": value.isoformat()}
+    return value
+
+
+def _decode_value(value):
+    if isinstance(value, dict):
+        if "dt" in value:
+            return datetime.fromisoformat(value["dt"])
+        if "d" in value:
+            return date.fromisoformat(value["d"])
+        raise ValueError("unknown cursor value")
+    return value
+
+
+def encode_cursor(sort_name: str, values: list) -> str:
+    payload = json.dumps({"s": sort_name, "v": [_encode_value(v) for v in values]},
+                         separators=(",", ":"), ensure_ascii=False)
+    return base64.urlsafe_b64encode(payload.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str, sort_name: str, key_count: int) -> Optional[list]:
+    """
+    커서 문자열을 정렬 키 값 목록으로 복원합니다.
+    다른 정렬 기준에서 발급된 커서이거나 형식이 깨졌으면 ValueError.
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")).decode("utf-8"))
+        values = [_decode_value(v) for v in payload["v"]]
+    except Exception as e:
+        raise ValueError(f"invalid cursor: {e}")
+
+    if payload.get("s") != sort_name or len(values) != key_count:
+        raise ValueError("cursor does not match current sort")
+    return values
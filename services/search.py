@@ -0,0 +1,121 @@
+"""
+정책 키워드 검색 (한국어 bi-gram 역색인)
+- 색인: 제목/요약을 공백·기호 기준으로 토큰화한 뒤 2글자씩 잘라 policy_search_gram에 저장
+- 검색: 키워드의 모든 bi-gram을 포함하는 정책만 골라 가중치 합으로 관련도 정렬
+- 1글자 키워드처럼 bi-gram이 안 나오는 경우에만 기존 LIKE 검색으로 대체
+"""
+import re
+from collections import Counter
+from typing import Optional
+
+from sqlalchemy import func, select, or_, delete, insert
+from sqlalchemy.orm import Session
+
+from models import Policy, PolicySearchGram
+
+TITLE_WEIGHT = 3
+SUMMARY_WEIGHT = 1
+MAX_GRAM_WEIGHT = 100  # 같은 글자가 반복되는 긴 요약이 점수를 독차지하지 않도록 상한
+
+# 한글/영문/숫자 외의 문자는 모두 토큰 구분자로 취급
+_TOKEN_SPLIT = re.compile(r"[^0-9a-z가-힣ㄱ-ㆎ]+")
+
+
+def tokenize(text: Optional[str]) -> list:
+    if not text:
+        return []
+    return [t for t in _TOKEN_SPLIT.split(text.lower()) if t]
+
+
+def make_ngrams(text: Optional[str], n: int = 2) -> Counter:
+    """토큰별 n-gram 빈도 (토큰 경계를 넘는 gram은 만들지 않음)"""
+    grams = Counter()
+    for token in tokenize(text):
+        for i in range(len(token) - n + 1):
+            grams[token[i:i + n]] += 1
+    return grams
+
+
+def policy_gram_weights(title: Optional[str], summary: Optional[str]) -> dict:
+    weights = Counter()
+    for gram, cnt in make_ngrams(title).items():
+        weights[gram] += cnt * TITLE_WEIGHT
+    for gram, cnt in make_ngrams(summary).items():
+        weights[gram] += cnt * SUMMARY_WEIGHT
+    return {g: min(w, MAX_GRAM_WEIGHT) for g, w in weights.items()}
+
+
+def _gram_rows(policy_id: int, title: Optional[str], summary: Optional[str]) -> list:
+    return [
+        {"gram": gram, "policy_id": policy_id, "weight": weight}
+        for gram, weight in policy_gram_weights(title, summary).items()
+    ]
+
+
+# ==================== [색인 유지] ====================
+
+def index_policy(db: Session, policy: Policy):
+    """정책 1건의 색인을 다시 만듭니다. (커밋은 호출한 쪽에서)"""
+    remove_policy(db, policy.id)
+    rows = _gram_rows(policy.id, policy.title, policy.summary)
+    if rows:
+        db.execute(insert(PolicySearchGram), rows)
+
+
+def remove_policy(db: Session, policy_id: int):
+    db.execute(delete(PolicySearchGram).where(PolicySearchGram.policy_id == policy_id))
+
+
+def rebuild_search_index(db: Session, batch_size: int = 5000) -> int:
+    """
+    전체 색인 재생성 (import_all_data.py 실행 후 / 최초 배포 시)
+    반환값: 저장된 gram 행 수
+    """
+    db.execute(delete(PolicySearchGram))
+    total = 0
+    buffer = []
+    for policy_id, title, summary in db.query(Policy.id, Policy.title, Policy.summary).yield_per(1000):
+        buffer.extend(_gram_rows(policy_id, title, summary))
+        if len(buffer) >= batch_size:
+            db.execute(insert(PolicySearchGram), buffer)
+            total += len(buffer)
+            buffer = []
+    if buffer:
+        db.execute(insert(PolicySearchGram), buffer)
+        total += len(buffer)
+    db.commit()
+    return total
+
+
+# ==================== [검색] ====================
+
+def search_subquery(keyword: str):
+    """
+    (policy_id, score) 서브쿼리. 키워드의 bi-gram을 모두 가진 정책만 포함.
+    bi-gram이 하나도 안 나오는 키워드(1글자 등)면 None.
+    """
+    grams = sorted(make_ngrams(keyword))
+    if not grams:
+        return None
+    return (
+        select(
+            PolicySearchGram.policy_id.label("policy_id"),
+            func.sum(PolicySearchGram.weight).label("score"),
+        )
+        .where(PolicySearchGram.gram.in_(grams))
+        .group_by(PolicySearchGram.policy_id)
+        .having(func.count() == len(grams))
+        .subquery("keyword_match")
+    )
+
+
+def keyword_condition(keyword: str):
+    """
+    Policy 쿼리에 바로 붙일 수 있는 필터 조건
+    (기존 title/summary LIKE 조건을 대체)
+    """
+    matches = search_subquery(keyword)
+    if matches is None:
+        pattern = f"%{keyword}%"
+        return or_(Policy.title.ilike(pattern), Policy.summary.ilike(pattern))
+    return Policy.id.in_(select(matches.c.policy_id))
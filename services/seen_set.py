@@ -0,0 +1,182 @@
+"""
+스와이프 덱 "이미 본 정책" 저장소 (세션 토큰별)
+클라이언트가 본 정책 id를 전부 exclude_ids로 보내는 대신, 서버가 토큰별로 비트맵을 들고 있습니다.
+- 비트맵: 정책 id = 비트 번호 (bytearray, 정책 1000개 ≈ 125바이트)
+- 1차 저장소(기준): 프로세스 메모리 (TTLCache) / 2차: deck_seen_set 테이블 (재시작, 다중 워커 대비)
+- 요청 경로에서는 메모리만 갱신하고 토큰을 dirty로 표시 → main.py 주기 작업(액션 버퍼 저장과 같은 루프)이
+  dirty 비트맵을 모아 한 트랜잭션으로 저장 (덱 요청마다 커밋하지 않음, DB 쪽 비트맵과는 OR로 합침)
+- dirty 목록이 비트맵 참조를 들고 있으므로 저장 전에 TTLCache에서 밀려나도 유실되지 않음
+- 마지막 갱신 후 SEEN_TTL이 지나면 만료 (메모리는 TTLCache가, DB는 주기적으로 삭제)
+"""
+import secrets
+import threading
+import time
+from datetime import datetime, timedelta
+from typing import Iterable, Optional
+
+from cachetools import TTLCache
+from sqlalchemy.orm import Session
+
+from database import SessionLocal
+from models import DeckSeenSet
+
+SEEN_TTL = 6 * 60 * 60          # 초 단위 (6시간)
+MAX_SESSIONS = 50_000           # 메모리에 들고 있을 세션 수 상한
+PURGE_INTERVAL = 10 * 60        # DB 만료 행 정리 주기 (초)
+MAX_TOKEN_LENGTH = 64
+PERSIST_CHUNK = 1000            # 저장 시 IN 조회 한 번에 넣는 토큰 수
+
+_cache = TTLCache(maxsize=MAX_SESSIONS, ttl=SEEN_TTL)
+_dirty = {}                     # token -> SeenBitmap (아직 DB에 저장하지 않은 비트맵)
+_lock = threading.Lock()
+_persist_lock = threading.Lock()  # 저장은 한 번에 하나씩
+_last_purge = 0.0
+
+
+class SeenBitmap:
+    __slots__ = ("bits",)
+
+    def __init__(self, data: bytes = b""):
+        self.bits = bytearray(data)
+
+    def add(self, policy_id: int):
+        if policy_id < 0:
+            return
+        byte, bit = divmod(policy_id, 8)
+        if byte >= len(self.bits):
+            self.bits.extend(b"\x00" * (byte + 1 - len(self.bits)))
+        self.bits[byte] |= 1 << bit
+
+    def discard(self, policy_id: int):
+        byte, bit = divmod(policy_id, 8)
+        if 0 <= byte < len(self.bits):
+            self.bits[byte] &= ~(1 << bit) & 0xFF
+
+    def update(self, policy_ids: Iterable[int]):
+        for policy_id in policy_ids:
+            self.add(policy_id)
+
+    def merge(self, data: bytes):
+        """다른 워커가 저장한 비트맵과 합치기 (OR)"""
+        if len(data) > len(self.bits):
+            self.bits.extend(b"\x00" * (len(data) - len(self.bits)))
+        for i, value in enumerate(data):
+            self.bits[i] |= value
+
+    def __contains__(self, policy_id) -> bool:
+        byte, bit = divmod(policy_id, 8)
+        return 0 <= byte < len(self.bits) and bool(self.bits[byte] >> bit & 1)
+
+    def __iter__(self):
+        for byte, value in enumerate(self.bits):
+            while value:
+                low = value & -value
+                yield byte * 8 + low.bit_length() - 1
+                value ^= low
+
+    def __len__(self) -> int:
+        return sum(bin(value).count("1") for value in self.bits)
+
+    def __bool__(self) -> bool:
+        return any(self.bits)
+
+    def to_bytes(self) -> bytes:
+        return bytes(self.bits.rstrip(b"\x00"))
+
+
+def new_token() -> str:
+    return secrets.token_urlsafe(16)
+
+
+def _is_valid_token(token: Optional[str]) -> bool:
+    return bool(token) and len(token) <= MAX_TOKEN_LENGTH
+
+
+def load_seen(db: Session, token: Optional[str]) -> Optional[SeenBitmap]:
+    """토큰의 비트맵 (메모리 → DB 순서로 조회), 없거나 만료됐으면 None"""
+    if not _is_valid_token(token):
+        return None
+    with _lock:
+        seen = _cache.get(token)
+    if seen is not None:
+        return seen
+
+    row = db.get(DeckSeenSet, token)
+    if row is None or row.updated_at < datetime.now() - timedelta(seconds=SEEN_TTL):
+        return None
+    seen = SeenBitmap(row.bitmap)
+    with _lock:
+        _cache[token] = seen
+    return seen
+
+
+def mark_seen(db: Session, token: str, policy_ids: Iterable[int], seen: Optional[SeenBitmap] = None) -> SeenBitmap:
+    """정책 id들을 본 것으로 표시 (메모리만 갱신, DB 저장은 persist_seen이 모아서)"""
+    if seen is None:
+        seen = load_seen(db, token) or SeenBitmap()
+    with _lock:
+        seen.update(policy_ids)
+        _cache[token] = seen
+        _dirty[token] = seen
+    return seen
+
+
+def pending_count() -> int:
+    return len(_dirty)
+
+
+def persist_seen() -> int:
+    """dirty 비트맵을 한 트랜잭션으로 DB에 저장 → 저장한 토큰 수 (실패하면 dirty로 되돌리고 예외)"""
+    global _dirty
+    with _persist_lock:
+        with _lock:
+            batch, _dirty = _dirty, {}
+        if not batch:
+            return 0
+        try:
+            with SessionLocal() as db:
+                now = datetime.now()
+                tokens = list(batch)
+                rows = {}
+                for start in range(0, len(tokens), PERSIST_CHUNK):
+                    rows.update({
+                        row.token: row
+                        for row in db.query(DeckSeenSet).filter(DeckSeenSet.token.in_(tokens[start:start + PERSIST_CHUNK]))
+                    })
+                for token, seen in batch.items():
+                    row = rows.get(token)
+                    with _lock:
+                        if row is None:
+                            db.add(DeckSeenSet(token=token, bitmap=seen.to_bytes(), updated_at=now))
+                        else:
+                            seen.merge(row.bitmap)  # 다른 워커가 저장한 비트맵과 합침
+                            row.bitmap = seen.to_bytes()
+                            row.updated_at = now
+                _purge_expired(db)
+                db.commit()
+        except Exception:
+            with _lock:
+                for token, seen in batch.items():
+                    _dirty.setdefault(token, seen)
+            raise
+        return len(batch)
+
+
+def flush_seen() -> int:
+    """주기 작업 / 종료 시 호출용: 실패해도 예외 대신 로그만 (dirty로 남아 다음 주기에 다시 시도)"""
+    try:
+        return persist_seen()
+    except Exception as e:
+        print(f"⚠️ 본 정책 비트맵 저장 실패 ({pending_count()}건 대기): {e}")
+        return 0
+
+
+def _purge_expired(db: Session):
+    """만료된 DB 행 정리 (PURGE_INTERVAL마다 한 번, 커밋은 호출한 쪽에서)"""
+    global _last_purge
+    now = time.monotonic()
+    if now - _last_purge < PURGE_INTERVAL:
+        return
+    _last_purge = now
+    cutoff = datetime.now() - timedelta(seconds=SEEN_TTL)
+    db.query(DeckSeenSet).filter(DeckSeenSet.updated_at < cutoff).delete(synchronize_session=False)
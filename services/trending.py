@@ -0,0 +1,192 @@
+"""
+정책 트렌드 점수 (시간 감쇠 인기도)
+누적 view_count / users_action 전체 GROUP BY 대신, 최근 반응일수록 크게 치는 점수를 policy_trend에 저장합니다.
+- 점수: Σ 가중치 x 0.5^(경과 시간 / HALF_LIFE) 를 "기준 시각(TREND_EPOCH) 기준"으로 로그 공간에 저장
+  log(Σ w x exp(λ(t - t0))) → 모든 정책이 같은 비율로 감쇠하므로 순서는 그대로, 새 액션만 logaddexp로 더하면 됨
+- 증분 갱신: users_action.id 워터마크 이후 액션만 반영 (refresh_trending)
+- 전체 재계산: 최근 FULL_WINDOW_DAYS 액션으로 다시 계산 (찜 취소 반영, --full)
+- 점수가 바뀌면 trend 버전을 올림 → 스냅샷의 인기순 점수 배열(주기 작업에서 교체) / 인기순 ETag만 버전을 봄
+
+실행: python -m services.trending [--full]  (서버 실행 중에는 main.py가 주기적으로 증분 갱신)
+"""
+import math
+import sys
+import time
+from collections import defaultdict
+from datetime import datetime, timedelta
+from typing import Dict
+
+from sqlalchemy import delete, func, insert
+from sqlalchemy.orm import Session
+
+from models import CatalogMeta, Policy, PolicyTrend, UserAction
+
+HALF_LIFE_DAYS = 3.0
+DECAY_RATE = math.log(2) / (HALF_LIFE_DAYS * 86400)   # λ (초당)
+TREND_EPOCH = datetime(2025, 1, 1)                     # 로그 점수 기준 시각 (고정)
+FULL_WINDOW_DAYS = 30                                  # 전체 재계산 시 읽는 기간 (그 이전은 1/1000 이하로 감쇠)
+REFRESH_INTERVAL = 60.0                                # 서버 내 증분 갱신 주기 (초)
+
+# 액션 종류별 가중치 (pass도 "봤다"는 반응이므로 약하게 포함)
+ACTION_WEIGHTS = {
+    "like": 1.0,
+    "pass": 0.2,
+}
+
+TREND_VERSION_KEY = "trending"               # catalog_meta: 점수가 바뀔 때마다 +1
+TREND_WATERMARK_KEY = "trending_watermark"   # catalog_meta: 마지막으로 반영한 users_action.id
+
+VERSION_CHECK_INTERVAL = 5.0
+_cached_version = None
+_checked_at = 0.0
+
+
+def action_term(action_type: str, created_at: datetime) -> float:
+    """액션 1건이 로그 점수에 더하는 항: log(w) + λ(t - t0)"""
+    return math.log(ACTION_WEIGHTS[action_type]) + DECAY_RATE * (created_at - TREND_EPOCH).total_seconds()
+
+
+def decayed_score(score: float, now: datetime = None) -> float:
+    """저장된 로그 점수 → 현재 시각 기준 감쇠된 점수 (관리자 화면 표시용)"""
+    now = now or datetime.now()
+    return math.exp(score - DECAY_RATE * (now - TREND_EPOCH).total_seconds())
+
+
+def _meta(db: Session, key: str, lock: bool = False):
+    meta = db.get(CatalogMeta, key, with_for_update=lock)
+    if meta is None:
+        meta = CatalogMeta(key=key, version=0)
+        db.add(meta)
+    return meta
+
+
+def _bump_trend_version(db: Session):
+    meta = _meta(db, TREND_VERSION_KEY)
+    meta.version = (meta.version or 0) + 1
+    meta.updated_at = datetime.now()
+
+
+# ==================== [전체 재계산] ====================
+
+def rebuild_trending(db: Session) -> int:
+    """최근 FULL_WINDOW_DAYS 액션으로 트렌드 점수 전체 재계산 (커밋 포함) → 점수가 있는 정책 수"""
+    watermark = _meta(db, TREND_WATERMARK_KEY, lock=True)
+    max_action_id = db.query(func.max(UserAction.id)).scalar() or 0
+    since = datetime.now() - timedelta(days=FULL_WINDOW_DAYS)
+
+    scores: Dict[int, float] = {}
+    rows = db.query(UserAction.policy_id, UserAction.type, UserAction.created_at).filter(
+        UserAction.id <= max_action_id,
+        UserAction.type.in_(list(ACTION_WEIGHTS)),
+        UserAction.created_at >= since
+    ).yield_per(50_000)
+    for policy_id, action_type, created_at in rows:
+        term = action_term(action_type, created_at)
+        current = scores.get(policy_id)
+        scores[policy_id] = term if current is None else _logaddexp(current, term)
+
+    valid_ids = {pid for (pid,) in db.query(Policy.id)}
+    now = datetime.now()
+    db.execute(delete(PolicyTrend))
+    trend_rows = [
+        {"policy_id": pid, "score": score, "updated_at": now}
+        for pid, score in scores.items() if pid in valid_ids
+    ]
+    for start in range(0, len(trend_rows), 5000):
+        db.execute(insert(PolicyTrend), trend_rows[start:start + 5000])
+
+    watermark.version = max_action_id
+    watermark.updated_at = now
+    _bump_trend_version(db)
+    db.commit()
+    return len(trend_rows)
+
+
+# ==================== [증분 갱신] ====================
+
+def refresh_trending(db: Session) -> int:
+    """
+    워터마크 이후 액션만 점수에 더함 (커밋 포함) → 점수가 바뀐 정책 수
+    users_action이 다시 적재돼 id가 줄었으면 전체 재계산
+    """
+    watermark = _meta(db, TREND_WATERMARK_KEY, lock=True)
+    last_id = watermark.version or 0
+    max_action_id = db.query(func.max(UserAction.id)).scalar() or 0
+    if max_action_id < last_id:
+        rebuild_trending(db)
+        return -1
+    if max_action_id == last_id:
+        db.rollback()
+        return 0
+
+    terms = defaultdict(list)
+    for policy_id, action_type, created_at in db.query(
+        UserAction.policy_id, UserAction.type, UserAction.created_at
+    ).filter(
+        UserAction.id > last_id,
+        UserAction.id <= max_action_id,
+        UserAction.type.in_(list(ACTION_WEIGHTS))
+    ):
+        terms[policy_id].append(action_term(action_type, created_at or datetime.now()))
+
+    changed = 0
+    if terms:
+        valid_ids = {pid for (pid,) in db.query(Policy.id).filter(Policy.id.in_(list(terms)))}
+        existing = {row.policy_id: row for row in db.query(PolicyTrend).filter(PolicyTrend.policy_id.in_(list(terms)))}
+        now = datetime.now()
+        for policy_id, policy_terms in terms.items():
+            if policy_id not in valid_ids:
+                continue
+            score = _logsumexp(policy_terms)
+            row = existing.get(policy_id)
+            if row is None:
+                db.add(PolicyTrend(policy_id=policy_id, score=score, updated_at=now))
+            else:
+                row.score = _logaddexp(row.score, score)
+                row.updated_at = now
+            changed += 1
+        if changed:
+            _bump_trend_version(db)
+
+    watermark.version = max_action_id
+    watermark.updated_at = datetime.now()
+    db.commit()
+    return changed
+
+
+def _logaddexp(a: float, b: float) -> float:
+    hi, lo = (a, b) if a >= b else (b, a)
+    return hi + math.log1p(math.exp(lo - hi))
+
+
+def _logsumexp(values) -> float:
+    hi = max(values)
+    return hi + math.log(sum(math.exp(v - hi) for v in values))
+
+
+# ==================== [버전 조회] ====================
+
+def current_trend_version(db: Session) -> int:
+    """프로세스 내 캐시된 트렌드 버전 (VERSION_CHECK_INTERVAL마다 한 번만 DB 확인)"""
+    global _cached_version, _checked_at
+    now = time.monotonic()
+    if _cached_version is None or now - _checked_at >= VERSION_CHECK_INTERVAL:
+        meta = db.get(CatalogMeta, TREND_VERSION_KEY)
+        _cached_version = meta.version if meta else 0
+        _checked_at = now
+    return _cached_version
+
+
+def invalidate_trend_version():
+    global _checked_at
+    _checked_at = 0.0
+
+
+if __name__ == "__main__":
+    from database import SessionLocal
+
+    with SessionLocal() as session:
+        if "--full" in sys.argv:
+            print(f"📈 트렌드 점수 전체 재계산 완료 ({rebuild_trending(session)}건)")
+        else:
+            print(f"📈 트렌드 점수 증분 갱신 완료 ({refresh_trending(session)}건)")
@@ -0,0 +1,103 @@
+"""
+users_action 저장 헬퍼 (찜 중복 방지)
+(user_email, policy_id)에 대해 type='like' 행은 하나만 존재하도록 부분 유니크 인덱스(uq_users_action_like)를 두고,
+찜은 INSERT ... ON CONFLICT DO NOTHING 한 문장으로 저장합니다. (SELECT 후 INSERT 하던 경쟁 조건 제거)
+- insert_like: 찜 1건 → 새로 찜했으면 True
+- insert_actions: 여러 건 다중 행 INSERT → 실제로 저장된 (user_email, policy_id, type) 목록
+- ensure_like_unique_index: 기존 DB에 인덱스가 없으면 중복 찜 정리 후 생성 (마이그레이션)
+- ensure_action_indexes: 그 외 인덱스(찜 목록 키셋 페이지네이션용 등)가 없으면 생성
+
+실행: python -m services.user_actions  (중복 찜 정리 + 인덱스 생성)
+"""
+from typing import List
+
+from sqlalchemy import delete, func, inspect, select
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session
+
+from models import UserAction
+
+LIKE_INDEX_NAME = "uq_users_action_like"
+
+
+def _insert(db: Session):
+    dialect = postgresql if db.get_bind().dialect.name == "postgresql" else sqlite
+    return dialect.insert(UserAction)
+
+
+def _on_conflict_ignore(stmt):
+    return stmt.on_conflict_do_nothing(
+        index_elements=[UserAction.user_email, UserAction.policy_id],
+        index_where=UserAction.type == "like",
+    )
+
+
+def insert_like(db: Session, user_email: str, policy_id: int) -> bool:
+    """찜 저장 (이미 찜했으면 아무것도 하지 않음) → 새로 찜했으면 True"""
+    stmt = _on_conflict_ignore(
+        _insert(db).values(user_email=user_email, policy_id=policy_id, type="like")
+    ).returning(UserAction.id)
+    return db.execute(stmt).scalar() is not None
+
+
+def insert_actions(db: Session, rows: List[dict]) -> List[tuple]:
+    """
+    액션 여러 건을 다중 행 INSERT 한 문장으로 저장 (이미 찜한 like는 건너뜀)
+    → 실제로 저장된 (user_email, policy_id, type) 목록
+    """
+    if not rows:
+        return []
+    stmt = _on_conflict_ignore(_insert(db).values(rows)).returning(
+        UserAction.user_email, UserAction.policy_id, UserAction.type
+    )
+    return [tuple(r) for r in db.execute(stmt)]
+
+
+def dedupe_likes(db: Session) -> int:
+    """같은 (유저, 정책)의 중복 찜 행 삭제 (가장 먼저 저장된 행만 남김, 커밋은 호출한 쪽에서) → 삭제한 행 수"""
+    keep = select(func.min(UserAction.id)).where(UserAction.type == "like")\
+        .group_by(UserAction.user_email, UserAction.policy_id)
+    return db.execute(
+        delete(UserAction).where(UserAction.type == "like", UserAction.id.notin_(keep)),
+        execution_options={"synchronize_session": False},
+    ).rowcount
+
+
+def ensure_like_unique_index(engine: Engine) -> int:
+    """
+    부분 유니크 인덱스가 없으면 중복 찜 정리 → 인덱스 생성 → 장르별 카운터 재집계
+    → 정리한 중복 행 수 (-1이면 이미 인덱스가 있음)
+    """
+    if any(ix["name"] == LIKE_INDEX_NAME for ix in inspect(engine).get_indexes(UserAction.__tablename__)):
+        return -1
+
+    from services.category_stats import rebuild_category_stats
+
+    with Session(bind=engine) as db:
+        removed = dedupe_likes(db)
+        db.commit()
+        index = next(ix for ix in UserAction.__table__.indexes if ix.name == LIKE_INDEX_NAME)
+        index.create(bind=engine, checkfirst=True)
+        if removed:
+            rebuild_category_stats(db)  # 지운 중복 찜만큼 카운터도 맞춤
+    return removed
+
+
+def ensure_action_indexes(engine: Engine) -> List[str]:
+    """users_action에 모델에 정의된 일반 인덱스가 없으면 생성 (유니크 인덱스는 ensure_like_unique_index) → 만든 인덱스 이름"""
+    existing = {ix["name"] for ix in inspect(engine).get_indexes(UserAction.__tablename__)}
+    created = []
+    for index in UserAction.__table__.indexes:
+        if index.name != LIKE_INDEX_NAME and index.name not in existing:
+            index.create(bind=engine, checkfirst=True)
+            created.append(index.name)
+    return created
+
+
+if __name__ == "__main__":
+    from database import engine
+
+    removed = ensure_like_unique_index(engine)
+    ensure_action_indexes(engine)
+    print("🔒 찜 유니크 인덱스가 이미 있습니다." if removed < 0 else f"🔒 중복 찜 {removed}건 정리 후 유니크 인덱스 생성 완료")
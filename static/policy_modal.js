@@ -28,6 +28,54 @@ document.addEventListener("DOMContentLoaded", () => {
     }
 });
 
+// [NEW] 찜한 정책 id 집합 (페이지당 한 번 /api/mypage/liked 비트맵으로 받아서 하트 표시에 재사용)
+// 모달마다 /api/mypage/check를 부르지 않고, 카드 그리드도 LikedSet.has(id)로 하트 상태를 그릴 수 있음
+window.LikedSet = {
+    email: null,
+    ids: null,
+    loading: null,
+
+    // 로그인 유저의 찜 집합 (Promise<Set>), 비로그인이면 빈 집합
+    load() {
+        const userEmail = localStorage.getItem('userEmail');
+        if (!userEmail) return Promise.resolve(new Set());
+        if (this.email === userEmail && this.ids) return Promise.resolve(this.ids);
+        if (this.email === userEmail && this.loading) return this.loading;
+
+        this.email = userEmail;
+        this.ids = null;
+        this.loading = fetch(`/api/mypage/liked?user_email=${encodeURIComponent(userEmail)}`)
+            .then(res => res.json())
+            .then(res => {
+                // 바이트 i의 비트 j = 정책 id i*8+j
+                const bytes = atob(res.bitmap || '');
+                const ids = new Set();
+                for (let i = 0; i < bytes.length; i++) {
+                    const value = bytes.charCodeAt(i);
+                    for (let j = 0; j < 8; j++) {
+                        if (value & (1 << j)) ids.add(i * 8 + j);
+                    }
+                }
+                if (this.email === userEmail) this.ids = ids;
+                return ids;
+            })
+            .finally(() => { this.loading = null; });
+        return this.loading;
+    },
+
+    has(id) {
+        return !!this.ids && this.ids.has(parseInt(id));
+    },
+
+    add(id) {
+        if (this.ids) this.ids.add(parseInt(id));
+    },
+
+    remove(id) {
+        if (this.ids) this.ids.delete(parseInt(id));
+    }
+};
+
 // 2. 카드 클릭 시 호출되는 함수 (HTML onclick="openCardModal(this)"와 연결)
 window.openCardModal = function (element) {
     const modal = document.getElementById('policy-modal');
@@ -179,13 +227,12 @@ window.openCardModal = function (element) {
             icon.className = "fa-regular fa-heart text-xl";
             els.heartBtn.classList.remove('border-red-500', 'text-red-500');
 
-            // [NEW] 서버에서 찜 상태 확인 (로그인 시에만)
+            // [NEW] 찜 상태 확인 (로그인 시에만, 페이지에서 처음 한 번만 서버 조회)
             const userEmail = localStorage.getItem('userEmail');
             if (userEmail && data.id) {
-                fetch(`/api/mypage/check?user_email=${userEmail}&policy_id=${data.id}`)
-                    .then(res => res.json())
-                    .then(res => {
-                        if (res.liked) {
+                window.LikedSet.load()
+                    .then(ids => {
+                        if (ids.has(parseInt(data.id))) {
                             icon.className = "fa-solid fa-heart text-xl";
                             els.heartBtn.classList.add('border-red-500', 'text-red-500');
                         }
@@ -211,6 +258,7 @@ window.openCardModal = function (element) {
                     // 찜하기 상태로 변경 (채워진 하트 + 빨간색)
                     icon.className = "fa-solid fa-heart text-xl";
                     this.classList.add('border-red-500', 'text-red-500');
+                    window.LikedSet.add(policyId);
 
                     // 백엔드 연동: Like
                     fetch('/api/mypage/action', {
@@ -238,6 +286,7 @@ window.openCardModal = function (element) {
                     // 찜 취소 상태로 변경 (빈 하트 + 회색)
                     icon.className = "fa-regular fa-heart text-xl";
                     this.classList.remove('border-red-500', 'text-red-500');
+                    window.LikedSet.remove(policyId);
 
                     // 백엔드 연동: Unlike
                     fetch('/api/mypage/action', {
@@ -281,6 +330,40 @@ window.openCardModal = function (element) {
             };
         }
 
+        // [핵심 4] 비슷한 정책 (내용 기반 추천, 모달 설명 아래에 목록 추가)
+        if (els.desc && data.id) {
+            let similarBox = document.getElementById('modal-similar');
+            if (!similarBox) {
+                similarBox = document.createElement('div');
+                similarBox.id = 'modal-similar';
+                similarBox.className = 'mt-4';
+                els.desc.insertAdjacentElement('afterend', similarBox);
+            }
+            similarBox.innerHTML = '';
+
+            fetch(`/api/recommend/similar/${data.id}?limit=4`)
+                .then(res => res.json())
+                .then(res => {
+                    if (!res.items || res.items.length === 0 || res.policy_id !== data.id) return;
+
+                    const heading = document.createElement('p');
+                    heading.className = 'text-sm font-bold text-gray-500 mb-2';
+                    heading.innerText = '비슷한 정책';
+                    similarBox.appendChild(heading);
+
+                    res.items.forEach(item => {
+                        const link = document.createElement('button');
+                        link.type = 'button';
+                        link.className = 'block w-full text-left text-sm text-gray-700 truncate py-1 hover:text-primary-orange';
+                        link.innerText = `· ${item.title}`;
+                        link.setAttribute('data-json', JSON.stringify(item));
+                        link.onclick = () => window.openCardModal(link);
+                        similarBox.appendChild(link);
+                    });
+                })
+                .catch(err => console.error("비슷한 정책 조회 실패:", err));
+        }
+
         // 2-4. 모달 보여주기
         modal.classList.remove('hidden');
         // document.body.style.overflow = 'hidden'; // [수정] 스크롤바 유지 (화면 덜컹거림 방지)
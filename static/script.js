@@ -235,6 +235,41 @@ function createCardHTML(item, isTinder = false) {
     }
 }
 
+// [NEW] 스와이프 액션 일괄 전송 큐
+// 스와이프마다 요청을 보내지 않고 모아서 /api/mypage/actions/batch 로 한 번에 전송
+// (페이지를 떠날 때는 sendBeacon으로 남은 액션 전송)
+const SwipeActionQueue = {
+    pending: [],
+    timer: null,
+    FLUSH_DELAY: 1500, // ms
+    MAX_BATCH: 20,
+
+    push(action) {
+        this.pending.push(action);
+        if (this.pending.length >= this.MAX_BATCH) this.flush();
+        else if (!this.timer) this.timer = setTimeout(() => this.flush(), this.FLUSH_DELAY);
+    },
+
+    flush(useBeacon = false) {
+        clearTimeout(this.timer);
+        this.timer = null;
+        if (this.pending.length === 0) return;
+
+        const body = JSON.stringify({ actions: this.pending.splice(0) });
+        if (useBeacon && navigator.sendBeacon) {
+            navigator.sendBeacon('/api/mypage/actions/batch', new Blob([body], { type: 'application/json' }));
+            return;
+        }
+        fetch('/api/mypage/actions/batch', {
+            method: 'POST',
+            headers: { 'Content-Type': 'application/json' },
+            body: body,
+            keepalive: true
+        }).catch(err => console.error("Action Save Error:", err));
+    }
+};
+window.addEventListener('pagehide', () => SwipeActionQueue.flush(true));
+
 // 틴더 스와이프 클래스
 class CardSwiper {
     constructor(container, data) {
@@ -326,15 +361,13 @@ class CardSwiper {
                 const actionType = direction === 'right' ? 'like' : 'pass';
                 const policyId = card.getAttribute('data-id'); // data-id 속성 필요
 
-                fetch('/api/mypage/action', {
-                    method: 'POST',
-                    headers: { 'Content-Type': 'application/json' },
-                    body: JSON.stringify({
-                        user_email: userEmail,
-                        policy_id: parseInt(policyId),
-                        type: actionType
-                    })
-                }).catch(err => console.error("Action Save Error:", err));
+                SwipeActionQueue.push({
+                    user_email: userEmail,
+                    policy_id: parseInt(policyId),
+                    type: actionType
+                });
+                // [NEW] 찜 집합에도 바로 반영 (모달 하트 표시용, policy_modal.js)
+                if (actionType === 'like' && window.LikedSet) window.LikedSet.add(parseInt(policyId));
             }
         }, 500);
     }
@@ -1374,6 +1407,9 @@ document.addEventListener("DOMContentLoaded", () => {
                     // 체크박스 초기화
                     if (this.checkAll) this.checkAll.checked = false;
 
+                    // 찜 집합에서도 제거 (모달 하트 표시용)
+                    if (window.LikedSet) ids.forEach(id => window.LikedSet.remove(id));
+
                     // 활동 지수 업데이트
                     if (typeof window.loadUserProfile === 'function') {
                         setTimeout(() => window.loadUserProfile(), 500);
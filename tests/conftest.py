@@ -0,0 +1,49 @@
+"""
+pytest 공용 설정
+database.py는 import 시점에 엔진을 만들기 때문에, 서비스 모듈을 import 하기 전에
+DATABASE_URL을 임시 sqlite 파일로 바꿔 둡니다. (PostgreSQL 없이 실행)
+"""
+import os
+import sys
+import tempfile
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+_db_dir = tempfile.mkdtemp(prefix="policy-tests-")
+os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(_db_dir, 'test.db')}"
+
+import pytest  # noqa: E402
+
+
+@pytest.fixture
+def db():
+    """테이블을 새로 만든 빈 DB 세션 (테스트가 끝나면 모두 삭제)"""
+    import models
+    from database import SessionLocal, engine
+    from services.catalog_sync import ensure_sync_columns
+
+    models.Base.metadata.create_all(bind=engine)
+    ensure_sync_columns(engine)
+    session = SessionLocal()
+    try:
+        yield session
+    finally:
+        session.close()
+        models.Base.metadata.drop_all(bind=engine)
+
+
+@pytest.fixture
+def user_policies(db):
+    """유저 1명 + 장르별 정책 1개씩 → (이메일, [정책 id, ...] 장르 코드 순)"""
+    import models
+
+    email = "tester@example.com"
+    db.add(models.User(email=email, name="테스터", region="서울"))
+    policies = [
+        models.Policy(title=f"{genre} 정책", genre=genre, region="서울")
+        for genre in models.GENRE_CODES
+    ]
+    db.add_all(policies)
+    db.commit()
+    return email, [p.id for p in policies]
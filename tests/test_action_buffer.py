@@ -0,0 +1,94 @@
+import threading
+
+import pytest
+
+import services.action_buffer as action_buffer_module
+from models import UserAction
+from services.action_buffer import ActionBuffer, flush_on_shutdown
+from services.category_stats import remove_actions
+
+
+def _likes(db, email, policy_id) -> int:
+    db.expire_all()
+    return db.query(UserAction).filter_by(user_email=email, policy_id=policy_id, type="like").count()
+
+
+def test_flush_saves_pending_actions(db, user_policies):
+    email, (p1, p2, *_) = user_policies
+    buffer = ActionBuffer()
+    buffer.add([(email, p1, "like"), (email, p2, "pass"), (email, p1, "like")])
+    assert len(buffer) == 2
+
+    assert buffer.flush() == 2
+    assert len(buffer) == 0
+    assert _likes(db, email, p1) == 1
+
+
+def test_discard_drops_pending_like(db, user_policies):
+    email, (p1, p2, *_) = user_policies
+    buffer = ActionBuffer()
+    buffer.add([(email, p1, "like"), (email, p2, "like"), (email, p1, "pass")])
+
+    assert buffer.discard(email, [p1]) == 1
+    assert buffer.discard(email, [p1]) == 0
+    buffer.flush()
+    assert _likes(db, email, p1) == 0
+    assert _likes(db, email, p2) == 1
+
+
+def test_unlike_during_flush_is_not_resurrected(db, user_policies, monkeypatch):
+    """저장 중인 배치에 든 찜을 취소해도, 취소가 배치 커밋 뒤에 실행되어 찜이 남지 않음"""
+    email, (p1, *_) = user_policies
+    buffer = ActionBuffer()
+    buffer.add([(email, p1, "like")])
+
+    saving, release = threading.Event(), threading.Event()
+    real_save = action_buffer_module.save_actions
+
+    def slow_save(session, batch):
+        saved = real_save(session, batch)
+        saving.set()
+        release.wait(5)
+        return saved
+
+    monkeypatch.setattr(action_buffer_module, "save_actions", slow_save)
+    flusher = threading.Thread(target=buffer.flush)
+    flusher.start()
+    assert saving.wait(5)
+
+    discarded = threading.Event()
+
+    def unlike():
+        from database import SessionLocal
+        buffer.discard(email, [p1])
+        discarded.set()
+        with SessionLocal() as session:
+            remove_actions(session, email, "like", [p1])
+            session.commit()
+
+    unliker = threading.Thread(target=unlike)
+    unliker.start()
+    assert not discarded.wait(0.2)  # 배치가 커밋될 때까지 DELETE 전에 기다림
+
+    release.set()
+    flusher.join(5)
+    unliker.join(5)
+    assert _likes(db, email, p1) == 0
+
+
+def test_shutdown_flush_logs_unsaved_actions(user_policies, monkeypatch, capsys):
+    email, (p1, *_) = user_policies
+    buffer = ActionBuffer()
+    buffer.add([(email, p1, "like")])
+    monkeypatch.setattr(action_buffer_module, "action_buffer", buffer)
+
+    def unavailable():
+        raise RuntimeError("db down")
+
+    monkeypatch.setattr(action_buffer_module, "SessionLocal", unavailable)
+    assert flush_on_shutdown() == 0
+    assert len(buffer) == 1  # 버퍼에 되돌려 둠
+
+    out = capsys.readouterr().out
+    assert "1건 저장 못 함" in out
+    assert f"{email}\t{p1}\tlike" in out
@@ -0,0 +1,49 @@
+from datetime import date
+
+import pytest
+
+from services.bulk_io import IMPORT_FIELDS, _parse
+
+POLICY_FIELDS = IMPORT_FIELDS["policies"]
+ACTION_FIELDS = IMPORT_FIELDS["actions"]
+
+
+def test_parse_policy_defaults():
+    row = _parse(POLICY_FIELDS, {"title": "청년 월세 지원", "end_date": "2025-12-31T00:00:00"})
+    assert row["title"] == "청년 월세 지원"
+    assert row["end_date"] == date(2025, 12, 31)
+    assert row["view_count"] == 0
+    assert row["is_active"] is True
+    assert row["id"] is None
+
+
+def test_missing_required_field_rejected():
+    with pytest.raises(ValueError, match="title 값이 없습니다"):
+        _parse(POLICY_FIELDS, {"summary": "제목 없음"})
+
+
+def test_blank_required_field_rejected():
+    with pytest.raises(ValueError, match="title 값이 없습니다"):
+        _parse(POLICY_FIELDS, {"title": "   "})
+
+
+@pytest.mark.parametrize("value", ["abc", "1.5", True])
+def test_bad_int_rejected(value):
+    with pytest.raises(ValueError, match="policy_id 값이 올바르지 않습니다"):
+        _parse(ACTION_FIELDS, {"user_email": "a@b.c", "policy_id": value, "type": "like"})
+
+
+@pytest.mark.parametrize("value", ["2025-13-01", "어제", "12/31/2025"])
+def test_bad_date_rejected(value):
+    with pytest.raises(ValueError, match="end_date 값이 올바르지 않습니다"):
+        _parse(POLICY_FIELDS, {"title": "정책", "end_date": value})
+
+
+def test_bad_datetime_rejected():
+    with pytest.raises(ValueError, match="created_at 값이 올바르지 않습니다"):
+        _parse(ACTION_FIELDS, {"user_email": "a@b.c", "policy_id": 1, "type": "like", "created_at": "soon"})
+
+
+def test_bad_bool_rejected():
+    with pytest.raises(ValueError, match="is_active 값이 올바르지 않습니다"):
+        _parse(POLICY_FIELDS, {"title": "정책", "is_active": "maybe"})
@@ -0,0 +1,48 @@
+from models import Policy
+from services.catalog_sync import sync_policies
+
+RECORDS = [
+    {
+        "original_id": f"R{i:03d}",
+        "title": f"청년 정책 {i}",
+        "summary": "월세 지원",
+        "period": "상시",
+        "link": f"https://example.com/{i}",
+        "genre": "주거",
+        "region": "서울",
+        "created_at": "2025-01-02T03:04:05",
+        "end_date": "2026-12-31",
+    }
+    for i in range(12)
+]
+
+
+def test_second_sync_is_all_unchanged(db):
+    first = sync_policies(db, RECORDS, batch_size=5)
+    assert (first.inserted, first.updated, first.unchanged) == (len(RECORDS), 0, 0)
+
+    second = sync_policies(db, RECORDS, batch_size=5)
+    assert second.unchanged == len(RECORDS)
+    assert (second.inserted, second.updated, second.deactivated, second.reactivated, second.skipped) == (0, 0, 0, 0, 0)
+    assert db.query(Policy).count() == len(RECORDS)
+
+
+def test_only_changed_record_is_updated(db):
+    sync_policies(db, RECORDS)
+    changed = [dict(r) for r in RECORDS]
+    changed[3]["summary"] = "월세 + 보증금 지원"
+
+    result = sync_policies(db, changed)
+    assert (result.updated, result.unchanged) == (1, len(RECORDS) - 1)
+    assert db.query(Policy.summary).filter(Policy.original_id == "R003").scalar() == "월세 + 보증금 지원"
+
+
+def test_missing_record_deactivated_then_reactivated(db):
+    sync_policies(db, RECORDS)
+    result = sync_policies(db, RECORDS[1:])
+    assert result.deactivated == 1
+    assert db.query(Policy.is_active).filter(Policy.original_id == "R000").scalar() is False
+
+    result = sync_policies(db, RECORDS)
+    assert (result.reactivated, result.unchanged) == (1, len(RECORDS))
+    assert db.query(Policy.is_active).filter(Policy.original_id == "R000").scalar() is True
@@ -0,0 +1,50 @@
+import pytest
+from starlette.requests import Request
+
+from services.catalog import bump_catalog_version, invalidate_catalog_version
+from services.conditional import catalog_validators
+
+
+def _request(query: str = "", headers: dict = None) -> Request:
+    return Request({
+        "type": "http",
+        "method": "GET",
+        "path": "/api/cards",
+        "query_string": query.encode(),
+        "headers": [(k.lower().encode(), v.encode()) for k, v in (headers or {}).items()],
+    })
+
+
+@pytest.fixture
+def catalog(db):
+    """카탈로그가 한 번 바뀐 상태 (updated_at이 있어야 Last-Modified가 나옴)"""
+    bump_catalog_version(db)
+    db.commit()
+    invalidate_catalog_version()
+    return db
+
+
+def test_param_order_does_not_change_etag(catalog):
+    a = catalog_validators(_request("sort=latest&page=2"), catalog, "cards")
+    b = catalog_validators(_request("page=2&sort=latest&q="), catalog, "cards")
+    assert a.etag == b.etag
+
+
+def test_catalog_only_response_revalidates_by_etag_or_date(catalog):
+    validators = catalog_validators(_request("sort=latest"), catalog, "cards")
+    assert validators.last_modified is not None
+    assert validators.matches(_request("sort=latest", {"If-None-Match": validators.etag}))
+    assert validators.matches(_request("sort=latest", {"If-Modified-Since": validators.last_modified}))
+
+
+def test_extra_version_is_etag_only(catalog):
+    t1 = catalog_validators(_request("sort=popular"), catalog, "cards", "t1")
+    t2 = catalog_validators(_request("sort=popular"), catalog, "cards", "t2")
+    assert t1.etag != t2.etag
+    assert t1.last_modified is None
+
+    # 카탈로그 수정 시각으로는 트렌드 갱신을 알 수 없으므로 If-Modified-Since만으로는 304가 아님
+    plain = catalog_validators(_request("sort=popular"), catalog, "cards")
+    assert not t1.matches(_request("sort=popular", {"If-Modified-Since": plain.last_modified}))
+    assert t1.matches(_request("sort=popular", {"If-None-Match": t1.etag}))
+    assert not t2.matches(_request("sort=popular", {"If-None-Match": t1.etag}))
@@ -0,0 +1,78 @@
+from collections import namedtuple
+
+import pytest
+from cachetools import TTLCache
+
+import services.catalog_snapshot as catalog_snapshot
+import services.deck_prefetch as deck_prefetch
+import services.deck_sampler as deck_sampler
+import services.seen_set as seen_set
+from models import region_code
+from services.catalog import invalidate_catalog_version
+from services.deck_prefetch import DeckBuildStats, prefetch_next_deck, take_prefetched
+from services.seen_set import SeenBitmap
+
+Card = namedtuple("Card", ["id"])
+TOKEN = "tok"
+REGIONS = [region_code("서울")]
+
+
+@pytest.fixture(autouse=True)
+def empty_prefetch(monkeypatch):
+    """미리 만든 덱 / 통계 / 본 정책 / 스냅샷 캐시를 테스트마다 비움 (테스트 DB는 매번 버전 0부터 시작)"""
+    monkeypatch.setattr(seen_set, "_cache", TTLCache(maxsize=100, ttl=seen_set.SEEN_TTL))
+    monkeypatch.setattr(seen_set, "_dirty", {})
+    monkeypatch.setattr(deck_prefetch, "_decks", TTLCache(maxsize=100, ttl=deck_prefetch.PREFETCH_TTL))
+    monkeypatch.setattr(deck_prefetch, "build_stats", DeckBuildStats())
+    monkeypatch.setattr(catalog_snapshot, "_snapshot", None)
+    monkeypatch.setattr(deck_sampler, "_sampler", None)
+    invalidate_catalog_version()
+
+
+def _store(version, ids):
+    deck_prefetch._decks[(TOKEN, tuple(REGIONS))] = (version, [Card(i) for i in ids])
+
+
+def _lookups():
+    stats = deck_prefetch.build_stats.snapshot()
+    return stats["prefetch_hits"], stats["prefetch_misses"]
+
+
+def test_missing_deck_is_a_miss(db):
+    assert take_prefetched(db, TOKEN, REGIONS, SeenBitmap()) is None
+    assert _lookups() == (0, 1)
+
+
+def test_fresh_deck_is_taken_once(db):
+    _store(0, [1, 2, 3])
+    deck = take_prefetched(db, TOKEN, REGIONS, SeenBitmap())
+    assert [c.id for c in deck] == [1, 2, 3]
+    assert take_prefetched(db, TOKEN, REGIONS, SeenBitmap()) is None
+    assert _lookups() == (1, 1)
+
+
+def test_deck_with_seen_card_is_a_miss(db):
+    _store(0, [1, 2, 3])
+    seen = SeenBitmap()
+    seen.add(2)
+    assert take_prefetched(db, TOKEN, REGIONS, seen) is None
+    assert _lookups() == (0, 1)
+
+
+def test_deck_from_other_catalog_version_is_a_miss(db):
+    _store(7, [1, 2, 3])
+    assert take_prefetched(db, TOKEN, REGIONS, SeenBitmap()) is None
+    assert _lookups() == (0, 1)
+
+
+def test_prefetched_deck_excludes_stored_seen_set(db, user_policies):
+    from services.seen_set import mark_seen, persist_seen
+
+    _, policy_ids = user_policies
+    mark_seen(db, TOKEN, policy_ids[:2])
+    persist_seen()
+
+    prefetch_next_deck(TOKEN, REGIONS)
+    deck = take_prefetched(db, TOKEN, REGIONS, SeenBitmap())
+    assert sorted(c.id for c in deck) == sorted(policy_ids[2:])
+    assert deck_prefetch.build_stats.snapshot()["builds"] == 1
@@ -0,0 +1,40 @@
+from datetime import date, datetime
+
+import pytest
+
+from services.pagination import decode_cursor, encode_cursor
+
+
+@pytest.mark.parametrize("values", [
+    [3, 120],
+    [None, 7],
+    [True, "청년 월세 지원", 1],
+    [datetime(2025, 3, 1, 9, 30, 15), 42],
+    [date(2025, 12, 31), None, 5],
+])
+def test_cursor_round_trip(values):
+    cursor = encode_cursor("latest", values)
+    assert decode_cursor(cursor, "latest", len(values)) == values
+
+
+def test_cursor_is_url_safe():
+    cursor = encode_cursor("title", ["주거/금융?&=", 10])
+    assert "=" not in cursor and "/" not in cursor and "+" not in cursor
+
+
+def test_cursor_from_other_sort_rejected():
+    cursor = encode_cursor("latest", [datetime(2025, 1, 1), 1])
+    with pytest.raises(ValueError):
+        decode_cursor(cursor, "popular", 2)
+
+
+def test_cursor_with_wrong_key_count_rejected():
+    cursor = encode_cursor("latest", [datetime(2025, 1, 1), 1])
+    with pytest.raises(ValueError):
+        decode_cursor(cursor, "latest", 3)
+
+
+@pytest.mark.parametrize("cursor", ["", "not-a-cursor", "%%%", encode_cursor("latest", [{"x": 1}])])
+def test_broken_cursor_rejected(cursor):
+    with pytest.raises(ValueError):
+        decode_cursor(cursor, "latest", 1)
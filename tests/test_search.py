@@ -0,0 +1,43 @@
+from sqlalchemy.dialects import sqlite
+
+from services.search import keyword_condition, make_ngrams, tokenize
+
+
+def _sql(condition) -> str:
+    return str(condition.compile(dialect=sqlite.dialect()))
+
+
+def test_tokenize_splits_on_symbols_and_lowercases():
+    assert tokenize("청년 월세(주거)·지원 AI-Lab 2025") == ["청년", "월세", "주거", "지원", "ai", "lab", "2025"]
+
+
+def test_tokenize_empty():
+    assert tokenize(None) == []
+    assert tokenize("") == []
+    assert tokenize("  --  ") == []
+
+
+def test_ngrams_do_not_cross_token_boundaries():
+    grams = make_ngrams("청년 월세")
+    assert grams == {"청년": 1, "월세": 1}
+
+
+def test_ngrams_count_repeats():
+    grams = make_ngrams("지원지원")
+    assert grams == {"지원": 2, "원지": 1}
+
+
+def test_single_character_tokens_give_no_ngrams():
+    assert make_ngrams("집 차") == {}
+
+
+def test_keyword_with_bigrams_uses_index():
+    sql = _sql(keyword_condition("월세지원"))
+    assert "policy_search_gram" in sql
+    assert "LIKE" not in sql.upper()
+
+
+def test_short_keyword_falls_back_to_ilike():
+    sql = _sql(keyword_condition("집"))
+    assert "policy_search_gram" not in sql
+    assert sql.upper().count("LIKE") == 2  # 제목 OR 요약
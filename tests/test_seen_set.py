@@ -0,0 +1,85 @@
+from datetime import datetime
+
+import pytest
+from cachetools import TTLCache
+
+import services.seen_set as seen_set
+from models import DeckSeenSet
+from services.seen_set import SeenBitmap, flush_seen, load_seen, mark_seen, pending_count, persist_seen
+
+
+@pytest.fixture(autouse=True)
+def empty_store(monkeypatch):
+    """모듈 전역 메모리 저장소를 테스트마다 비움"""
+    monkeypatch.setattr(seen_set, "_cache", TTLCache(maxsize=100, ttl=seen_set.SEEN_TTL))
+    monkeypatch.setattr(seen_set, "_dirty", {})
+
+
+def _stored(db, token) -> set:
+    db.expire_all()
+    row = db.get(DeckSeenSet, token)
+    return set(SeenBitmap(row.bitmap)) if row else set()
+
+
+def test_bitmap_membership_and_bytes():
+    seen = SeenBitmap()
+    seen.update([0, 7, 8, 1000])
+    seen.discard(7)
+    assert set(seen) == {0, 8, 1000} and len(seen) == 3
+    assert 7 not in seen and 5000 not in seen and -1 not in seen
+    assert set(SeenBitmap(seen.to_bytes())) == {0, 8, 1000}
+
+
+def test_mark_seen_writes_only_on_persist(db):
+    mark_seen(db, "tok", [3, 5])
+    mark_seen(db, "tok", [8])
+    assert _stored(db, "tok") == set()
+    assert pending_count() == 1
+
+    assert persist_seen() == 1
+    assert pending_count() == 0
+    assert _stored(db, "tok") == {3, 5, 8}
+    assert persist_seen() == 0
+
+
+def test_persist_merges_with_other_workers_bitmap(db):
+    other = SeenBitmap()
+    other.update([1, 40])
+    db.add(DeckSeenSet(token="tok", bitmap=other.to_bytes(), updated_at=datetime.now()))
+    db.commit()
+
+    # 이 워커는 DB 행을 읽기 전에 새 비트맵으로 시작한 상태
+    seen = mark_seen(db, "tok", [7], seen=SeenBitmap())
+    persist_seen()
+    assert _stored(db, "tok") == {1, 7, 40}
+    assert set(seen) == {1, 7, 40}  # 메모리 비트맵에도 합쳐짐
+
+
+def test_evicted_bitmap_is_still_persisted(db):
+    mark_seen(db, "tok", [2])
+    seen_set._cache.clear()
+    persist_seen()
+    assert _stored(db, "tok") == {2}
+    assert set(load_seen(db, "tok")) == {2}
+
+
+def test_failed_persist_requeues_bitmaps(db, monkeypatch, capsys):
+    mark_seen(db, "a", [1])
+    mark_seen(db, "b", [2])
+    real_session = seen_set.SessionLocal
+
+    def unavailable():
+        raise RuntimeError("db down")
+
+    monkeypatch.setattr(seen_set, "SessionLocal", unavailable)
+    with pytest.raises(RuntimeError):
+        persist_seen()
+    assert pending_count() == 2
+    assert flush_seen() == 0
+    assert "2건 대기" in capsys.readouterr().out
+
+    mark_seen(db, "a", [3])  # 실패 사이에 들어온 갱신도 함께 저장됨
+    monkeypatch.setattr(seen_set, "SessionLocal", real_session)
+    assert persist_seen() == 2
+    assert _stored(db, "a") == {1, 3}
+    assert _stored(db, "b") == {2}
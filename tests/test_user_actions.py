@@ -0,0 +1,52 @@
+from models import GENRE_CODES, UserAction
+from services.category_stats import get_category_stats, rebuild_category_stats, record_action, remove_actions
+from services.user_actions import insert_like
+
+JOB, STARTUP = GENRE_CODES["취업/직무"], GENRE_CODES["창업/사업"]
+
+
+def _like(db, email, policy_id) -> bool:
+    """mypage /action like 경로와 같은 순서: 새로 저장됐을 때만 카운터 +1"""
+    added = insert_like(db, email, policy_id)
+    if added:
+        record_action(db, email, policy_id, "like")
+    db.commit()
+    return added
+
+
+def test_duplicate_like_is_ignored(db, user_policies):
+    email, (job, *_) = user_policies
+    assert _like(db, email, job) is True
+    assert _like(db, email, job) is False
+    assert db.query(UserAction).filter_by(user_email=email, policy_id=job, type="like").count() == 1
+    assert get_category_stats(db, email) == {JOB: (1, 0)}
+
+
+def test_remove_actions_decrements_only_deleted_rows(db, user_policies):
+    email, (job, startup, housing, *_) = user_policies
+    for policy_id in (job, startup):
+        _like(db, email, policy_id)
+
+    # 찜하지 않은 정책이 섞여 있어도 실제로 지운 행만큼만 뺌
+    assert remove_actions(db, email, "like", [job, housing]) == 1
+    db.commit()
+    assert get_category_stats(db, email) == {JOB: (0, 0), STARTUP: (1, 0)}
+
+    # 이미 취소한 찜을 다시 취소 → 변화 없음
+    assert remove_actions(db, email, "like", [job]) == 0
+    db.commit()
+    assert get_category_stats(db, email) == {JOB: (0, 0), STARTUP: (1, 0)}
+
+
+def test_counters_match_full_rebuild(db, user_policies):
+    email, policy_ids = user_policies
+    for policy_id in policy_ids:
+        _like(db, email, policy_id)
+        _like(db, email, policy_id)
+    remove_actions(db, email, "like", policy_ids[::2])
+    db.commit()
+    incremental = {code: counts for code, counts in get_category_stats(db, email).items() if any(counts)}
+
+    rebuild_category_stats(db)
+    db.commit()
+    assert get_category_stats(db, email) == incremental